@@ -10,7 +10,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 
 from app.core.config import settings
 from app.core.db import Base
-from app.models import user, category, product  # noqa: F401  импортируем модели, чтобы они попали в metadata
+from app.models import user, category, product, order, refresh_token, catalog_change  # noqa: F401  импортируем модели, чтобы они попали в metadata
 
 config = context.config
 
@@ -21,6 +21,21 @@ config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
 
 target_metadata = Base.metadata
 
+# Объекты полнотекстового поиска создаются миграцией вручную и не описаны
+# в моделях - autogenerate не должен предлагать их удалить
+FTS_TABLE_PREFIX = "products_fts"
+FTS_COLUMNS = {("products", "search_vector")}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "table" and name.startswith(FTS_TABLE_PREFIX):
+        return False
+    if type_ == "column" and (object.table.name, name) in FTS_COLUMNS:
+        return False
+    if type_ == "index" and name == "ix_products_search_vector":
+        return False
+    return True
+
 
 def run_migrations_offline():
     url = config.get_main_option("sqlalchemy.url")
@@ -29,6 +44,7 @@ def run_migrations_offline():
         target_metadata=target_metadata,
         literal_binds=True,
         compare_type=True,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -47,6 +63,7 @@ def run_migrations_online():
             connection=connection,
             target_metadata=target_metadata,
             compare_type=True,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
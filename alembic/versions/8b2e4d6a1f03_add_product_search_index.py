@@ -0,0 +1,88 @@
+"""Add product full-text search index
+
+Revision ID: 8b2e4d6a1f03
+Revises: 3f9a1c2d7b64
+Create Date: 2026-10-18 11:40:07.215934
+
+SQLite: внешняя (content=products) FTS5-таблица products_fts,
+синхронизируется триггерами на INSERT/DELETE/UPDATE OF name, description.
+PostgreSQL: генерируемая колонка products.search_vector (tsvector) + GIN-индекс.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e4d6a1f03'
+down_revision: Union[str, Sequence[str], None] = '3f9a1c2d7b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE products_fts USING fts5("
+            "name, description, "
+            "content='products', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "CREATE TRIGGER products_fts_ai AFTER INSERT ON products BEGIN "
+            "INSERT INTO products_fts(rowid, name, description) "
+            "VALUES (new.id, new.name, new.description); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER products_fts_ad AFTER DELETE ON products BEGIN "
+            "INSERT INTO products_fts(products_fts, rowid, name, description) "
+            "VALUES ('delete', old.id, old.name, old.description); "
+            "END"
+        )
+        # Только при изменении индексируемых колонок: обновление остатков не трогает FTS
+        op.execute(
+            "CREATE TRIGGER products_fts_au AFTER UPDATE OF name, description ON products BEGIN "
+            "INSERT INTO products_fts(products_fts, rowid, name, description) "
+            "VALUES ('delete', old.id, old.name, old.description); "
+            "INSERT INTO products_fts(rowid, name, description) "
+            "VALUES (new.id, new.name, new.description); "
+            "END"
+        )
+        # Индексируем уже существующие товары
+        op.execute("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+
+    elif dialect == 'postgresql':
+        op.execute(
+            "ALTER TABLE products ADD COLUMN search_vector tsvector "
+            "GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+            ") STORED"
+        )
+        op.create_index(
+            'ix_products_search_vector',
+            'products',
+            ['search_vector'],
+            unique=False,
+            postgresql_using='gin',
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS products_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS products_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS products_fts_ai")
+        op.execute("DROP TABLE IF EXISTS products_fts")
+
+    elif dialect == 'postgresql':
+        op.drop_index('ix_products_search_vector', table_name='products')
+        op.drop_column('products', 'search_vector')
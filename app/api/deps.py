@@ -1,10 +1,12 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.db import get_db
+from app.core.db import get_async_db, get_db
 from app.models.user import User
 from app.services.jwt import decode_access_token
+from app.services.principal_cache import Principal, principal_cache
 
 
 # HTTPBearer - схема безопасности для извлечения токена из заголовка Authorization
@@ -12,43 +14,25 @@ from app.services.jwt import decode_access_token
 security = HTTPBearer()
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+def _decode_token(token: str) -> tuple[int, float, int]:
     """
-    Dependency для получения текущего аутентифицированного пользователя.
-
-    Как это работает:
-    1. HTTPBearer автоматически извлекает токен из заголовка Authorization
-    2. Декодируем токен и получаем payload (user_id, email)
-    3. Ищем пользователя в БД по user_id
-    4. Возвращаем объект User
+    Декодирует токен и достаёт из него user_id, время истечения и версию.
 
-    Использование в роутере:
-        @router.get("/me")
-        def get_me(current_user: User = Depends(get_current_user)):
-            return current_user
-
-    Args:
-        credentials: Токен из заголовка Authorization (извлекается автоматически)
-        db: Сессия базы данных
+    Общая часть для синхронной и асинхронной версий get_current_user.
 
     Returns:
-        User: Объект пользователя
+        (user_id, exp, ver) - exp в секундах unix-времени,
+        ver - users.token_version на момент выдачи (0 у токенов без ver)
 
     Raises:
-        HTTPException 401: Если токен невалидный или пользователь не найден
+        HTTPException 401: Если токен невалидный, это refresh token или в нём нет user_id
     """
 
-    # Извлекаем сам токен из credentials
-    token = credentials.credentials
-
     # Декодируем токен
     payload = decode_access_token(token)
 
-    # Если токен невалидный или истёк
-    if payload is None:
+    # Если токен невалидный, истёк или это refresh token
+    if payload is None or payload.get('type', 'access') != 'access':
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail='Невалидный или истёкший токен',
@@ -66,9 +50,10 @@ def get_current_user(
             headers={'WWW-Authenticate': 'Bearer'},
         )
 
-    # Ищем пользователя в БД
-    user = db.query(User).filter(User.id == user_id).first()
+    return user_id, payload['exp'], payload.get('ver', 0)
+
 
+def _remember_user(token: str, token_exp: float, token_version: int, user: User | None) -> Principal:
     # Если пользователь не найден (удалён из БД?)
     if user is None:
         raise HTTPException(
@@ -77,12 +62,86 @@ def get_current_user(
             headers={'WWW-Authenticate': 'Bearer'},
         )
 
-    return user
+    # Токены пользователя отозваны (token_version увеличена после выдачи)
+    if user.token_version != token_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='Токен отозван',
+            headers={'WWW-Authenticate': 'Bearer'},
+        )
+
+    principal = Principal.from_user(user)
+    principal_cache.put(token, principal, token_exp)
+
+    return principal
+
+
+def _ensure_user_active(principal: Principal) -> Principal:
+    # Проверяем, активен ли пользователь
+    if not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail='Аккаунт деактивирован',
+        )
+
+    return principal
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> Principal:
+    """
+    Dependency для получения текущего аутентифицированного пользователя.
+
+    Как это работает:
+    1. HTTPBearer автоматически извлекает токен из заголовка Authorization
+    2. Если токен уже проверялся недавно - берём снимок пользователя из кэша
+       (без проверки подписи и без запроса в БД)
+    3. Иначе декодируем токен и получаем payload (user_id, email, ver)
+    4. Ищем пользователя в БД по user_id, сверяем token_version
+       и кладём снимок в кэш
+    5. Возвращаем Principal (id, email, is_active, is_superuser)
+
+    Кэш сбрасывается при изменении пользователя только в этом процессе:
+    в других воркерах деактивированный или отозванный пользователь
+    проходит ещё до PRINCIPAL_CACHE_TTL_SECONDS. get_current_superuser
+    этим окном не пользуется - он перечитывает пользователя из БД.
+
+    Использование в роутере:
+        @router.get("/me")
+        def get_me(current_user: Principal = Depends(get_current_user)):
+            return current_user
+
+    Args:
+        credentials: Токен из заголовка Authorization (извлекается автоматически)
+        db: Сессия базы данных
+
+    Returns:
+        Principal: Снимок пользователя
+
+    Raises:
+        HTTPException 401: Если токен невалидный или пользователь не найден
+    """
+
+    # Извлекаем сам токен из credentials
+    token = credentials.credentials
+
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
+    user_id, token_exp, token_version = _decode_token(token)
+
+    # Ищем пользователя в БД
+    user = db.query(User).filter(User.id == user_id).first()
+
+    return _remember_user(token, token_exp, token_version, user)
 
 
 def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """
     Dependency для получения текущего АКТИВНОГО пользователя.
 
@@ -91,24 +150,106 @@ def get_current_active_user(
 
     Использование в роутере:
         @router.get("/protected")
-        def protected_route(user: User = Depends(get_current_active_user)):
+        def protected_route(user: Principal = Depends(get_current_active_user)):
             return {"message": f"Hello, {user.email}!"}
 
     Args:
         current_user: Пользователь из get_current_user
 
     Returns:
-        User: Активный пользователь
+        Principal: Активный пользователь
 
     Raises:
         HTTPException 403: Если аккаунт деактивирован
     """
+    return _ensure_user_active(current_user)
 
-    # Проверяем, активен ли пользователь
-    if not current_user.is_active:
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """
+    Асинхронная версия get_current_user для роутеров app.api.v1.aio.
+    """
+    token = credentials.credentials
+
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
+    user_id, token_exp, token_version = _decode_token(token)
+
+    user = await db.get(User, user_id)
+
+    return _remember_user(token, token_exp, token_version, user)
+
+
+def _fresh_principal(principal: Principal, user: User | None) -> Principal:
+    """
+    Снимок пользователя из только что прочитанной строки: кэш другого
+    воркера мог не узнать о деактивации, отзыве токенов или снятии прав.
+    """
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='Пользователь не найден',
+            headers={'WWW-Authenticate': 'Bearer'},
+        )
+    if user.token_version != principal.token_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='Токен отозван',
+            headers={'WWW-Authenticate': 'Bearer'},
+        )
+
+    return _ensure_user_active(Principal.from_user(user))
+
+
+def _ensure_superuser(principal: Principal) -> Principal:
+    if not principal.is_superuser:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail='Аккаунт деактивирован',
+            detail='Недостаточно прав',
         )
 
-    return current_user
+    return principal
+
+
+def get_current_superuser(
+    current_user: Principal = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+) -> Principal:
+    """
+    Dependency для административных эндпоинтов: активный пользователь
+    с is_superuser.
+
+    Права проверяются по строке из БД, а не по кэшу токенов: снятие прав
+    или деактивация в другом воркере действуют сразу. Это один запрос
+    по первичному ключу (или ни одного, если get_current_user уже
+    загрузил пользователя в эту сессию).
+
+    Raises:
+        HTTPException 401: Если пользователь удалён или токен отозван
+        HTTPException 403: Если пользователь деактивирован или не администратор
+    """
+    return _ensure_superuser(_fresh_principal(current_user, db.get(User, current_user.id)))
+
+
+async def get_current_active_user_async(
+    current_user: Principal = Depends(get_current_user_async)
+) -> Principal:
+    """
+    Асинхронная версия get_current_active_user для роутеров app.api.v1.aio.
+    """
+    return _ensure_user_active(current_user)
+
+
+async def get_current_superuser_async(
+    current_user: Principal = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """
+    Асинхронная версия get_current_superuser для роутеров app.api.v1.aio.
+    """
+    return _ensure_superuser(_fresh_principal(current_user, await db.get(User, current_user.id)))
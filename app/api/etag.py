@@ -0,0 +1,32 @@
+from fastapi import Request, Response, status
+
+from app.services.catalog_cache import CachedBody
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match сравнивается слабо (RFC 9110): префикс W/ игнорируется
+    if if_none_match.strip() == '*':
+        return True
+
+    candidates = (tag.strip() for tag in if_none_match.split(','))
+    return any(tag.removeprefix('W/') == etag for tag in candidates)
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Совпадает ли If-None-Match запроса с ETag ответа (тогда отвечаем 304)"""
+    if_none_match = request.headers.get('if-none-match')
+    return bool(if_none_match) and _etag_matches(if_none_match, etag)
+
+
+def etag_response(request: Request, entry: CachedBody) -> Response:
+    """
+    JSON-ответ с заголовком ETag.
+
+    Если клиент прислал совпадающий If-None-Match - отвечаем 304 без тела.
+    """
+    headers = {'ETag': entry.etag}
+
+    if is_not_modified(request, entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=entry.body, media_type='application/json', headers=headers)
@@ -0,0 +1,130 @@
+from fastapi import APIRouter
+
+from app.core import db as core_db
+from app.core.config import settings
+from app.core.metrics import registry
+from app.core.pool import pool_status
+from app.services.catalog_cache import catalog_cache
+from app.services.catalog_snapshot import catalog_snapshots
+from app.services.password_pool import password_pool
+from app.services.rate_limit import rate_limiter
+
+
+# Служебные эндпоинты для мониторинга (не входят в публичное API v1)
+router = APIRouter()
+
+
+def _engines() -> list[tuple[str, object]]:
+    engines = [('primary', core_db.engine)]
+    if core_db.async_engine is not None:
+        engines.append(('async', core_db.async_engine.sync_engine))
+    for replica in core_db.replicas.replicas + core_db.async_replicas.replicas:
+        engines.append((replica.name, getattr(replica.engine, 'sync_engine', replica.engine)))
+    return engines
+
+
+def _read_replicas():
+    # Реплики стека, роутеры которого подключены в app.main
+    return core_db.async_replicas if settings.DB_ASYNC else core_db.replicas
+
+
+@router.get('/password-pool')
+def get_password_pool_stats():
+    """
+    Состояние пула bcrypt: очередь, отказы,
+    время хеширования и время ожидания в очереди.
+    """
+    return password_pool.stats()
+
+
+@router.get('/catalog-cache')
+def get_catalog_cache_stats():
+    """Размер кэша ответов каталога и счётчики попаданий/промахов."""
+    return catalog_cache.stats()
+
+
+@router.get('/catalog-snapshot')
+def get_catalog_snapshot_stats():
+    """
+    Снапшот каталога: версия (seq журнала изменений), файлы и их размеры,
+    ожидает ли пересборки, число сборок, время и ошибка последней.
+    """
+    return catalog_snapshots.stats()
+
+
+@router.get('/rate-limit')
+def get_rate_limit_stats():
+    """Лимиты входа и регистрации: хранилище корзин, их число и отказы по правилам."""
+    return rate_limiter.stats()
+
+
+@router.get('/db-replicas')
+def get_db_replicas_stats():
+    """
+    Реплики для чтения: доступность, число выданных сессий и сбоев,
+    а также чтения из основной БД по причинам.
+    """
+    return _read_replicas().stats()
+
+
+@router.get('/db-pool')
+def get_db_pool_stats():
+    """
+    Состояние пулов соединений: занятые и свободные соединения,
+    overflow и время ожидания checkout.
+    """
+    return {'pools': [pool_status(name, engine) for name, engine in _engines()]}
+
+
+def _collect_service_metrics():
+    """Те же данные, что и в эндпоинтах выше, для /metrics"""
+    db_pools = [pool_status(name, engine) for name, engine in _engines()]
+    password = password_pool.stats()
+    cache = catalog_cache.stats()
+    snapshot = catalog_snapshots.stats()
+    rate_limited = rate_limiter.stats()['rejected']
+    read_replicas = _read_replicas().stats()
+
+    def pool_samples(field):
+        return [({'pool': pool['name']}, pool[field]) for pool in db_pools if field in pool]
+
+    def wait_samples(field):
+        return [
+            ({'pool': pool['name']}, pool['checkout_wait'][field])
+            for pool in db_pools if 'checkout_wait' in pool
+        ]
+
+    return [
+        ('db_pool_size', 'gauge', 'Размер пула соединений', pool_samples('size')),
+        ('db_pool_checked_out', 'gauge', 'Соединения, выданные из пула', pool_samples('checked_out')),
+        ('db_pool_checked_in', 'gauge', 'Свободные соединения в пуле', pool_samples('checked_in')),
+        ('db_pool_overflow', 'gauge', 'Соединения сверх pool_size', pool_samples('overflow')),
+        ('db_pool_checkout_wait_seconds_total', 'counter', 'Суммарное ожидание checkout', wait_samples('total_seconds')),
+        ('db_pool_checkouts_total', 'counter', 'Количество checkout из пула', wait_samples('count')),
+        ('db_pool_checkout_timeouts_total', 'counter', 'Checkout, завершившиеся таймаутом', wait_samples('timeouts')),
+        ('password_pool_pending', 'gauge', 'Задачи bcrypt в работе и в очереди', [({}, password['pending'])]),
+        ('password_pool_rejected_total', 'counter', 'Задачи bcrypt, отклонённые с 503', [({}, password['rejected'])]),
+        ('password_hash_seconds_total', 'counter', 'Суммарное время bcrypt', [({}, password['hash_latency']['total_seconds'])]),
+        ('password_hash_total', 'counter', 'Количество операций bcrypt', [({}, password['hash_latency']['count'])]),
+        ('password_queue_wait_seconds_total', 'counter', 'Суммарное ожидание в очереди bcrypt', [({}, password['queue_wait']['total_seconds'])]),
+        ('catalog_cache_entries', 'gauge', 'Записей в кэше каталога', [({}, cache['entries'])]),
+        ('catalog_cache_size_bytes', 'gauge', 'Размер кэша каталога в байтах', [({}, cache['size_bytes'])]),
+        ('catalog_cache_hits_total', 'counter', 'Попадания в кэш каталога', [({}, cache['hits'])]),
+        ('catalog_cache_misses_total', 'counter', 'Промахи кэша каталога', [({}, cache['misses'])]),
+        ('catalog_snapshot_version', 'gauge', 'Версия отдаваемого снапшота каталога (seq журнала изменений)',
+         [({}, snapshot['version'])] if snapshot['version'] is not None else []),
+        ('catalog_snapshot_size_bytes', 'gauge', 'Размер файлов снапшота каталога по кодировкам',
+         [({'encoding': encoding}, file['size']) for encoding, file in snapshot['files'].items()]),
+        ('catalog_snapshot_builds_total', 'counter', 'Сборки снапшота каталога в этом процессе', [({}, snapshot['builds'])]),
+        ('rate_limit_rejected_total', 'counter', 'Запросы, отклонённые с 429, по правилам',
+         [({'rule': rule}, count) for rule, count in rate_limited.items()]),
+        ('db_replica_healthy', 'gauge', 'Реплика в ротации (1) или исключена после сбоя (0)',
+         [({'replica': replica['name']}, int(replica['healthy'])) for replica in read_replicas['replicas']]),
+        ('db_replica_reads_total', 'counter', 'Сессии чтения, выданные на реплику',
+         [({'replica': replica['name']}, replica['reads']) for replica in read_replicas['replicas']]),
+        ('db_primary_reads_total', 'counter', 'Сессии чтения, отправленные в основную БД, по причинам',
+         [({'reason': reason}, count) for reason, count in read_replicas['primary_reads'].items()]),
+    ]
+
+
+registry.add_collector(_collect_service_metrics)
@@ -0,0 +1,92 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user_async
+from app.core.db import get_async_db
+from app.models.user import User
+from app.schemas.auth import LoginRequest, RefreshRequest, Token
+from app.services.password_pool import password_pool
+from app.services.principal_cache import Principal
+from app.services.rate_limit import LOGIN_PER_EMAIL, LOGIN_PER_IP, client_ip, rate_limiter
+from app.services.refresh_tokens import (
+    InvalidRefreshToken,
+    issue_tokens,
+    revoke_user_tokens,
+    rotate_refresh_token,
+)
+
+
+router = APIRouter()
+
+
+@router.post('/login', response_model=Token)
+async def login(credentials: LoginRequest, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Эндпоинт для логина пользователя (асинхронная версия).
+
+    Шаги те же, что и в app.api.v1.auth.login.
+    """
+
+    await rate_limiter.check_async(
+        (LOGIN_PER_IP, client_ip(request)),
+        (LOGIN_PER_EMAIL, credentials.email.lower()),
+    )
+
+    # Шаг 1: Ищем пользователя по email
+    result = await db.execute(select(User).where(User.email == credentials.email))
+    user = result.scalars().first()
+
+    # Шаг 2: Проверяем существование пользователя
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='Неверный email или пароль',
+        )
+
+    # Шаг 3: Проверяем пароль
+    # bcrypt - CPU-bound, поэтому выполняется в отдельном пуле процессов
+    if not await password_pool.verify_password_async(credentials.password, user.hashed_password):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='Неверный email или пароль',
+        )
+
+    # Шаг 4: Проверяем активность аккаунта
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail='Аккаунт деактивирован',
+        )
+
+    # Шаги 5-6: Создаём и возвращаем пару токенов
+    return await db.run_sync(issue_tokens, user)
+
+
+@router.post('/refresh', response_model=Token)
+async def refresh(refresh_in: RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Обменять refresh token на новую пару токенов (асинхронная версия).
+
+    Как app.api.v1.auth.refresh: без bcrypt, refresh token одноразовый.
+    """
+    try:
+        return await db.run_sync(rotate_refresh_token, refresh_in.refresh_token)
+    except InvalidRefreshToken:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='Невалидный или истёкший refresh token',
+        )
+
+
+@router.post('/revoke', status_code=status.HTTP_204_NO_CONTENT)
+async def revoke(
+    current_user: Principal = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Выйти на всех устройствах (асинхронная версия app.api.v1.auth.revoke).
+
+    Требует аутентификации.
+    """
+    await db.run_sync(revoke_user_tokens, current_user.id)
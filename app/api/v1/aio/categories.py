@@ -0,0 +1,301 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.api.deps import get_current_active_user_async
+from app.api.etag import etag_response
+from app.core.config import settings
+from app.core.db import get_async_db, get_async_read_db
+from app.models.category import Category, CategoryStats
+from app.schemas.batch import BatchGetRequest, BatchGetResult
+from app.schemas.category import (
+    CategoryChange,
+    CategoryCreate,
+    CategoryRead,
+    CategoryReadWithStats,
+    CategoryStatsRead,
+    CategoryUpdate,
+)
+from app.schemas.pagination import ChangesPage, Page
+from app.services.batch_get import in_request_order, unique_ids
+from app.services.catalog_cache import CATEGORIES, PRODUCTS, CachedBody, catalog_cache, make_etag
+from app.services.catalog_changes import CATEGORY, build_changes_page, build_changes_statement, record_changes
+from app.services.pagination import build_page, decode_cursor
+from app.services.principal_cache import Principal
+from app.services.serialization import CATEGORY_COLUMNS, dump_category_page
+
+
+router = APIRouter()
+
+
+@router.post('/', response_model=CategoryRead, status_code=status.HTTP_201_CREATED)
+async def create_category(
+    category_in: CategoryCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user_async)
+):
+    """
+    Создать новую категорию.
+
+    Требует аутентификации.
+    """
+    # Проверяем, не существует ли уже категория с таким именем
+    result = await db.execute(select(Category).where(Category.name == category_in.name))
+    if result.scalars().first():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Категория с таким именем уже существует",
+        )
+
+    db_category = Category(
+        name=category_in.name,
+        description=category_in.description,
+        stats=CategoryStats(),  # пустые агрегаты создаются вместе с категорией
+    )
+
+    db.add(db_category)
+    await db.flush()
+    await db.run_sync(record_changes, CATEGORY, 'create', [db_category.id])
+    await db.commit()
+    catalog_cache.invalidate(CATEGORIES)
+    await db.refresh(db_category)
+
+    return db_category
+
+
+@router.post('/batch-get', response_model=BatchGetResult[CategoryRead])
+async def batch_get_categories(batch_in: BatchGetRequest, db: AsyncSession = Depends(get_async_read_db)):
+    """
+    Получить категории по списку ID одним запросом (id IN (...)).
+
+    Категории возвращаются в порядке ids (повторы схлопываются),
+    ненайденные ID перечисляются в missing.
+    Публичный доступ.
+    """
+    ids = unique_ids(batch_in.ids)
+    result = await db.execute(select(Category).where(Category.id.in_(ids)))
+    items, missing = in_request_order(result.scalars().all(), ids)
+    return {'items': items, 'missing': missing}
+
+
+@router.get('/', response_model=Page[CategoryRead] | Page[CategoryReadWithStats])
+async def get_categories(
+    request: Request,
+    expand: Literal['stats'] | None = Query(
+        None,
+        description="stats - встроить агрегаты товаров категории",
+    ),
+    limit: int = Query(
+        settings.PAGE_SIZE_DEFAULT,
+        ge=1,
+        le=settings.PAGE_SIZE_MAX,
+        description="Размер страницы",
+    ),
+    cursor: str | None = Query(None, description="Курсор следующей страницы (next_cursor)"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Получить страницу категорий.
+
+    Ответ кэшируется в памяти и отдаётся с ETag (If-None-Match -> 304).
+    Пагинация по курсору (ключ - id).
+    С expand=stats агрегаты подгружаются одним дополнительным запросом
+    (selectinload). Такие ответы не кэшируются: агрегаты меняются
+    с каждой записью товаров, включая резервы и заказы.
+    При FAST_JSON_LISTS (без expand) выбираются только колонки, а страница
+    сериализуется скомпилированным TypeAdapter без ORM-объектов.
+    Публичный доступ.
+    """
+    cache_key = catalog_cache.make_key(CATEGORIES, request.url.path, request.query_params.multi_items())
+    if expand is None:
+        cached = catalog_cache.lookup(cache_key)
+        if cached is not None:
+            return etag_response(request, cached)
+
+    generation = catalog_cache.generation(CATEGORIES)
+    fast_path = settings.FAST_JSON_LISTS and expand is None
+    query = select(*CATEGORY_COLUMNS) if fast_path else select(Category)
+
+    if cursor is not None:
+        key = decode_cursor(cursor)
+        if key is None or not isinstance(key.get('id'), int):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='Невалидный курсор',
+            )
+        query = query.where(Category.id > key['id'])
+
+    if expand == 'stats':
+        query = query.options(selectinload(Category.stats))
+
+    result = await db.execute(query.order_by(Category.id).limit(limit + 1))
+    categories = result.all() if fast_path else result.scalars().all()
+
+    items, next_cursor = build_page(
+        categories,
+        limit,
+        lambda category: {'id': category.id},
+    )
+
+    if fast_path:
+        entry = catalog_cache.store(cache_key, dump_category_page(items, next_cursor), generation)
+        return etag_response(request, entry)
+
+    if expand == 'stats':
+        page = Page[CategoryReadWithStats](items=items, next_cursor=next_cursor)
+        body = page.model_dump_json().encode('utf-8')
+        return etag_response(request, CachedBody(body=body, etag=make_etag(body)))
+
+    page = Page[CategoryRead](items=items, next_cursor=next_cursor)
+
+    entry = catalog_cache.store(cache_key, page.model_dump_json().encode('utf-8'), generation)
+    return etag_response(request, entry)
+
+
+@router.get('/changes', response_model=ChangesPage[CategoryChange])
+async def get_category_changes(
+    since: int = Query(0, ge=0, description="seq последнего полученного изменения (next_since)"),
+    limit: int = Query(
+        settings.PAGE_SIZE_DEFAULT,
+        ge=1,
+        le=settings.PAGE_SIZE_MAX,
+        description="Размер страницы",
+    ),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Лента изменений категорий с seq > since по возрастанию seq.
+
+    Устроена так же, как GET /products/changes (в том числе задержка
+    CATALOG_CHANGES_LAG_SECONDS на PostgreSQL).
+    Публичный доступ.
+    """
+    result = await db.execute(build_changes_statement(Category, CATEGORY, since, limit + 1))
+    rows = result.all()
+    return build_changes_page(rows, limit, since, 'category')
+
+
+@router.get('/{category_id}', response_model=CategoryRead)
+async def get_category(category_id: int, request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    """
+    Получить категорию по ID.
+
+    Ответ кэшируется в памяти и отдаётся с ETag (If-None-Match -> 304).
+    Публичный доступ.
+    """
+    cache_key = catalog_cache.make_key(CATEGORIES, request.url.path, request.query_params.multi_items())
+    cached = catalog_cache.lookup(cache_key)
+    if cached is not None:
+        return etag_response(request, cached)
+
+    generation = catalog_cache.generation(CATEGORIES)
+    category = await db.get(Category, category_id)
+
+    if not category:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Категория не найдена',
+        )
+
+    body = CategoryRead.model_validate(category).model_dump_json().encode('utf-8')
+    return etag_response(request, catalog_cache.store(cache_key, body, generation))
+
+
+@router.get('/{category_id}/stats', response_model=CategoryStatsRead)
+async def get_category_stats(category_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    """
+    Агрегаты товаров категории: число товаров, суммарный остаток,
+    минимальная и максимальная цена.
+
+    Читается одна строка category_stats по первичному ключу - агрегаты
+    поддерживаются при записи товаров, products не сканируется.
+    Публичный доступ.
+    """
+    stats = await db.get(CategoryStats, category_id)
+
+    if not stats:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Категория не найдена',
+        )
+
+    return stats
+
+
+@router.put('/{category_id}', response_model=CategoryRead)
+async def update_category(
+    category_id: int,
+    category_in: CategoryUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user_async)
+):
+    """
+    Обновить категорию.
+
+    Требует аутентификации.
+    """
+    category = await db.get(Category, category_id)
+
+    if not category:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Категория не найдена',
+        )
+
+    # Обновляем только те поля, которые были переданы
+    update_data = category_in.model_dump(exclude_unset=True)
+
+    # Если обновляется name, проверяем уникальность
+    if 'name' in update_data:
+        result = await db.execute(
+            select(Category).where(
+                Category.name == update_data['name'],
+                Category.id != category_id,
+            )
+        )
+        if result.scalars().first():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Категория с таким именем уже существует",
+            )
+
+    for field, value in update_data.items():
+        setattr(category, field, value)
+    await db.run_sync(record_changes, CATEGORY, 'update', [category_id])
+
+    await db.commit()
+    # ответы товаров с expand=category содержат категорию
+    catalog_cache.invalidate(CATEGORIES, PRODUCTS)
+    await db.refresh(category)
+
+    return category
+
+
+@router.delete('/{category_id}', status_code=status.HTTP_204_NO_CONTENT)
+async def delete_category(
+    category_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user_async)
+):
+    """
+    Удалить категорию.
+
+    Требует аутентификации.
+    """
+    category = await db.get(Category, category_id)
+
+    if not category:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Категория не найдена',
+        )
+
+    await db.delete(category)
+    await db.run_sync(record_changes, CATEGORY, 'delete', [category_id])
+    await db.commit()
+    catalog_cache.invalidate(CATEGORIES, PRODUCTS)
+
+    return None
@@ -0,0 +1,161 @@
+from datetime import datetime
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.api.deps import get_current_active_user_async
+from app.core.config import settings
+from app.core.db import get_async_db
+from app.models.order import Order
+from app.schemas.order import CheckoutRequest, OrderRead, OrderSummary
+from app.schemas.pagination import Page
+from app.services.catalog_cache import PRODUCTS, catalog_cache
+from app.services.checkout import PriceChanged, checkout
+from app.services.pagination import build_page, decode_cursor
+from app.services.principal_cache import Principal
+from app.services.stock import ProductsNotFound, StockError
+
+
+router = APIRouter()
+
+
+def _checkout_error(exc: StockError) -> HTTPException:
+    ids = ', '.join(str(product_id) for product_id in exc.product_ids)
+    if isinstance(exc, ProductsNotFound):
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'Товары не найдены: {ids}',
+        )
+    if isinstance(exc, PriceChanged):
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f'Цена изменилась: {ids}',
+        )
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f'Недостаточно товара на складе: {ids}',
+    )
+
+
+def _decode_order_cursor(cursor: str) -> tuple[datetime, int]:
+    key = decode_cursor(cursor)
+    try:
+        if not isinstance(key['id'], int):
+            raise TypeError
+        return datetime.fromisoformat(key['created_at']), key['id']
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Невалидный курсор',
+        )
+
+
+@router.post('/', response_model=OrderRead, status_code=status.HTTP_201_CREATED)
+async def create_order(
+    checkout_in: CheckoutRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user_async)
+):
+    """
+    Оформить заказ.
+
+    Остатки всех позиций списываются и цены читаются одним запросом
+    UPDATE ... WHERE id IN (...), позиции вставляются одним executemany,
+    всё в одной транзакции - время оформления не растёт с размером корзины.
+    Если передана price позиции и она не совпадает с текущей ценой - 409.
+    Если товара не хватает - 409, если товара нет - 404; в обоих случаях
+    ничего не списывается.
+
+    Требует аутентификации.
+    """
+    try:
+        order = await db.run_sync(checkout, current_user.id, checkout_in.items)
+    except StockError as exc:
+        raise _checkout_error(exc)
+    catalog_cache.invalidate(PRODUCTS)
+
+    return order
+
+
+@router.get('/', response_model=Page[OrderSummary] | Page[OrderRead])
+async def get_orders(
+    limit: int = Query(
+        settings.PAGE_SIZE_DEFAULT,
+        ge=1,
+        le=settings.PAGE_SIZE_MAX,
+        description="Размер страницы",
+    ),
+    cursor: str | None = Query(None, description="Курсор следующей страницы"),
+    expand: Literal['items'] | None = Query(None, description="items - встроить позиции заказов"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user_async)
+):
+    """
+    История заказов текущего пользователя, новые первыми.
+
+    Пагинация по курсору (created_at, id) - индекс
+    ix_orders_user_id_created_at покрывает фильтр и сортировку.
+    Позиции заказов не встраиваются: с крупными корзинами страница
+    из 50 заказов - тысячи строк. С expand=items они подгружаются
+    одним дополнительным запросом.
+
+    Требует аутентификации.
+    """
+    query = select(Order).where(Order.user_id == current_user.id)
+
+    if cursor is not None:
+        created_at, order_id = _decode_order_cursor(cursor)
+        query = query.where(
+            or_(
+                Order.created_at < created_at,
+                and_(Order.created_at == created_at, Order.id < order_id),
+            )
+        )
+
+    if expand == 'items':
+        query = query.options(selectinload(Order.items))
+
+    result = await db.execute(
+        query.order_by(Order.created_at.desc(), Order.id.desc())
+        .limit(limit + 1)
+    )
+    orders = result.scalars().all()
+
+    items, next_cursor = build_page(
+        orders,
+        limit,
+        lambda order: {'created_at': order.created_at.isoformat(), 'id': order.id},
+    )
+    schema = OrderRead if expand == 'items' else OrderSummary
+    return Page[schema](items=items, next_cursor=next_cursor)
+
+
+@router.get('/{order_id}', response_model=OrderRead)
+async def get_order(
+    order_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user_async)
+):
+    """
+    Получить заказ по ID.
+
+    Доступны только собственные заказы.
+    Требует аутентификации.
+    """
+    result = await db.execute(
+        select(Order)
+        .options(selectinload(Order.items))
+        .where(Order.id == order_id, Order.user_id == current_user.id)
+    )
+    order = result.scalars().first()
+
+    if not order:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Заказ не найден',
+        )
+
+    return order
@@ -0,0 +1,610 @@
+from decimal import Decimal
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.api.deps import get_current_active_user_async, get_current_superuser_async
+from app.api.etag import etag_response
+from app.core.config import settings
+from app.core.db import get_async_db, get_async_read_db
+from app.models.category import Category
+from app.models.product import Product
+from app.schemas.batch import BatchGetRequest, BatchGetResult
+from app.schemas.pagination import ChangesPage, Page
+from app.schemas.product import (
+    BulkImportReport,
+    ProductBulkDelete,
+    ProductBulkResult,
+    ProductBulkSet,
+    ProductBulkUpdate,
+    ProductChange,
+    ProductCreate,
+    ProductRead,
+    ProductReadWithCategory,
+    ProductUpdate,
+    StockRequest,
+    StockResult,
+)
+from app.services.batch_get import in_request_order, unique_ids
+from app.services.catalog_cache import PRODUCTS, catalog_cache
+from app.services.catalog_changes import PRODUCT, build_changes_page, build_changes_statement, record_changes
+from app.services.category_stats import product_changed, product_state
+from app.services.pagination import build_page, decode_cursor
+from app.services.principal_cache import Principal
+from app.services.product_bulk import bulk_delete, bulk_update, count_matching
+from app.services.product_export import MEDIA_TYPES, iter_export_async
+from app.services.product_import import detect_format, insert_batch, iter_products
+from app.services.product_listing import (
+    ProductFilters,
+    ProductSort,
+    build_list_statement,
+    cursor_key,
+    parse_cursor_key,
+)
+from app.services.search import build_search_statement, tokenize_query
+from app.services.serialization import PRODUCT_COLUMNS, dump_product_page
+from app.services.stock import ProductsNotFound, StockError, release_stock, reserve_stock
+
+
+router = APIRouter()
+
+
+@router.post('/', response_model=ProductRead, status_code=status.HTTP_201_CREATED)
+async def create_product(
+    product_in: ProductCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user_async)
+):
+    """
+    Создать новый товар.
+
+    Требует аутентификации.
+    """
+    # Проверяем, существует ли категория
+    category = await db.get(Category, product_in.category_id)
+    if not category:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Категория не найдена",
+        )
+
+    db_product = Product(
+        name=product_in.name,
+        description=product_in.description,
+        price=product_in.price,
+        quantity=product_in.quantity,
+        category_id=product_in.category_id,
+    )
+
+    db.add(db_product)
+    # id нужен журналу изменений
+    await db.flush()
+    await db.run_sync(product_changed, None, product_state(db_product))
+    await db.run_sync(record_changes, PRODUCT, 'create', [db_product.id])
+    await db.commit()
+    catalog_cache.invalidate(PRODUCTS)
+    await db.refresh(db_product)
+
+    return db_product
+
+
+@router.post('/bulk', response_model=BulkImportReport)
+async def bulk_import_products(
+    request: Request,
+    format: str | None = Query(
+        None,
+        pattern='^(ndjson|csv)$',
+        description="Формат тела: ndjson или csv (по умолчанию - по Content-Type)",
+    ),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user_async)
+):
+    """
+    Массовый импорт товаров из NDJSON или CSV.
+
+    Строки валидируются через ProductCreate и вставляются пачками по
+    BULK_IMPORT_BATCH_SIZE: одна проверка категорий через IN и один
+    executemany на пачку, каждая пачка - отдельная транзакция.
+    В ответе - число вставленных и отклонённых строк с причинами.
+    Пачки вставляются через db.run_sync: executemany синхронного
+    драйвера выполняется одним вызовом без ORM-объектов.
+
+    Требует аутентификации.
+    """
+    fmt = format or detect_format(request.headers.get('content-type'))
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail='Ожидается application/x-ndjson или text/csv',
+        )
+
+    report = BulkImportReport()
+    max_errors = settings.BULK_IMPORT_MAX_ERRORS
+    batch = []
+
+    async for line_no, product in iter_products(request.stream(), fmt, report, max_errors):
+        batch.append((line_no, product))
+        if len(batch) >= settings.BULK_IMPORT_BATCH_SIZE:
+            await db.run_sync(insert_batch, batch, report, max_errors)
+            catalog_cache.invalidate(PRODUCTS)
+            batch = []
+
+    if batch:
+        await db.run_sync(insert_batch, batch, report, max_errors)
+        catalog_cache.invalidate(PRODUCTS)
+
+    return report
+
+
+def _stock_error(exc: StockError) -> HTTPException:
+    ids = ', '.join(str(product_id) for product_id in exc.product_ids)
+    if isinstance(exc, ProductsNotFound):
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'Товары не найдены: {ids}',
+        )
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f'Недостаточно товара на складе: {ids}',
+    )
+
+
+@router.post('/bulk-update', response_model=ProductBulkResult)
+async def bulk_update_products(
+    bulk_in: ProductBulkUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_superuser_async)
+):
+    """
+    Массово изменить товары под фильтром (category_id, ids, диапазон цены).
+    Асинхронная версия: куски выполняются через db.run_sync.
+
+    Операции: set (задать поля), multiply_price (умножить цену),
+    adjust_quantity (сдвинуть остаток, не ниже нуля). Выполняется
+    set-based: один UPDATE на кусок из BULK_UPDATE_CHUNK_SIZE строк,
+    каждый кусок - своя транзакция вместе с category_stats и журналом
+    изменений. С dry_run=true только считает подходящие товары.
+    Только для администраторов.
+    """
+    if bulk_in.dry_run:
+        matched = await db.run_sync(count_matching, bulk_in.filter)
+        return ProductBulkResult(matched=matched, affected=0, chunks=0, dry_run=True)
+
+    operation = bulk_in.operation
+    category_id = operation.values.category_id if isinstance(operation, ProductBulkSet) else None
+    if category_id is not None and await db.get(Category, category_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Категория не найдена",
+        )
+
+    try:
+        return await db.run_sync(bulk_update, bulk_in.filter, operation, settings.BULK_UPDATE_CHUNK_SIZE)
+    finally:
+        # Уже зафиксированные куски видны и при ошибке в следующем
+        catalog_cache.invalidate(PRODUCTS)
+
+
+@router.post('/bulk-delete', response_model=ProductBulkResult)
+async def bulk_delete_products(
+    bulk_in: ProductBulkDelete,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_superuser_async)
+):
+    """
+    Массово удалить товары под фильтром: один DELETE на кусок из
+    BULK_UPDATE_CHUNK_SIZE строк, как в bulk-update.
+    С dry_run=true только считает подходящие товары.
+    Только для администраторов.
+    """
+    if bulk_in.dry_run:
+        matched = await db.run_sync(count_matching, bulk_in.filter)
+        return ProductBulkResult(matched=matched, affected=0, chunks=0, dry_run=True)
+
+    try:
+        return await db.run_sync(bulk_delete, bulk_in.filter, settings.BULK_UPDATE_CHUNK_SIZE)
+    finally:
+        catalog_cache.invalidate(PRODUCTS)
+
+
+@router.post('/reserve', response_model=StockResult)
+async def reserve_products(
+    stock_in: StockRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user_async)
+):
+    """
+    Зарезервировать товары: атомарно уменьшить quantity по всем позициям.
+
+    Все позиции списываются одним условным UPDATE в одной транзакции
+    (quantity = quantity - n WHERE quantity >= n), без чтения остатков.
+    Если хотя бы одного товара не хватает - не списывается ничего (409),
+    если товара нет - 404. Повторы product_id суммируются.
+    В ответе - остатки после резервирования.
+
+    Требует аутентификации.
+    """
+    try:
+        levels = await db.run_sync(reserve_stock, stock_in.items)
+    except StockError as exc:
+        raise _stock_error(exc)
+    catalog_cache.invalidate(PRODUCTS)
+
+    return {'items': [{'product_id': product_id, 'quantity': quantity} for product_id, quantity in levels.items()]}
+
+
+@router.post('/release', response_model=StockResult)
+async def release_products(
+    stock_in: StockRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_superuser_async)
+):
+    """
+    Снять резерв: атомарно вернуть quantity по всем позициям.
+
+    Одним UPDATE в одной транзакции; если какого-то товара нет (404),
+    не возвращается ничего. В ответе - остатки после возврата.
+
+    Возврат не сверяется с резервом и может увеличить остаток на любую
+    величину, поэтому доступен только администраторам (как массовые
+    изменения).
+
+    Требует прав администратора.
+    """
+    try:
+        levels = await db.run_sync(release_stock, stock_in.items)
+    except StockError as exc:
+        raise _stock_error(exc)
+    catalog_cache.invalidate(PRODUCTS)
+
+    return {'items': [{'product_id': product_id, 'quantity': quantity} for product_id, quantity in levels.items()]}
+
+
+@router.post('/batch-get', response_model=BatchGetResult[ProductRead] | BatchGetResult[ProductReadWithCategory])
+async def batch_get_products(
+    batch_in: BatchGetRequest,
+    expand: Literal['category'] | None = Query(None, description="category - встроить категорию товара"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Получить товары по списку ID одним запросом (id IN (...)).
+
+    Товары возвращаются в порядке ids (повторы схлопываются), ненайденные
+    ID перечисляются в missing. Не больше BATCH_GET_MAX_IDS id за запрос.
+    С expand=category категории подгружаются одним дополнительным
+    запросом (selectinload).
+    Публичный доступ.
+    """
+    ids = unique_ids(batch_in.ids)
+    query = select(Product).where(Product.id.in_(ids))
+
+    if expand == 'category':
+        query = query.options(selectinload(Product.category))
+
+    result = await db.execute(query)
+    items, missing = in_request_order(result.scalars().all(), ids)
+
+    schema = ProductReadWithCategory if expand == 'category' else ProductRead
+    return BatchGetResult[schema](items=items, missing=missing)
+
+
+@router.get('/', response_model=Page[ProductRead] | Page[ProductReadWithCategory])
+async def get_products(
+    request: Request,
+    category_id: int | None = Query(None, description="Фильтр по ID категории"),
+    min_price: Decimal | None = Query(None, ge=0, description="Цена не ниже"),
+    max_price: Decimal | None = Query(None, ge=0, description="Цена не выше"),
+    in_stock: bool | None = Query(None, description="true - только в наличии, false - только отсутствующие"),
+    name_prefix: str | None = Query(None, min_length=1, max_length=200, description="Начало названия"),
+    sort: ProductSort = Query('id', description="Поле сортировки, '-' - по убыванию"),
+    expand: Literal['category'] | None = Query(None, description="category - встроить категорию товара"),
+    limit: int = Query(
+        settings.PAGE_SIZE_DEFAULT,
+        ge=1,
+        le=settings.PAGE_SIZE_MAX,
+        description="Размер страницы",
+    ),
+    cursor: str | None = Query(None, description="Курсор следующей страницы (next_cursor)"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Получить страницу товаров.
+
+    Фильтры: category_id, диапазон цены (min_price/max_price), in_stock,
+    name_prefix (начало названия, с учётом регистра). Сортировка sort:
+    id, price, created_at или name, '-' в начале - по убыванию; при равных
+    значениях порядок по id. Под каждую сортировку есть индекс, с фильтром
+    по категории - составной (category_id, поле).
+    С expand=category категории подгружаются одним дополнительным
+    запросом (selectinload) и встраиваются в ответ.
+    При FAST_JSON_LISTS (без expand) выбираются только колонки, а страница
+    сериализуется скомпилированным TypeAdapter без ORM-объектов.
+    Ответ кэшируется в памяти и отдаётся с ETag (If-None-Match -> 304).
+    Пагинация по курсору: ключ (значение сортировки, id), поэтому время
+    выборки страницы не зависит от её глубины (в отличие от OFFSET).
+    Курсор действителен только с теми же category_id и sort.
+    Публичный доступ.
+    """
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='min_price больше max_price',
+        )
+
+    cache_key = catalog_cache.make_key(PRODUCTS, request.url.path, request.query_params.multi_items())
+    cached = catalog_cache.lookup(cache_key)
+    if cached is not None:
+        return etag_response(request, cached)
+
+    after = None
+    if cursor is not None:
+        after = parse_cursor_key(decode_cursor(cursor), sort, category_id)
+        if after is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='Невалидный курсор',
+            )
+
+    generation = catalog_cache.generation(PRODUCTS)
+    fast_path = settings.FAST_JSON_LISTS and expand is None
+    filters = ProductFilters(
+        category_id=category_id,
+        min_price=min_price,
+        max_price=max_price,
+        in_stock=in_stock,
+        name_prefix=name_prefix,
+    )
+    query = build_list_statement(
+        db.bind.dialect.name,
+        filters,
+        sort,
+        after,
+        limit + 1,
+        *(PRODUCT_COLUMNS if fast_path else ()),
+    )
+
+    if expand == 'category':
+        query = query.options(selectinload(Product.category))
+
+    result = await db.execute(query)
+    products = result.all() if fast_path else result.scalars().all()
+
+    items, next_cursor = build_page(
+        products,
+        limit,
+        lambda product: cursor_key(product, sort, category_id),
+    )
+
+    if fast_path:
+        entry = catalog_cache.store(cache_key, dump_product_page(items, next_cursor), generation)
+        return etag_response(request, entry)
+
+    schema = ProductReadWithCategory if expand == 'category' else ProductRead
+    page = Page[schema](items=items, next_cursor=next_cursor)
+
+    entry = catalog_cache.store(cache_key, page.model_dump_json().encode('utf-8'), generation)
+    return etag_response(request, entry)
+
+
+@router.get('/export')
+def export_products(
+    format: str = Query(
+        'ndjson',
+        pattern='^(ndjson|csv)$',
+        description="Формат выгрузки: ndjson или csv",
+    ),
+    current_user: Principal = Depends(get_current_active_user_async)
+):
+    """
+    Потоковая выгрузка всего каталога товаров в NDJSON или CSV.
+
+    Строки читаются порциями через серверный курсор и сериализуются по мере
+    отправки, поэтому память не зависит от размера таблицы.
+
+    Требует аутентификации.
+    """
+    return StreamingResponse(
+        iter_export_async(format),
+        media_type=MEDIA_TYPES[format],
+        headers={'Content-Disposition': f'attachment; filename="products.{format}"'},
+    )
+
+
+@router.get('/search', response_model=Page[ProductRead])
+async def search_products(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200, description="Поисковый запрос"),
+    limit: int = Query(
+        settings.PAGE_SIZE_DEFAULT,
+        ge=1,
+        le=settings.PAGE_SIZE_MAX,
+        description="Размер страницы",
+    ),
+    cursor: str | None = Query(None, description="Курсор следующей страницы (next_cursor)"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Полнотекстовый поиск товаров по name и description.
+
+    Результаты ранжированы по релевантности (совпадение в name весит больше),
+    последнее слово запроса ищется по префиксу.
+    SQLite - FTS5 (products_fts), PostgreSQL - tsvector + GIN.
+    Публичный доступ.
+    """
+    cache_key = catalog_cache.make_key(PRODUCTS, request.url.path, request.query_params.multi_items())
+    cached = catalog_cache.lookup(cache_key)
+    if cached is not None:
+        return etag_response(request, cached)
+
+    generation = catalog_cache.generation(PRODUCTS)
+
+    # Ранжированную выдачу листаем по смещению: ранг вычисляется
+    # для всех совпадений при любом способе пагинации
+    offset = 0
+    if cursor is not None:
+        key = decode_cursor(cursor)
+        if key is None or not isinstance(key.get('offset'), int) or key['offset'] < 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='Невалидный курсор',
+            )
+        offset = key['offset']
+
+    products = []
+    tokens = tokenize_query(q)
+    if tokens:
+        statement, params = build_search_statement(db.bind.dialect.name, tokens, limit + 1, offset)
+        result = await db.execute(select(Product).from_statement(statement), params)
+        products = result.scalars().all()
+
+    items, next_cursor = build_page(
+        products,
+        limit,
+        lambda product: {'offset': offset + limit},
+    )
+    page = Page[ProductRead](items=items, next_cursor=next_cursor)
+
+    entry = catalog_cache.store(cache_key, page.model_dump_json().encode('utf-8'), generation)
+    return etag_response(request, entry)
+
+
+@router.get('/changes', response_model=ChangesPage[ProductChange])
+async def get_product_changes(
+    since: int = Query(0, ge=0, description="seq последнего полученного изменения (next_since)"),
+    limit: int = Query(
+        settings.PAGE_SIZE_DEFAULT,
+        ge=1,
+        le=settings.PAGE_SIZE_MAX,
+        description="Размер страницы",
+    ),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Лента изменений товаров: создания, изменения и удаления с seq > since
+    по возрастанию seq.
+
+    Журнал пишется в той же транзакции, что и сам товар. seq выдаётся
+    при записи, а не при фиксации, поэтому на БД, где транзакции
+    фиксируются не по порядку seq (PostgreSQL), изменение попадает
+    в ленту через CATALOG_CHANGES_LAG_SECONDS - иначе клиент с большим
+    next_since пропустил бы его. На SQLite задержки нет.
+    В элементе - текущее состояние товара (None, если он удалён).
+    Начав с since=0, клиент получает весь каталог; дальше передаёт
+    next_since и забирает только новые изменения.
+    Публичный доступ.
+    """
+    result = await db.execute(build_changes_statement(Product, PRODUCT, since, limit + 1))
+    rows = result.all()
+    return build_changes_page(rows, limit, since, 'product')
+
+
+@router.get('/{product_id}', response_model=ProductRead | ProductReadWithCategory)
+async def get_product(
+    product_id: int,
+    request: Request,
+    expand: Literal['category'] | None = Query(None, description="category - встроить категорию товара"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Получить товар по ID.
+
+    С expand=category категория загружается тем же запросом (joinedload).
+    Ответ кэшируется в памяти и отдаётся с ETag (If-None-Match -> 304).
+    Публичный доступ.
+    """
+    cache_key = catalog_cache.make_key(PRODUCTS, request.url.path, request.query_params.multi_items())
+    cached = catalog_cache.lookup(cache_key)
+    if cached is not None:
+        return etag_response(request, cached)
+
+    generation = catalog_cache.generation(PRODUCTS)
+    options = [joinedload(Product.category)] if expand == 'category' else []
+    product = await db.get(Product, product_id, options=options)
+
+    if not product:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Товар не найден',
+        )
+
+    schema = ProductReadWithCategory if expand == 'category' else ProductRead
+    body = schema.model_validate(product).model_dump_json().encode('utf-8')
+    return etag_response(request, catalog_cache.store(cache_key, body, generation))
+
+
+@router.put('/{product_id}', response_model=ProductRead)
+async def update_product(
+    product_id: int,
+    product_in: ProductUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user_async)
+):
+    """
+    Обновить товар.
+
+    Требует аутентификации.
+    """
+    product = await db.get(Product, product_id)
+
+    if not product:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Товар не найден',
+        )
+
+    # Обновляем только те поля, которые были переданы
+    update_data = product_in.model_dump(exclude_unset=True)
+
+    # Если обновляется category_id, проверяем существование категории
+    if 'category_id' in update_data:
+        category = await db.get(Category, update_data['category_id'])
+        if not category:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Категория не найдена",
+            )
+
+    old_state = product_state(product)
+    for field, value in update_data.items():
+        setattr(product, field, value)
+    await db.run_sync(product_changed, old_state, product_state(product))
+    await db.run_sync(record_changes, PRODUCT, 'update', [product.id])
+
+    await db.commit()
+    catalog_cache.invalidate(PRODUCTS)
+    await db.refresh(product)
+
+    return product
+
+
+@router.delete('/{product_id}', status_code=status.HTTP_204_NO_CONTENT)
+async def delete_product(
+    product_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user_async)
+):
+    """
+    Удалить товар.
+
+    Требует аутентификации.
+    """
+    product = await db.get(Product, product_id)
+
+    if not product:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Товар не найден',
+        )
+
+    old_state = product_state(product)
+    await db.delete(product)
+    await db.run_sync(product_changed, old_state, None)
+    await db.run_sync(record_changes, PRODUCT, 'delete', [product_id])
+    await db.commit()
+    catalog_cache.invalidate(PRODUCTS)
+
+    return None
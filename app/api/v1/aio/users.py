@@ -0,0 +1,94 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_active_user_async
+from app.core.db import get_async_db
+from app.models.user import User
+from app.schemas.batch import BatchGetRequest, BatchGetResult
+from app.schemas.user import UserCreate, UserRead
+from app.services.batch_get import in_request_order, unique_ids
+from app.services.password_pool import password_pool
+from app.services.principal_cache import Principal
+from app.services.rate_limit import REGISTER_PER_IP, client_ip, rate_limiter
+
+
+router = APIRouter()
+
+
+@router.post('/', response_model=UserRead, status_code=status.HTTP_201_CREATED)
+async def create_user(user_in: UserCreate, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Регистрация пользователя (асинхронная версия).
+
+    Попытки ограничены по IP, как в app.api.v1.users.create_user.
+    """
+    await rate_limiter.check_async((REGISTER_PER_IP, client_ip(request)))
+
+    result = await db.execute(select(User).where(User.email == user_in.email))
+    existing_user = result.scalars().first()
+    if existing_user:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Пользователь с таким email уже существует",
+        )
+
+    db_user = User(
+        email=user_in.email,
+        hashed_password=await password_pool.hash_password_async(user_in.password),
+    )
+
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+
+    return db_user
+
+
+@router.post('/batch-get', response_model=BatchGetResult[UserRead])
+async def batch_get_users(batch_in: BatchGetRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Получить пользователей по списку ID одним запросом (id IN (...)).
+
+    Пользователи возвращаются в порядке ids (повторы схлопываются),
+    ненайденные ID перечисляются в missing.
+    """
+    ids = unique_ids(batch_in.ids)
+    result = await db.execute(select(User).where(User.id.in_(ids)))
+    items, missing = in_request_order(result.scalars().all(), ids)
+    return {'items': items, 'missing': missing}
+
+
+@router.get('/me', response_model=UserRead)
+async def get_current_user_info(
+    current_user: Principal = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Получить информацию о текущем аутентифицированном пользователе.
+
+    Требует токен в заголовке: Authorization: Bearer <token>
+    """
+    # В Principal только поля для проверки доступа, полный профиль читаем из БД
+    user = await db.get(User, current_user.id)
+
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Пользователь не найден',
+        )
+
+    return user
+
+
+@router.get('/{user_id}', response_model=UserRead)
+async def get_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    user = await db.get(User, user_id)
+
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Пользователь не найден',
+        )
+
+    return user
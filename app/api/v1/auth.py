@@ -1,32 +1,49 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 
+from app.api.deps import get_current_user
 from app.core.db import get_db
 from app.models.user import User
-from app.schemas.auth import LoginRequest, Token
-from app.services.auth import verify_password
-from app.services.jwt import create_access_token
+from app.schemas.auth import LoginRequest, RefreshRequest, Token
+from app.services.password_pool import password_pool
+from app.services.principal_cache import Principal
+from app.services.rate_limit import LOGIN_PER_EMAIL, LOGIN_PER_IP, client_ip, rate_limiter
+from app.services.refresh_tokens import (
+    InvalidRefreshToken,
+    issue_tokens,
+    revoke_user_tokens,
+    rotate_refresh_token,
+)
 
 
 router = APIRouter()
 
 
 @router.post('/login', response_model=Token)
-def login(credentials: LoginRequest, db: Session = Depends(get_db)):
+def login(credentials: LoginRequest, request: Request, db: Session = Depends(get_db)):
     """
     Эндпоинт для логина пользователя.
 
-    Принимает email и пароль, возвращает JWT токен.
+    Принимает email и пароль, возвращает короткий access token
+    и refresh token для POST /auth/refresh.
+
+    Попытки ограничены по IP и по email (LOGIN_RATE_LIMIT_*):
+    сверх лимита - 429 + Retry-After, до обращения к БД и bcrypt.
 
     Шаги:
     1. Ищем пользователя по email в базе данных
     2. Проверяем, существует ли пользователь
     3. Проверяем правильность пароля
     4. Проверяем, активен ли аккаунт
-    5. Создаём JWT токен с данными пользователя
-    6. Возвращаем токен
+    5. Создаём пару токенов (refresh token записывается в БД)
+    6. Возвращаем токены
     """
 
+    rate_limiter.check(
+        (LOGIN_PER_IP, client_ip(request)),
+        (LOGIN_PER_EMAIL, credentials.email.lower()),
+    )
+
     # Шаг 1: Ищем пользователя по email
     user = db.query(User).filter(User.email == credentials.email).first()
 
@@ -37,8 +54,8 @@ def login(credentials: LoginRequest, db: Session = Depends(get_db)):
             detail='Неверный email или пароль',
         )
 
-    # Шаг 3: Проверяем пароль
-    if not verify_password(credentials.password, user.hashed_password):
+    # Шаг 3: Проверяем пароль (bcrypt выполняется в отдельном пуле процессов)
+    if not password_pool.verify_password(credentials.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail='Неверный email или пароль',
@@ -51,13 +68,37 @@ def login(credentials: LoginRequest, db: Session = Depends(get_db)):
             detail='Аккаунт деактивирован',
         )
 
-    # Шаг 5: Создаём JWT токен
-    access_token = create_access_token(
-        data={
-            'user_id': user.id,
-            'email': user.email,
-        }
-    )
+    # Шаги 5-6: Создаём и возвращаем пару токенов
+    return issue_tokens(db, user)
+
+
+@router.post('/refresh', response_model=Token)
+def refresh(refresh_in: RefreshRequest, db: Session = Depends(get_db)):
+    """
+    Обменять refresh token на новую пару токенов.
+
+    Пароль не проверяется (без bcrypt), поэтому продление сессии
+    намного дешевле логина. Refresh token одноразовый: в ответе новый,
+    а повторное предъявление старого отзывает все токены пользователя.
+    """
+    try:
+        return rotate_refresh_token(db, refresh_in.refresh_token)
+    except InvalidRefreshToken:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='Невалидный или истёкший refresh token',
+        )
 
-    # Шаг 6: Возвращаем токен
-    return Token(access_token=access_token, token_type='bearer')
+
+@router.post('/revoke', status_code=status.HTTP_204_NO_CONTENT)
+def revoke(
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Выйти на всех устройствах: отзывает все access и refresh токены
+    текущего пользователя (увеличивает users.token_version).
+
+    Требует аутентификации.
+    """
+    revoke_user_tokens(db, current_user.id)
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse
+
+from app.api.etag import is_not_modified
+from app.core.config import settings
+from app.services.catalog_snapshot import IDENTITY, catalog_snapshots
+
+
+router = APIRouter()
+
+
+@router.get('/snapshot')
+def get_catalog_snapshot(request: Request):
+    """
+    Весь каталог одним JSON: {"version", "generated_at", "categories", "products"}.
+
+    Отдаётся готовый файл, собранный фоновой задачей после изменений
+    каталога, - без запросов к БД. Сжатие (br или gzip) выбирается по
+    Accept-Encoding, поддерживаются If-None-Match (304) и Range
+    (докачка с If-Range). Изменения после снапшота - в
+    /products/changes и /categories/changes с since=version.
+    """
+    snapshot = catalog_snapshots.current
+    if snapshot is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Снапшот каталога ещё не собран",
+            headers={'Retry-After': str(max(1, round(settings.CATALOG_SNAPSHOT_POLL_SECONDS)))},
+        )
+
+    encoding, file = snapshot.choose(request.headers.get('accept-encoding', ''))
+    headers = {
+        'ETag': file.etag,
+        'Vary': 'Accept-Encoding',
+        'Cache-Control': 'no-cache',
+        'X-Catalog-Version': str(snapshot.version),
+    }
+    if is_not_modified(request, file.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if encoding != IDENTITY:
+        headers['Content-Encoding'] = encoding
+    return FileResponse(file.path, media_type='application/json', headers=headers)
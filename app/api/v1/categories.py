@@ -1,11 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from sqlalchemy.orm import Session, selectinload
 
 from app.api.deps import get_current_active_user
-from app.core.db import get_db
-from app.models.category import Category
-from app.models.user import User
-from app.schemas.category import CategoryCreate, CategoryRead, CategoryUpdate
+from app.api.etag import etag_response
+from app.core.config import settings
+from app.core.db import get_db, get_read_db
+from app.models.category import Category, CategoryStats
+from app.schemas.batch import BatchGetRequest, BatchGetResult
+from app.schemas.category import (
+    CategoryChange,
+    CategoryCreate,
+    CategoryRead,
+    CategoryReadWithStats,
+    CategoryStatsRead,
+    CategoryUpdate,
+)
+from app.schemas.pagination import ChangesPage, Page
+from app.services.batch_get import in_request_order, unique_ids
+from app.services.catalog_cache import CATEGORIES, PRODUCTS, CachedBody, catalog_cache, make_etag
+from app.services.catalog_changes import CATEGORY, build_changes_page, build_changes_statement, record_changes
+from app.services.pagination import build_page, decode_cursor
+from app.services.principal_cache import Principal
+from app.services.serialization import CATEGORY_COLUMNS, dump_category_page
 
 
 router = APIRouter()
@@ -15,7 +33,7 @@ router = APIRouter()
 def create_category(
     category_in: CategoryCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Создать новую категорию.
@@ -33,33 +51,143 @@ def create_category(
     db_category = Category(
         name=category_in.name,
         description=category_in.description,
+        stats=CategoryStats(),  # пустые агрегаты создаются вместе с категорией
     )
 
     db.add(db_category)
+    db.flush()
+    record_changes(db, CATEGORY, 'create', [db_category.id])
     db.commit()
+    catalog_cache.invalidate(CATEGORIES)
     db.refresh(db_category)
 
     return db_category
 
 
-@router.get('/', response_model=list[CategoryRead])
-def get_categories(db: Session = Depends(get_db)):
+@router.post('/batch-get', response_model=BatchGetResult[CategoryRead])
+def batch_get_categories(batch_in: BatchGetRequest, db: Session = Depends(get_read_db)):
     """
-    Получить список всех категорий.
+    Получить категории по списку ID одним запросом (id IN (...)).
 
+    Категории возвращаются в порядке ids (повторы схлопываются),
+    ненайденные ID перечисляются в missing.
+    Публичный доступ.
+    """
+    ids = unique_ids(batch_in.ids)
+    categories = db.query(Category).filter(Category.id.in_(ids)).all()
+    items, missing = in_request_order(categories, ids)
+    return {'items': items, 'missing': missing}
+
+
+@router.get('/', response_model=Page[CategoryRead] | Page[CategoryReadWithStats])
+def get_categories(
+    request: Request,
+    expand: Literal['stats'] | None = Query(
+        None,
+        description="stats - встроить агрегаты товаров категории",
+    ),
+    limit: int = Query(
+        settings.PAGE_SIZE_DEFAULT,
+        ge=1,
+        le=settings.PAGE_SIZE_MAX,
+        description="Размер страницы",
+    ),
+    cursor: str | None = Query(None, description="Курсор следующей страницы (next_cursor)"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Получить страницу категорий.
+
+    Ответ кэшируется в памяти и отдаётся с ETag (If-None-Match -> 304).
+    Пагинация по курсору (ключ - id).
+    С expand=stats агрегаты подгружаются одним дополнительным запросом
+    (selectinload). Такие ответы не кэшируются: агрегаты меняются
+    с каждой записью товаров, включая резервы и заказы.
+    При FAST_JSON_LISTS (без expand) выбираются только колонки, а страница
+    сериализуется скомпилированным TypeAdapter без ORM-объектов.
     Публичный доступ.
     """
-    categories = db.query(Category).all()
-    return categories
+    cache_key = catalog_cache.make_key(CATEGORIES, request.url.path, request.query_params.multi_items())
+    if expand is None:
+        cached = catalog_cache.lookup(cache_key)
+        if cached is not None:
+            return etag_response(request, cached)
+
+    generation = catalog_cache.generation(CATEGORIES)
+    fast_path = settings.FAST_JSON_LISTS and expand is None
+    query = db.query(*CATEGORY_COLUMNS) if fast_path else db.query(Category)
+
+    if cursor is not None:
+        key = decode_cursor(cursor)
+        if key is None or not isinstance(key.get('id'), int):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='Невалидный курсор',
+            )
+        query = query.filter(Category.id > key['id'])
+
+    if expand == 'stats':
+        query = query.options(selectinload(Category.stats))
+
+    categories = query.order_by(Category.id).limit(limit + 1).all()
+
+    items, next_cursor = build_page(
+        categories,
+        limit,
+        lambda category: {'id': category.id},
+    )
+
+    if fast_path:
+        entry = catalog_cache.store(cache_key, dump_category_page(items, next_cursor), generation)
+        return etag_response(request, entry)
+
+    if expand == 'stats':
+        page = Page[CategoryReadWithStats](items=items, next_cursor=next_cursor)
+        body = page.model_dump_json().encode('utf-8')
+        return etag_response(request, CachedBody(body=body, etag=make_etag(body)))
+
+    page = Page[CategoryRead](items=items, next_cursor=next_cursor)
+
+    entry = catalog_cache.store(cache_key, page.model_dump_json().encode('utf-8'), generation)
+    return etag_response(request, entry)
+
+
+@router.get('/changes', response_model=ChangesPage[CategoryChange])
+def get_category_changes(
+    since: int = Query(0, ge=0, description="seq последнего полученного изменения (next_since)"),
+    limit: int = Query(
+        settings.PAGE_SIZE_DEFAULT,
+        ge=1,
+        le=settings.PAGE_SIZE_MAX,
+        description="Размер страницы",
+    ),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Лента изменений категорий с seq > since по возрастанию seq.
+
+    Устроена так же, как GET /products/changes (в том числе задержка
+    CATALOG_CHANGES_LAG_SECONDS на PostgreSQL).
+    Публичный доступ.
+    """
+    rows = db.execute(build_changes_statement(Category, CATEGORY, since, limit + 1)).all()
+    return build_changes_page(rows, limit, since, 'category')
 
 
 @router.get('/{category_id}', response_model=CategoryRead)
-def get_category(category_id: int, db: Session = Depends(get_db)):
+def get_category(category_id: int, request: Request, db: Session = Depends(get_read_db)):
     """
     Получить категорию по ID.
 
+    Ответ кэшируется в памяти и отдаётся с ETag (If-None-Match -> 304).
     Публичный доступ.
     """
+    cache_key = catalog_cache.make_key(CATEGORIES, request.url.path, request.query_params.multi_items())
+    cached = catalog_cache.lookup(cache_key)
+    if cached is not None:
+        return etag_response(request, cached)
+
+    generation = catalog_cache.generation(CATEGORIES)
     category = db.query(Category).filter(Category.id == category_id).first()
 
     if not category:
@@ -68,7 +196,29 @@ def get_category(category_id: int, db: Session = Depends(get_db)):
             detail='Категория не найдена',
         )
 
-    return category
+    body = CategoryRead.model_validate(category).model_dump_json().encode('utf-8')
+    return etag_response(request, catalog_cache.store(cache_key, body, generation))
+
+
+@router.get('/{category_id}/stats', response_model=CategoryStatsRead)
+def get_category_stats(category_id: int, db: Session = Depends(get_read_db)):
+    """
+    Агрегаты товаров категории: число товаров, суммарный остаток,
+    минимальная и максимальная цена.
+
+    Читается одна строка category_stats по первичному ключу - агрегаты
+    поддерживаются при записи товаров, products не сканируется.
+    Публичный доступ.
+    """
+    stats = db.get(CategoryStats, category_id)
+
+    if not stats:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Категория не найдена',
+        )
+
+    return stats
 
 
 @router.put('/{category_id}', response_model=CategoryRead)
@@ -76,7 +226,7 @@ def update_category(
     category_id: int,
     category_in: CategoryUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Обновить категорию.
@@ -108,8 +258,11 @@ def update_category(
 
     for field, value in update_data.items():
         setattr(category, field, value)
+    record_changes(db, CATEGORY, 'update', [category_id])
 
     db.commit()
+    # ответы товаров с expand=category содержат категорию
+    catalog_cache.invalidate(CATEGORIES, PRODUCTS)
     db.refresh(category)
 
     return category
@@ -119,7 +272,7 @@ def update_category(
 def delete_category(
     category_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Удалить категорию.
@@ -135,6 +288,8 @@ def delete_category(
         )
 
     db.delete(category)
+    record_changes(db, CATEGORY, 'delete', [category_id])
     db.commit()
+    catalog_cache.invalidate(CATEGORIES, PRODUCTS)
 
     return None
@@ -1,12 +1,52 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-
-from app.api.deps import get_current_active_user
-from app.core.db import get_db
+from decimal import Decimal
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app.api.deps import get_current_active_user, get_current_superuser
+from app.api.etag import etag_response
+from app.core.config import settings
+from app.core.db import get_db, get_read_db
 from app.models.category import Category
 from app.models.product import Product
-from app.models.user import User
-from app.schemas.product import ProductCreate, ProductRead, ProductUpdate
+from app.schemas.batch import BatchGetRequest, BatchGetResult
+from app.schemas.pagination import ChangesPage, Page
+from app.schemas.product import (
+    BulkImportReport,
+    ProductBulkDelete,
+    ProductBulkResult,
+    ProductBulkSet,
+    ProductBulkUpdate,
+    ProductChange,
+    ProductCreate,
+    ProductRead,
+    ProductReadWithCategory,
+    ProductUpdate,
+    StockRequest,
+    StockResult,
+)
+from app.services.batch_get import in_request_order, unique_ids
+from app.services.catalog_cache import PRODUCTS, catalog_cache
+from app.services.catalog_changes import PRODUCT, build_changes_page, build_changes_statement, record_changes
+from app.services.category_stats import product_changed, product_state
+from app.services.pagination import build_page, decode_cursor
+from app.services.principal_cache import Principal
+from app.services.product_bulk import bulk_delete, bulk_update, count_matching
+from app.services.product_export import MEDIA_TYPES, iter_export
+from app.services.product_import import detect_format, insert_batch, iter_products
+from app.services.product_listing import (
+    ProductFilters,
+    ProductSort,
+    build_list_statement,
+    cursor_key,
+    parse_cursor_key,
+)
+from app.services.search import build_search_statement, tokenize_query
+from app.services.serialization import PRODUCT_COLUMNS, dump_product_page
+from app.services.stock import ProductsNotFound, StockError, release_stock, reserve_stock
 
 
 router = APIRouter()
@@ -16,7 +56,7 @@ router = APIRouter()
 def create_product(
     product_in: ProductCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Создать новый товар.
@@ -40,41 +80,449 @@ def create_product(
     )
 
     db.add(db_product)
+    # id нужен журналу изменений
+    db.flush()
+    product_changed(db, None, product_state(db_product))
+    record_changes(db, PRODUCT, 'create', [db_product.id])
     db.commit()
+    catalog_cache.invalidate(PRODUCTS)
     db.refresh(db_product)
 
     return db_product
 
 
-@router.get('/', response_model=list[ProductRead])
+@router.post('/bulk', response_model=BulkImportReport)
+async def bulk_import_products(
+    request: Request,
+    format: str | None = Query(
+        None,
+        pattern='^(ndjson|csv)$',
+        description="Формат тела: ndjson или csv (по умолчанию - по Content-Type)",
+    ),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Массовый импорт товаров из NDJSON или CSV.
+
+    Строки валидируются через ProductCreate и вставляются пачками по
+    BULK_IMPORT_BATCH_SIZE: одна проверка категорий через IN и один
+    executemany на пачку, каждая пачка - отдельная транзакция.
+    В ответе - число вставленных и отклонённых строк с причинами.
+    Тело читается потоком (обработчик асинхронный), а работа с БД
+    выполняется в threadpool - синхронная сессия не блокирует event loop.
+
+    Требует аутентификации.
+    """
+    fmt = format or detect_format(request.headers.get('content-type'))
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail='Ожидается application/x-ndjson или text/csv',
+        )
+
+    report = BulkImportReport()
+    max_errors = settings.BULK_IMPORT_MAX_ERRORS
+    batch = []
+
+    async for line_no, product in iter_products(request.stream(), fmt, report, max_errors):
+        batch.append((line_no, product))
+        if len(batch) >= settings.BULK_IMPORT_BATCH_SIZE:
+            await run_in_threadpool(insert_batch, db, batch, report, max_errors)
+            catalog_cache.invalidate(PRODUCTS)
+            batch = []
+
+    if batch:
+        await run_in_threadpool(insert_batch, db, batch, report, max_errors)
+        catalog_cache.invalidate(PRODUCTS)
+
+    return report
+
+
+def _stock_error(exc: StockError) -> HTTPException:
+    ids = ', '.join(str(product_id) for product_id in exc.product_ids)
+    if isinstance(exc, ProductsNotFound):
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'Товары не найдены: {ids}',
+        )
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f'Недостаточно товара на складе: {ids}',
+    )
+
+
+@router.post('/bulk-update', response_model=ProductBulkResult)
+def bulk_update_products(
+    bulk_in: ProductBulkUpdate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_superuser)
+):
+    """
+    Массово изменить товары под фильтром (category_id, ids, диапазон цены).
+
+    Операции: set (задать поля), multiply_price (умножить цену),
+    adjust_quantity (сдвинуть остаток, не ниже нуля). Выполняется
+    set-based: один UPDATE на кусок из BULK_UPDATE_CHUNK_SIZE строк,
+    каждый кусок - своя транзакция вместе с category_stats и журналом
+    изменений. С dry_run=true только считает подходящие товары.
+    Только для администраторов.
+    """
+    if bulk_in.dry_run:
+        matched = count_matching(db, bulk_in.filter)
+        return ProductBulkResult(matched=matched, affected=0, chunks=0, dry_run=True)
+
+    operation = bulk_in.operation
+    category_id = operation.values.category_id if isinstance(operation, ProductBulkSet) else None
+    if category_id is not None and db.get(Category, category_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Категория не найдена",
+        )
+
+    try:
+        return bulk_update(db, bulk_in.filter, operation, settings.BULK_UPDATE_CHUNK_SIZE)
+    finally:
+        # Уже зафиксированные куски видны и при ошибке в следующем
+        catalog_cache.invalidate(PRODUCTS)
+
+
+@router.post('/bulk-delete', response_model=ProductBulkResult)
+def bulk_delete_products(
+    bulk_in: ProductBulkDelete,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_superuser)
+):
+    """
+    Массово удалить товары под фильтром: один DELETE на кусок из
+    BULK_UPDATE_CHUNK_SIZE строк, как в bulk-update.
+    С dry_run=true только считает подходящие товары.
+    Только для администраторов.
+    """
+    if bulk_in.dry_run:
+        matched = count_matching(db, bulk_in.filter)
+        return ProductBulkResult(matched=matched, affected=0, chunks=0, dry_run=True)
+
+    try:
+        return bulk_delete(db, bulk_in.filter, settings.BULK_UPDATE_CHUNK_SIZE)
+    finally:
+        catalog_cache.invalidate(PRODUCTS)
+
+
+@router.post('/reserve', response_model=StockResult)
+def reserve_products(
+    stock_in: StockRequest,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Зарезервировать товары: атомарно уменьшить quantity по всем позициям.
+
+    Все позиции списываются одним условным UPDATE в одной транзакции
+    (quantity = quantity - n WHERE quantity >= n), без чтения остатков.
+    Если хотя бы одного товара не хватает - не списывается ничего (409),
+    если товара нет - 404. Повторы product_id суммируются.
+    В ответе - остатки после резервирования.
+
+    Требует аутентификации.
+    """
+    try:
+        levels = reserve_stock(db, stock_in.items)
+    except StockError as exc:
+        raise _stock_error(exc)
+    catalog_cache.invalidate(PRODUCTS)
+
+    return {'items': [{'product_id': product_id, 'quantity': quantity} for product_id, quantity in levels.items()]}
+
+
+@router.post('/release', response_model=StockResult)
+def release_products(
+    stock_in: StockRequest,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_superuser)
+):
+    """
+    Снять резерв: атомарно вернуть quantity по всем позициям.
+
+    Одним UPDATE в одной транзакции; если какого-то товара нет (404),
+    не возвращается ничего. В ответе - остатки после возврата.
+
+    Возврат не сверяется с резервом и может увеличить остаток на любую
+    величину, поэтому доступен только администраторам (как массовые
+    изменения).
+
+    Требует прав администратора.
+    """
+    try:
+        levels = release_stock(db, stock_in.items)
+    except StockError as exc:
+        raise _stock_error(exc)
+    catalog_cache.invalidate(PRODUCTS)
+
+    return {'items': [{'product_id': product_id, 'quantity': quantity} for product_id, quantity in levels.items()]}
+
+
+@router.post('/batch-get', response_model=BatchGetResult[ProductRead] | BatchGetResult[ProductReadWithCategory])
+def batch_get_products(
+    batch_in: BatchGetRequest,
+    expand: Literal['category'] | None = Query(None, description="category - встроить категорию товара"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Получить товары по списку ID одним запросом (id IN (...)).
+
+    Товары возвращаются в порядке ids (повторы схлопываются), ненайденные
+    ID перечисляются в missing. Не больше BATCH_GET_MAX_IDS id за запрос.
+    С expand=category категории подгружаются одним дополнительным
+    запросом (selectinload).
+    Публичный доступ.
+    """
+    ids = unique_ids(batch_in.ids)
+    query = db.query(Product).filter(Product.id.in_(ids))
+
+    if expand == 'category':
+        query = query.options(selectinload(Product.category))
+
+    items, missing = in_request_order(query.all(), ids)
+
+    schema = ProductReadWithCategory if expand == 'category' else ProductRead
+    return BatchGetResult[schema](items=items, missing=missing)
+
+
+@router.get('/', response_model=Page[ProductRead] | Page[ProductReadWithCategory])
 def get_products(
+    request: Request,
     category_id: int | None = Query(None, description="Фильтр по ID категории"),
-    db: Session = Depends(get_db)
+    min_price: Decimal | None = Query(None, ge=0, description="Цена не ниже"),
+    max_price: Decimal | None = Query(None, ge=0, description="Цена не выше"),
+    in_stock: bool | None = Query(None, description="true - только в наличии, false - только отсутствующие"),
+    name_prefix: str | None = Query(None, min_length=1, max_length=200, description="Начало названия"),
+    sort: ProductSort = Query('id', description="Поле сортировки, '-' - по убыванию"),
+    expand: Literal['category'] | None = Query(None, description="category - встроить категорию товара"),
+    limit: int = Query(
+        settings.PAGE_SIZE_DEFAULT,
+        ge=1,
+        le=settings.PAGE_SIZE_MAX,
+        description="Размер страницы",
+    ),
+    cursor: str | None = Query(None, description="Курсор следующей страницы (next_cursor)"),
+    db: Session = Depends(get_read_db)
 ):
     """
-    Получить список всех товаров.
-
-    Можно фильтровать по категории используя параметр category_id.
+    Получить страницу товаров.
+
+    Фильтры: category_id, диапазон цены (min_price/max_price), in_stock,
+    name_prefix (начало названия, с учётом регистра). Сортировка sort:
+    id, price, created_at или name, '-' в начале - по убыванию; при равных
+    значениях порядок по id. Под каждую сортировку есть индекс, с фильтром
+    по категории - составной (category_id, поле).
+    С expand=category категории подгружаются одним дополнительным
+    запросом (selectinload) и встраиваются в ответ.
+    При FAST_JSON_LISTS (без expand) выбираются только колонки, а страница
+    сериализуется скомпилированным TypeAdapter без ORM-объектов.
+    Ответ кэшируется в памяти и отдаётся с ETag (If-None-Match -> 304).
+    Пагинация по курсору: ключ (значение сортировки, id), поэтому время
+    выборки страницы не зависит от её глубины (в отличие от OFFSET).
+    Курсор действителен только с теми же category_id и sort.
     Публичный доступ.
     """
-    query = db.query(Product)
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='min_price больше max_price',
+        )
 
-    # Если указан category_id, фильтруем по категории
-    if category_id is not None:
-        query = query.filter(Product.category_id == category_id)
+    cache_key = catalog_cache.make_key(PRODUCTS, request.url.path, request.query_params.multi_items())
+    cached = catalog_cache.lookup(cache_key)
+    if cached is not None:
+        return etag_response(request, cached)
 
-    products = query.all()
-    return products
+    after = None
+    if cursor is not None:
+        after = parse_cursor_key(decode_cursor(cursor), sort, category_id)
+        if after is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='Невалидный курсор',
+            )
+
+    generation = catalog_cache.generation(PRODUCTS)
+    fast_path = settings.FAST_JSON_LISTS and expand is None
+    filters = ProductFilters(
+        category_id=category_id,
+        min_price=min_price,
+        max_price=max_price,
+        in_stock=in_stock,
+        name_prefix=name_prefix,
+    )
+    query = build_list_statement(
+        db.get_bind().dialect.name,
+        filters,
+        sort,
+        after,
+        limit + 1,
+        *(PRODUCT_COLUMNS if fast_path else ()),
+    )
+
+    if expand == 'category':
+        query = query.options(selectinload(Product.category))
+
+    result = db.execute(query)
+    products = result.all() if fast_path else result.scalars().all()
 
+    items, next_cursor = build_page(
+        products,
+        limit,
+        lambda product: cursor_key(product, sort, category_id),
+    )
+
+    if fast_path:
+        entry = catalog_cache.store(cache_key, dump_product_page(items, next_cursor), generation)
+        return etag_response(request, entry)
+
+    schema = ProductReadWithCategory if expand == 'category' else ProductRead
+    page = Page[schema](items=items, next_cursor=next_cursor)
+
+    entry = catalog_cache.store(cache_key, page.model_dump_json().encode('utf-8'), generation)
+    return etag_response(request, entry)
 
-@router.get('/{product_id}', response_model=ProductRead)
-def get_product(product_id: int, db: Session = Depends(get_db)):
+
+@router.get('/export')
+def export_products(
+    format: str = Query(
+        'ndjson',
+        pattern='^(ndjson|csv)$',
+        description="Формат выгрузки: ndjson или csv",
+    ),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Потоковая выгрузка всего каталога товаров в NDJSON или CSV.
+
+    Строки читаются порциями через серверный курсор и сериализуются по мере
+    отправки, поэтому память не зависит от размера таблицы.
+
+    Требует аутентификации.
+    """
+    return StreamingResponse(
+        iter_export(format),
+        media_type=MEDIA_TYPES[format],
+        headers={'Content-Disposition': f'attachment; filename="products.{format}"'},
+    )
+
+
+@router.get('/search', response_model=Page[ProductRead])
+def search_products(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200, description="Поисковый запрос"),
+    limit: int = Query(
+        settings.PAGE_SIZE_DEFAULT,
+        ge=1,
+        le=settings.PAGE_SIZE_MAX,
+        description="Размер страницы",
+    ),
+    cursor: str | None = Query(None, description="Курсор следующей страницы (next_cursor)"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Полнотекстовый поиск товаров по name и description.
+
+    Результаты ранжированы по релевантности (совпадение в name весит больше),
+    последнее слово запроса ищется по префиксу.
+    SQLite - FTS5 (products_fts), PostgreSQL - tsvector + GIN.
+    Публичный доступ.
+    """
+    cache_key = catalog_cache.make_key(PRODUCTS, request.url.path, request.query_params.multi_items())
+    cached = catalog_cache.lookup(cache_key)
+    if cached is not None:
+        return etag_response(request, cached)
+
+    generation = catalog_cache.generation(PRODUCTS)
+
+    # Ранжированную выдачу листаем по смещению: ранг вычисляется
+    # для всех совпадений при любом способе пагинации
+    offset = 0
+    if cursor is not None:
+        key = decode_cursor(cursor)
+        if key is None or not isinstance(key.get('offset'), int) or key['offset'] < 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='Невалидный курсор',
+            )
+        offset = key['offset']
+
+    products = []
+    tokens = tokenize_query(q)
+    if tokens:
+        statement, params = build_search_statement(db.get_bind().dialect.name, tokens, limit + 1, offset)
+        products = db.query(Product).from_statement(statement).params(**params).all()
+
+    items, next_cursor = build_page(
+        products,
+        limit,
+        lambda product: {'offset': offset + limit},
+    )
+    page = Page[ProductRead](items=items, next_cursor=next_cursor)
+
+    entry = catalog_cache.store(cache_key, page.model_dump_json().encode('utf-8'), generation)
+    return etag_response(request, entry)
+
+
+@router.get('/changes', response_model=ChangesPage[ProductChange])
+def get_product_changes(
+    since: int = Query(0, ge=0, description="seq последнего полученного изменения (next_since)"),
+    limit: int = Query(
+        settings.PAGE_SIZE_DEFAULT,
+        ge=1,
+        le=settings.PAGE_SIZE_MAX,
+        description="Размер страницы",
+    ),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Лента изменений товаров: создания, изменения и удаления с seq > since
+    по возрастанию seq.
+
+    Журнал пишется в той же транзакции, что и сам товар. seq выдаётся
+    при записи, а не при фиксации, поэтому на БД, где транзакции
+    фиксируются не по порядку seq (PostgreSQL), изменение попадает
+    в ленту через CATALOG_CHANGES_LAG_SECONDS - иначе клиент с большим
+    next_since пропустил бы его. На SQLite задержки нет.
+    В элементе - текущее состояние товара (None, если он удалён).
+    Начав с since=0, клиент получает весь каталог; дальше передаёт
+    next_since и забирает только новые изменения.
+    Публичный доступ.
+    """
+    rows = db.execute(build_changes_statement(Product, PRODUCT, since, limit + 1)).all()
+    return build_changes_page(rows, limit, since, 'product')
+
+
+@router.get('/{product_id}', response_model=ProductRead | ProductReadWithCategory)
+def get_product(
+    product_id: int,
+    request: Request,
+    expand: Literal['category'] | None = Query(None, description="category - встроить категорию товара"),
+    db: Session = Depends(get_read_db)
+):
     """
     Получить товар по ID.
 
+    С expand=category категория загружается тем же запросом (joinedload).
+    Ответ кэшируется в памяти и отдаётся с ETag (If-None-Match -> 304).
     Публичный доступ.
     """
-    product = db.query(Product).filter(Product.id == product_id).first()
+    cache_key = catalog_cache.make_key(PRODUCTS, request.url.path, request.query_params.multi_items())
+    cached = catalog_cache.lookup(cache_key)
+    if cached is not None:
+        return etag_response(request, cached)
+
+    generation = catalog_cache.generation(PRODUCTS)
+    query = db.query(Product).filter(Product.id == product_id)
+
+    if expand == 'category':
+        query = query.options(joinedload(Product.category))
+
+    product = query.first()
 
     if not product:
         raise HTTPException(
@@ -82,7 +530,9 @@ def get_product(product_id: int, db: Session = Depends(get_db)):
             detail='Товар не найден',
         )
 
-    return product
+    schema = ProductReadWithCategory if expand == 'category' else ProductRead
+    body = schema.model_validate(product).model_dump_json().encode('utf-8')
+    return etag_response(request, catalog_cache.store(cache_key, body, generation))
 
 
 @router.put('/{product_id}', response_model=ProductRead)
@@ -90,7 +540,7 @@ def update_product(
     product_id: int,
     product_in: ProductUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Обновить товар.
@@ -117,10 +567,14 @@ def update_product(
                 detail="Категория не найдена",
             )
 
+    old_state = product_state(product)
     for field, value in update_data.items():
         setattr(product, field, value)
+    product_changed(db, old_state, product_state(product))
+    record_changes(db, PRODUCT, 'update', [product.id])
 
     db.commit()
+    catalog_cache.invalidate(PRODUCTS)
     db.refresh(product)
 
     return product
@@ -130,7 +584,7 @@ def update_product(
 def delete_product(
     product_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Удалить товар.
@@ -145,7 +599,11 @@ def delete_product(
             detail='Товар не найден',
         )
 
+    old_state = product_state(product)
     db.delete(product)
+    product_changed(db, old_state, None)
+    record_changes(db, PRODUCT, 'delete', [product_id])
     db.commit()
+    catalog_cache.invalidate(PRODUCTS)
 
     return None
@@ -1,18 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_active_user
 from app.core.db import get_db
 from app.models.user import User
+from app.schemas.batch import BatchGetRequest, BatchGetResult
 from app.schemas.user import UserCreate, UserRead
-from app.services.auth import get_password_hash
+from app.services.batch_get import in_request_order, unique_ids
+from app.services.password_pool import password_pool
+from app.services.principal_cache import Principal
+from app.services.rate_limit import REGISTER_PER_IP, client_ip, rate_limiter
 
 
 router = APIRouter()
 
 
 @router.post('/', response_model=UserRead, status_code=status.HTTP_201_CREATED)
-def create_user(user_in: UserCreate, db: Session = Depends(get_db)):
+def create_user(user_in: UserCreate, request: Request, db: Session = Depends(get_db)):
+    """
+    Регистрация пользователя.
+
+    Попытки ограничены по IP (REGISTER_RATE_LIMIT_PER_IP): сверх лимита -
+    429 + Retry-After, до обращения к БД и bcrypt.
+    """
+    rate_limiter.check((REGISTER_PER_IP, client_ip(request)))
+
     existing_user = db.query(User).filter(User.email == user_in.email).first()
     if existing_user:
         raise HTTPException(
@@ -22,7 +34,7 @@ def create_user(user_in: UserCreate, db: Session = Depends(get_db)):
     
     db_user = User(
         email=user_in.email,    
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=password_pool.hash_password(user_in.password),
     )
 
     db.add(db_user)
@@ -32,14 +44,40 @@ def create_user(user_in: UserCreate, db: Session = Depends(get_db)):
     return db_user
 
 
+@router.post('/batch-get', response_model=BatchGetResult[UserRead])
+def batch_get_users(batch_in: BatchGetRequest, db: Session = Depends(get_db)):
+    """
+    Получить пользователей по списку ID одним запросом (id IN (...)).
+
+    Пользователи возвращаются в порядке ids (повторы схлопываются),
+    ненайденные ID перечисляются в missing.
+    """
+    ids = unique_ids(batch_in.ids)
+    users = db.query(User).filter(User.id.in_(ids)).all()
+    items, missing = in_request_order(users, ids)
+    return {'items': items, 'missing': missing}
+
+
 @router.get('/me', response_model=UserRead)
-def get_current_user_info(current_user: User = Depends(get_current_active_user)):
+def get_current_user_info(
+    current_user: Principal = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
     """
     Получить информацию о текущем аутентифицированном пользователе.
 
     Требует токен в заголовке: Authorization: Bearer <token>
     """
-    return current_user
+    # В Principal только поля для проверки доступа, полный профиль читаем из БД
+    user = db.query(User).filter(User.id == current_user.id).first()
+
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Пользователь не найден',
+        )
+
+    return user
 
 
 @router.get('/{user_id}', response_model=UserRead)
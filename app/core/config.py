@@ -10,9 +10,143 @@ class Settings(BaseSettings):
     APP_NAME: str = "FastAPI Shop"
     DATABASE_URL: str = "sqlite:///./shop.db"
 
+    # Пул соединений основного (синхронного) движка
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800  # секунд; -1 - не пересоздавать соединения
+    DB_POOL_PRE_PING: bool = True
+
+    # Добавлять в ответы заголовок X-DB-Query-Count (для тестов и отладки)
+    DB_QUERY_COUNT_HEADER: bool = False
+
+    # Профиль SQLite, применяется к каждому новому соединению.
+    # WAL: читатели не блокируются писателем; synchronous=NORMAL безопасен в WAL.
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KIB: int = 64 * 1024
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+
+    # Асинхронный стек БД (aiosqlite локально, asyncpg в продакшене).
+    # Если ASYNC_DATABASE_URL не задан, он выводится из DATABASE_URL.
+    DB_ASYNC: bool = False
+    ASYNC_DATABASE_URL: str | None = None
+    ASYNC_DB_POOL_SIZE: int = 20
+    ASYNC_DB_MAX_OVERFLOW: int = 80
+
+    # Реплики для чтения публичных GET каталога: JSON-список URL, например
+    # ["postgresql://replica1/shop", "postgresql://replica2/shop"].
+    # Пусто - все чтения идут в основную БД. Локально реплики - копии файла
+    # SQLite (scripts/sync_sqlite_replicas): sqlite:///file:./replica1.db?mode=rw&uri=true
+    # (mode=rw - не создавать пустой файл, если копии ещё нет).
+    # ASYNC_DATABASE_REPLICA_URLS выводятся из DATABASE_REPLICA_URLS, если не заданы.
+    DATABASE_REPLICA_URLS: list[str] = []
+    ASYNC_DATABASE_REPLICA_URLS: list[str] = []
+    # Реплика проверяется SELECT 1 не чаще раза в интервал; недоступная
+    # исключается из ротации до следующей успешной проверки
+    DB_REPLICA_HEALTH_CHECK_SECONDS: float = 5.0
+    # После своей записи клиент столько секунд читает основную БД (cookie).
+    # Должно быть больше максимального отставания реплик: столько же после
+    # записи не кэшируются ответы каталога
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0
+
     SECRET_KEY: str = "change_me"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Access token короткий; продлевается через POST /auth/refresh без bcrypt.
+    # Refresh token одноразовый: каждый обмен выдаёт новую пару (ротация).
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
     ALGORITHM: str = "HS256"
 
+    # Кэш проверенных токенов -> снимков пользователя (в памяти процесса).
+    # TTL записи не больше exp токена; 0 в MAX_SIZE выключает кэш.
+    # Изменение пользователя сбрасывает кэш только в своём процессе: при
+    # нескольких воркерах деактивация и отзыв токенов доходят до остальных
+    # не позже чем через TTL (права администратора проверяются по БД всегда).
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 10
+
+    # Пул процессов для bcrypt (хеширование и проверка паролей).
+    # Если в работе и в очереди уже WORKERS + QUEUE_DEPTH задач, отвечаем 503.
+    # 0 в PASSWORD_HASH_WORKERS - считать bcrypt в потоке запроса (без пула).
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_DEPTH: int = 32
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 1
+
+    # Лимит попыток входа и регистрации (token bucket): N попыток подряд,
+    # затем по одной каждые WINDOW/N секунд; 0 выключает правило.
+    # Проверяется до поиска пользователя и bcrypt, сверх лимита - 429 + Retry-After.
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_WINDOW_SECONDS: int = 60
+    LOGIN_RATE_LIMIT_PER_IP: int = 20
+    LOGIN_RATE_LIMIT_PER_EMAIL: int = 5
+    REGISTER_RATE_LIMIT_PER_IP: int = 5
+    # Пусто - корзины в памяти процесса (у каждого воркера свои, не больше MAX_KEYS).
+    # Путь к файлу SQLite - корзины общие для всех воркеров на хосте
+    # (например, /dev/shm/shop-rate-limit.db - файл в разделяемой памяти).
+    RATE_LIMIT_STORE_PATH: str = ''
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+
+    # Пагинация списков (keyset / cursor)
+    PAGE_SIZE_DEFAULT: int = 50
+    PAGE_SIZE_MAX: int = 200
+
+    # Кэш сериализованных ответов публичных GET каталога (в памяти процесса).
+    # Ограничен суммарным размером тел ответов; 0 выключает кэш.
+    CATALOG_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # Срок жизни записи кэша. Инвалидация после записи действует только
+    # в процессе, который записал, поэтому при нескольких воркерах остальные
+    # отдают старые ответы не дольше этого срока. 0 - без срока (один воркер).
+    CATALOG_CACHE_MAX_AGE_SECONDS: float = 5.0
+
+    # Быстрый путь для списков: выбирать колонки (без ORM-объектов)
+    # и сериализовать скомпилированным TypeAdapter сразу в байты
+    FAST_JSON_LISTS: bool = False
+
+    # Пакетное чтение (POST .../batch-get): максимум id в одном запросе
+    BATCH_GET_MAX_IDS: int = 100
+
+    # Массовый импорт товаров (POST /products/bulk):
+    # строк в одной транзакции и максимум ошибок в отчёте
+    BULK_IMPORT_BATCH_SIZE: int = 1000
+    BULK_IMPORT_MAX_ERRORS: int = 1000
+
+    # Массовые изменения товаров (POST /products/bulk-update, bulk-delete):
+    # строк в одной транзакции
+    BULK_UPDATE_CHUNK_SIZE: int = 1000
+
+    # Выгрузка каталога (GET /products/export): строк на одну порцию курсора
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Задержка ленты изменений (/products/changes, /categories/changes) и версии
+    # снапшота каталога. seq выдаётся при INSERT и в PostgreSQL может
+    # зафиксироваться не по порядку - изменения моложе этого срока не отдаются,
+    # чтобы клиент не перескочил незафиксированный меньший seq. Должна быть
+    # больше самой долгой транзакции каталога. None - 0 для SQLite
+    # (транзакции записи идут строго по очереди), 5 секунд для остальных БД.
+    CATALOG_CHANGES_LAG_SECONDS: float | None = None
+
+    # Прогрев при старте (lifespan): мапперы, пул соединений, процессы bcrypt,
+    # OpenAPI-схема и запросы каталога. До его окончания /ready отвечает 503.
+    WARMUP_ENABLED: bool = True
+    # GET-запросы прогрева: заполняют кэш каталога и компилируют SQL
+    # и сериализаторы этих роутов; пустой список - без запросов
+    WARMUP_CATALOG_PATHS: list[str] = ["/api/v1/categories/", "/api/v1/products/"]
+    # Пауза между повторами открытия пула, если БД при старте недоступна
+    # (до успешного открытия /ready отвечает 503)
+    WARMUP_RETRY_SECONDS: float = 1.0
+
+    # Снапшот всего каталога (GET /api/v1/catalog/snapshot): готовые JSON-файлы
+    # (без сжатия, gzip и brotli, если установлен пакет brotli) в каталоге на диске.
+    # Фоновая задача опрашивает журнал изменений каждые POLL секунд и пересобирает
+    # снапшот, когда изменений не было DEBOUNCE секунд, но не реже чем раз
+    # в MAX_DELAY секунд при непрерывных изменениях. KEEP - версий на диске.
+    CATALOG_SNAPSHOT_ENABLED: bool = True
+    CATALOG_SNAPSHOT_DIR: str = "./catalog_snapshots"
+    CATALOG_SNAPSHOT_POLL_SECONDS: float = 1.0
+    CATALOG_SNAPSHOT_DEBOUNCE_SECONDS: float = 5.0
+    CATALOG_SNAPSHOT_MAX_DELAY_SECONDS: float = 60.0
+    CATALOG_SNAPSHOT_KEEP: int = 2
+
 
 settings = Settings()
@@ -1,16 +1,79 @@
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 
 from app.core.config import settings
+from app.core.metrics import instrument_engine
+from app.core.pool import TimedAsyncAdaptedQueuePool, TimedQueuePool
+from app.core.replicas import Replica, ReplicaSet, in_read_your_writes_window, track_writes, watch_replica_errors
 
 
-if settings.DATABASE_URL.startswith("sqlite"):
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def _pool_options(url: str, pool_class, pool_size: int, max_overflow: int) -> dict:
+    """Параметры пула из Settings (SQLite в памяти работает без QueuePool)"""
+    if _is_sqlite(url) and (":memory:" in url or url.rstrip("/").endswith(":")):
+        return {}
+
+    return {
+        "poolclass": pool_class,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def _apply_sqlite_profile(dbapi_connection, connection_record) -> None:
+    """
+    Настройки производительности SQLite для каждого нового соединения.
+
+    journal_mode=WAL сохраняется в файле БД, остальные PRAGMA
+    действуют только в рамках соединения.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        # отрицательное значение - размер в KiB, а не в страницах
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KIB)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    finally:
+        cursor.close()
+
+
+def _apply_replica_profile(dbapi_connection, connection_record) -> None:
+    """
+    Реплика SQLite (копия файла основной БД) только для чтения:
+    запись через её соединения - ошибка, а не тихое расхождение с основной.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
+
+if _is_sqlite(settings.DATABASE_URL):
     engine = create_engine(
         settings.DATABASE_URL,
         connect_args={"check_same_thread": False},
+        **_pool_options(settings.DATABASE_URL, TimedQueuePool, settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW),
     )
+    event.listen(engine, "connect", _apply_sqlite_profile)
 else:
-    engine = create_engine(settings.DATABASE_URL)
+    engine = create_engine(
+        settings.DATABASE_URL,
+        **_pool_options(settings.DATABASE_URL, TimedQueuePool, settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW),
+    )
+
+instrument_engine(engine, "primary")
+track_writes(engine)
 
 
 SessionLocal = sessionmaker(
@@ -20,6 +83,121 @@ SessionLocal = sessionmaker(
 )
 
 
+# Драйверы для асинхронного стека: sqlite -> aiosqlite, postgresql -> asyncpg
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def _to_async_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    # postgresql+psycopg2 -> postgresql
+    backend = scheme.split("+", 1)[0]
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f"Нет асинхронного драйвера для {scheme}")
+
+    return f"{ASYNC_DRIVERS[backend]}{sep}{rest}"
+
+
+def get_async_database_url() -> str:
+    """Возвращает URL для асинхронного движка (явный или выведенный из DATABASE_URL)"""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+
+    return _to_async_url(settings.DATABASE_URL)
+
+
+def get_async_replica_urls() -> list[str]:
+    """URL реплик для асинхронного стека (явные или выведенные из DATABASE_REPLICA_URLS)"""
+    if settings.ASYNC_DATABASE_REPLICA_URLS:
+        return settings.ASYNC_DATABASE_REPLICA_URLS
+
+    return [_to_async_url(url) for url in settings.DATABASE_REPLICA_URLS]
+
+
+def _add_replica(replica_set: ReplicaSet, name: str, url: str, replica_engine, sync_engine, session_factory) -> None:
+    if _is_sqlite(url):
+        event.listen(sync_engine, "connect", _apply_sqlite_profile)
+        event.listen(sync_engine, "connect", _apply_replica_profile)
+    instrument_engine(sync_engine, name)
+
+    replica = Replica(name=name, url=url, engine=replica_engine, session_factory=session_factory)
+    watch_replica_errors(sync_engine, replica_set, replica)
+    replica_set.add(replica)
+
+
+# Реплики для чтения. Движки ленивые: соединение открывается
+# при первой проверке или первом запросе
+replicas = ReplicaSet(settings.DB_REPLICA_HEALTH_CHECK_SECONDS)
+for number, replica_url in enumerate(settings.DATABASE_REPLICA_URLS, start=1):
+    replica_engine = create_engine(
+        replica_url,
+        **({"connect_args": {"check_same_thread": False}} if _is_sqlite(replica_url) else {}),
+        **_pool_options(replica_url, TimedQueuePool, settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW),
+    )
+    _add_replica(
+        replicas,
+        f"replica-{number}",
+        replica_url,
+        replica_engine,
+        replica_engine,
+        sessionmaker(autocommit=False, autoflush=False, bind=replica_engine),
+    )
+
+
+async_engine = None
+AsyncSessionLocal = None
+
+# Асинхронный движок создаётся только если включён DB_ASYNC,
+# чтобы синхронный режим не требовал aiosqlite/asyncpg
+if settings.DB_ASYNC:
+    async_database_url = get_async_database_url()
+    async_engine = create_async_engine(
+        async_database_url,
+        **_pool_options(
+            async_database_url,
+            TimedAsyncAdaptedQueuePool,
+            settings.ASYNC_DB_POOL_SIZE,
+            settings.ASYNC_DB_MAX_OVERFLOW,
+        ),
+    )
+    if _is_sqlite(async_database_url):
+        event.listen(async_engine.sync_engine, "connect", _apply_sqlite_profile)
+    instrument_engine(async_engine.sync_engine, "async")
+    track_writes(async_engine.sync_engine)
+
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        autoflush=False,
+        # после commit объекты остаются загруженными:
+        # ленивую догрузку атрибутов в async-режиме сделать нельзя
+        expire_on_commit=False,
+    )
+
+async_replicas = ReplicaSet(settings.DB_REPLICA_HEALTH_CHECK_SECONDS)
+if settings.DB_ASYNC:
+    for number, replica_url in enumerate(get_async_replica_urls(), start=1):
+        async_replica_engine = create_async_engine(
+            replica_url,
+            **_pool_options(
+                replica_url,
+                TimedAsyncAdaptedQueuePool,
+                settings.ASYNC_DB_POOL_SIZE,
+                settings.ASYNC_DB_MAX_OVERFLOW,
+            ),
+        )
+        _add_replica(
+            async_replicas,
+            f"async-replica-{number}",
+            replica_url,
+            async_replica_engine,
+            async_replica_engine.sync_engine,
+            async_sessionmaker(bind=async_replica_engine, autoflush=False, expire_on_commit=False),
+        )
+
+
 class Base(DeclarativeBase):
     pass
 
@@ -30,3 +208,101 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Асинхронный стек БД выключен (DB_ASYNC=false)")
+
+    db: AsyncSession = AsyncSessionLocal()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+def _ping(replica: Replica) -> bool:
+    try:
+        with replica.engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except exc.SQLAlchemyError:
+        return False
+    return True
+
+
+async def _ping_async(replica: Replica) -> bool:
+    try:
+        async with replica.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except exc.SQLAlchemyError:
+        return False
+    return True
+
+
+def _pick_replica(request: Request) -> Replica | None:
+    """
+    Реплика для чтения или None - читать основную БД
+    (реплик нет, все недоступны или клиент в окне read-your-writes).
+    """
+    if not replicas.replicas:
+        return None
+    if in_read_your_writes_window(request.cookies):
+        replicas.record_read(None, "read_your_writes")
+        return None
+
+    for replica in replicas.rotation():
+        if replicas.claim_check(replica):
+            replicas.set_health(replica, _ping(replica))
+        if replica.healthy:
+            replicas.record_read(replica)
+            return replica
+
+    replicas.record_read(None, "replicas_unavailable")
+    return None
+
+
+async def _pick_replica_async(request: Request) -> Replica | None:
+    """Асинхронная версия _pick_replica (проверка реплик без блокировки цикла)"""
+    if not async_replicas.replicas:
+        return None
+    if in_read_your_writes_window(request.cookies):
+        async_replicas.record_read(None, "read_your_writes")
+        return None
+
+    for replica in async_replicas.rotation():
+        if async_replicas.claim_check(replica):
+            async_replicas.set_health(replica, await _ping_async(replica))
+        if replica.healthy:
+            async_replicas.record_read(replica)
+            return replica
+
+    async_replicas.record_read(None, "replicas_unavailable")
+    return None
+
+
+def get_read_db(request: Request):
+    """
+    Сессия только для чтения: реплика по кругу, иначе основная БД.
+
+    Для обработчиков, которые ничего не пишут (публичные GET каталога):
+    реплика отстаёт от основной БД и в SQLite открыта с query_only.
+    """
+    replica = _pick_replica(request)
+    db = replica.session_factory() if replica is not None else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request):
+    """Асинхронная версия get_read_db для роутеров app.api.v1.aio"""
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Асинхронный стек БД выключен (DB_ASYNC=false)")
+
+    replica = await _pick_replica_async(request)
+    db: AsyncSession = replica.session_factory() if replica is not None else AsyncSessionLocal()
+    try:
+        yield db
+    finally:
+        await db.close()
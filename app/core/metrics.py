@@ -0,0 +1,316 @@
+import bisect
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import Engine, event
+
+
+# Метрики в формате Prometheus (text exposition format 0.0.4) без внешних
+# зависимостей: счётчики, gauge и гистограммы с метками хранятся в памяти
+# процесса и отдаются эндпоинтом /metrics.
+
+LatencyBuckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QueryLatencyBuckets = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+QueryCountBuckets = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.type_name}',
+        ]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type_name = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+            for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    type_name = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+            for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Iterable[float] = LatencyBuckets):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> (счётчики по корзинам без накопления, sum, count)
+        self._values: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted((key, [list(state[0]), state[1], state[2]]) for key, state in self._values.items())
+
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, key)} {count}')
+        return lines
+
+
+# Коллектор вызывается при каждом запросе /metrics и возвращает метрики,
+# значения которых берутся из других объектов (пулы, кэши):
+# [(имя, тип, описание, [(метки, значение), ...]), ...]
+Collector = Callable[[], list[tuple[str, str, str, list[tuple[dict, float]]]]]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Collector] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+
+        for collector in self._collectors:
+            for name, type_name, documentation, samples in collector():
+                lines.append(f'# HELP {name} {documentation}')
+                lines.append(f'# TYPE {name} {type_name}')
+                for labels, value in samples:
+                    label_str = _format_labels(tuple(labels), tuple(labels.values()))
+                    lines.append(f'{name}{label_str} {_format_value(value)}')
+
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+http_requests_total = registry.register(Counter(
+    'http_requests_total',
+    'Количество HTTP-запросов по маршруту и коду ответа',
+    ('method', 'route', 'status'),
+))
+http_request_duration_seconds = registry.register(Histogram(
+    'http_request_duration_seconds',
+    'Длительность обработки HTTP-запроса',
+    ('method', 'route'),
+))
+http_requests_in_flight = registry.register(Gauge(
+    'http_requests_in_flight',
+    'Запросы, которые обрабатываются прямо сейчас',
+    ('method',),
+))
+http_request_db_queries = registry.register(Histogram(
+    'http_request_db_queries',
+    'Количество SQL-запросов на один HTTP-запрос',
+    ('method', 'route'),
+    buckets=QueryCountBuckets,
+))
+http_request_db_seconds = registry.register(Histogram(
+    'http_request_db_seconds',
+    'Суммарное время SQL-запросов на один HTTP-запрос',
+    ('method', 'route'),
+    buckets=QueryLatencyBuckets,
+))
+db_queries_total = registry.register(Counter(
+    'db_queries_total',
+    'Количество выполненных SQL-запросов',
+    ('engine',),
+))
+db_query_duration_seconds = registry.register(Histogram(
+    'db_query_duration_seconds',
+    'Длительность SQL-запроса',
+    ('engine',),
+    buckets=QueryLatencyBuckets,
+))
+
+
+class RequestDbStats:
+    """
+    Счётчики SQL-запросов в рамках одного HTTP-запроса.
+
+    parent - внешний счётчик (например, из count_queries() в тесте,
+    который вызывает приложение в том же контексте): запросы
+    учитываются и в нём.
+    """
+
+    __slots__ = ('queries', 'seconds', 'parent')
+
+    def __init__(self, parent: 'RequestDbStats | None' = None):
+        self.queries = 0
+        self.seconds = 0.0
+        self.parent = parent
+
+    def record(self, seconds: float) -> None:
+        stats = self
+        while stats is not None:
+            stats.queries += 1
+            stats.seconds += seconds
+            stats = stats.parent
+
+
+# Объект кладётся в contextvar в middleware. Синхронные обработчики
+# выполняются в threadpool с копией контекста, но объект в ней тот же,
+# поэтому запросы из потока учитываются в статистике исходного запроса.
+request_db_stats: ContextVar[RequestDbStats | None] = ContextVar('request_db_stats', default=None)
+
+
+@contextmanager
+def count_queries() -> Iterator[RequestDbStats]:
+    """
+    Считает SQL-запросы, выполненные в текущем контексте.
+
+    Для проверки бюджета запросов в тестах:
+        with count_queries() as stats:
+            await client.get('/api/v1/products/?expand=category')
+        assert stats.queries <= 2
+
+    Работает с httpx.ASGITransport (приложение выполняется в контексте
+    вызывающего кода). Для TestClient используйте заголовок
+    X-DB-Query-Count (DB_QUERY_COUNT_HEADER=true).
+    """
+    stats = RequestDbStats(parent=request_db_stats.get())
+    token = request_db_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        request_db_stats.reset(token)
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """
+    Подписывается на before/after_cursor_execute движка: считает запросы
+    и время в БД глобально и для текущего HTTP-запроса.
+    Для AsyncEngine передаётся async_engine.sync_engine.
+    """
+
+    # Время начала хранится в контексте выполнения: after_cursor_execute
+    # не вызывается, если запрос упал, и значение уходит вместе с контекстом.
+    # Без контекста (служебные запросы диалекта) - стек в conn.info,
+    # который при ошибке очищает handle_error.
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_started_at = time.perf_counter()
+        else:
+            conn.info.setdefault('query_started_at', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'handle_error')
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        if exception_context.execution_context is None and conn is not None:
+            started = conn.info.get('query_started_at')
+            if started:
+                started.pop()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            started_at = context._query_started_at
+        else:
+            started_at = conn.info['query_started_at'].pop()
+        elapsed = time.perf_counter() - started_at
+
+        db_queries_total.inc(engine=name)
+        db_query_duration_seconds.observe(elapsed, engine=name)
+
+        stats = request_db_stats.get()
+        if stats is not None:
+            stats.record(elapsed)
@@ -0,0 +1,105 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.replicas import RequestWrites, read_your_writes_cookie, request_writes
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Шаблон пути найденного маршрута, например /api/v1/products/{product_id}.
+
+    Роутер дописывает найденный маршрут в scope. В новых версиях FastAPI
+    маршруты подключённых роутеров хранятся без префикса, а полный шаблон
+    лежит в effective_route_context.
+    """
+    context = scope.get('fastapi', {}).get('effective_route_context')
+    path = getattr(context, 'path', None) or getattr(scope.get('route'), 'path', None)
+    return path or 'unmatched'
+
+
+class MetricsMiddleware:
+    """
+    ASGI-middleware: латентность, коды ответов и число запросов в работе
+    по каждому маршруту, а также количество и время SQL-запросов
+    на один HTTP-запрос.
+
+    Метка route - шаблон пути (/api/v1/products/{product_id}),
+    а не фактический URL, чтобы число рядов метрик не росло.
+    Чистый ASGI (не BaseHTTPMiddleware), чтобы не буферизовать
+    потоковые ответы.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        method = scope['method']
+        status_code = 500
+        db_stats = metrics.RequestDbStats(parent=metrics.request_db_stats.get())
+        token = metrics.request_db_stats.set(db_stats)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                if settings.DB_QUERY_COUNT_HEADER:
+                    # Для потоковых ответов - только запросы до начала отправки тела
+                    headers = list(message.get('headers', []))
+                    headers.append((b'x-db-query-count', str(db_stats.queries).encode('latin-1')))
+                    message = {**message, 'headers': headers}
+            await send(message)
+
+        metrics.http_requests_in_flight.inc(method=method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.http_requests_in_flight.dec(method=method)
+            metrics.request_db_stats.reset(token)
+
+            route_path = route_template(scope)
+
+            metrics.http_requests_total.inc(method=method, route=route_path, status=status_code)
+            metrics.http_request_duration_seconds.observe(elapsed, method=method, route=route_path)
+            metrics.http_request_db_queries.observe(db_stats.queries, method=method, route=route_path)
+            metrics.http_request_db_seconds.observe(db_stats.seconds, method=method, route=route_path)
+
+
+class ReadYourWritesMiddleware:
+    """
+    ASGI-middleware окна read-your-writes (см. app.core.replicas): если
+    обработчик выполнил INSERT/UPDATE/DELETE в основной БД, в ответ
+    добавляется cookie, и следующие DB_READ_YOUR_WRITES_SECONDS секунд
+    чтения этого клиента идут в основную БД, а не в отстающую реплику.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        writes = RequestWrites()
+        token = request_writes.set(writes)
+
+        async def send_wrapper(message: Message) -> None:
+            if message['type'] == 'http.response.start' and writes.wrote:
+                headers = list(message.get('headers', []))
+                headers.append((b'set-cookie', read_your_writes_cookie().encode('latin-1')))
+                message = {**message, 'headers': headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_writes.reset(token)
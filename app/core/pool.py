@@ -0,0 +1,96 @@
+import threading
+import time
+
+from sqlalchemy import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class CheckoutStats:
+    """Время ожидания свободного соединения при checkout из пула"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.timeouts = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def observe(self, seconds: float, timed_out: bool) -> None:
+        with self._lock:
+            self.count += 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'count': self.count,
+                'timeouts': self.timeouts,
+                'total_seconds': round(self.total_seconds, 6),
+                'avg_seconds': round(self.total_seconds / self.count, 6) if self.count else 0.0,
+                'max_seconds': round(self.max_seconds, 6),
+            }
+
+
+class _TimedPoolMixin:
+    """
+    Замеряет ожидание в _do_get - единственном месте, где QueuePool
+    блокируется, пока не освободится соединение или не истечёт pool_timeout.
+    Событие checkout срабатывает уже после получения соединения,
+    поэтому время ожидания через события не измерить.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_stats = CheckoutStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self.checkout_stats.observe(time.perf_counter() - started, timed_out)
+
+    def recreate(self):
+        # engine.dispose() пересоздаёт пул - статистику переносим
+        pool = super().recreate()
+        pool.checkout_stats = self.checkout_stats
+        return pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_status(name: str, engine: Engine) -> dict:
+    """Текущее состояние пула движка для служебного эндпоинта"""
+    pool = engine.pool
+    status = {
+        'name': name,
+        'pool_class': type(pool).__name__,
+    }
+
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+
+    stats = getattr(pool, 'checkout_stats', None)
+    if stats is not None:
+        status['checkout_wait'] = stats.snapshot()
+
+    return status
@@ -0,0 +1,185 @@
+import itertools
+import math
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import Engine, event
+
+from app.core.config import settings
+
+
+# Маршрутизация чтений на реплики.
+#
+# Публичные GET каталога получают сессию читающей реплики (get_read_db):
+# реплики выбираются по кругу, недоступная исключается из ротации до
+# следующей успешной проверки, а если здоровых нет - читается основная БД.
+#
+# Реплика отстаёт от основной БД, поэтому клиент, который только что
+# что-то записал, ещё DB_READ_YOUR_WRITES_SECONDS читает из основной:
+# после запроса с INSERT/UPDATE/DELETE ему ставится cookie со временем
+# окончания окна (ReadYourWritesMiddleware). Cookie не привязана к воркеру,
+# поэтому окно действует при любом числе процессов.
+
+READ_YOUR_WRITES_COOKIE = 'shop_read_primary_until'
+
+
+class RequestWrites:
+    """Флаг «в этом HTTP-запросе была запись в основную БД»"""
+
+    __slots__ = ('wrote',)
+
+    def __init__(self):
+        self.wrote = False
+
+
+# Как и request_db_stats в metrics: объект кладётся в contextvar
+# в middleware и виден из threadpool синхронных обработчиков
+request_writes: ContextVar[RequestWrites | None] = ContextVar('request_writes', default=None)
+
+
+def track_writes(engine: Engine) -> None:
+    """
+    Отмечает текущий HTTP-запрос как пишущий, когда через движок основной БД
+    выполняется INSERT, UPDATE или DELETE.
+    Для AsyncEngine передаётся async_engine.sync_engine.
+    """
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None and (context.isinsert or context.isupdate or context.isdelete):
+            writes = request_writes.get()
+            if writes is not None:
+                writes.wrote = True
+
+
+def read_primary_until(cookies: dict[str, str]) -> float:
+    """Конец окна read-your-writes из cookie запроса (0 - окна нет)"""
+    try:
+        return float(cookies.get(READ_YOUR_WRITES_COOKIE, 0))
+    except ValueError:
+        return 0.0
+
+
+def read_your_writes_cookie() -> str:
+    """Значение Set-Cookie для ответа на пишущий запрос"""
+    window = settings.DB_READ_YOUR_WRITES_SECONDS
+    return (
+        f'{READ_YOUR_WRITES_COOKIE}={time.time() + window:.3f}; '
+        f'Max-Age={math.ceil(window)}; Path=/; HttpOnly; SameSite=Lax'
+    )
+
+
+def in_read_your_writes_window(cookies: dict[str, str]) -> bool:
+    # Окно не длиннее настроенного: подделанная cookie с далёким сроком
+    # не заставит читать из основной БД дольше
+    now = time.time()
+    return now < read_primary_until(cookies) <= now + settings.DB_READ_YOUR_WRITES_SECONDS
+
+
+@dataclass(eq=False)
+class Replica:
+    name: str
+    url: str
+    # Engine или AsyncEngine и фабрика сессий для него
+    engine: object
+    session_factory: object
+    healthy: bool = True
+    # monotonic-время последней проверки; -inf - ещё не проверялась
+    checked_at: float = float('-inf')
+    reads: int = 0
+    failures: int = 0
+
+
+class ReplicaSet:
+    """
+    Реплики одного стека (синхронного или асинхронного) и их состояние.
+
+    Проверка (SELECT 1) выполняется при выборе реплики, если с прошлой
+    прошло больше check_interval секунд, - отдельного фонового потока нет.
+    Ошибка соединения в обычном запросе тоже помечает реплику недоступной
+    (mark_failed из handle_error движка).
+    """
+
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        self.replicas: list[Replica] = []
+        # Чтения из основной БД по причинам: read_your_writes, replicas_unavailable
+        self.primary_reads: dict[str, int] = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def add(self, replica: Replica) -> None:
+        self.replicas.append(replica)
+
+    def rotation(self) -> list[Replica]:
+        """Реплики по кругу: каждый вызов начинает со следующей"""
+        if not self.replicas:
+            return []
+        start = next(self._counter) % len(self.replicas)
+        return self.replicas[start:] + self.replicas[:start]
+
+    def claim_check(self, replica: Replica) -> bool:
+        """
+        True, если реплику пора проверить. Время проверки отмечается сразу,
+        чтобы параллельные запросы не проверяли одну реплику одновременно.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now - replica.checked_at < self.check_interval:
+                return False
+            replica.checked_at = now
+            return True
+
+    def set_health(self, replica: Replica, healthy: bool) -> None:
+        with self._lock:
+            if replica.healthy and not healthy:
+                replica.failures += 1
+            replica.healthy = healthy
+
+    def mark_failed(self, replica: Replica) -> None:
+        """Ошибка соединения: реплика вне ротации до следующей проверки"""
+        with self._lock:
+            if replica.healthy:
+                replica.failures += 1
+            replica.healthy = False
+            replica.checked_at = time.monotonic()
+
+    def record_read(self, replica: Replica | None, reason: str = '') -> None:
+        """Учитывает выбранную сессию: реплику или основную БД с причиной"""
+        with self._lock:
+            if replica is not None:
+                replica.reads += 1
+            else:
+                self.primary_reads[reason] = self.primary_reads.get(reason, 0) + 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'replicas': [
+                    {
+                        'name': replica.name,
+                        'healthy': replica.healthy,
+                        'reads': replica.reads,
+                        'failures': replica.failures,
+                    }
+                    for replica in self.replicas
+                ],
+                'primary_reads': dict(self.primary_reads),
+            }
+
+
+def watch_replica_errors(engine: Engine, replicas: ReplicaSet, replica: Replica) -> None:
+    """
+    Ошибки соединения (обрыв, не удалось подключиться) выводят реплику
+    из ротации, не дожидаясь очередной проверки. Ошибки самих запросов
+    на доступность не влияют.
+    Для AsyncEngine передаётся async_engine.sync_engine.
+    """
+
+    @event.listens_for(engine, 'handle_error')
+    def _handle_error(context):
+        # connection is None - ошибка при открытии соединения
+        if context.is_disconnect or context.connection is None:
+            replicas.mark_failed(replica)
@@ -1,16 +1,112 @@
-from fastapi import FastAPI
-from app.api.v1 import users, auth, categories, products
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import Depends, FastAPI, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from app.api import internal
+from app.api.deps import get_current_superuser, get_current_superuser_async
+from app.api.v1 import catalog
+from app.core.config import settings
+from app.core.metrics import registry
+from app.core.middleware import MetricsMiddleware, ReadYourWritesMiddleware
+from app.services.catalog_snapshot import snapshot_loop
+from app.services.password_pool import PasswordPoolSaturated, password_pool
+from app.services.rate_limit import RateLimited
+from app.services.warmup import warm_up, warmup_state
+
+# Асинхронные роутеры (app.api.v1.aio) повторяют синхронные,
+# но работают через AsyncSession и не занимают потоки threadpool
+if settings.DB_ASYNC:
+    from app.api.v1.aio import users, auth, categories, products, orders
+else:
+    from app.api.v1 import users, auth, categories, products, orders
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Прогрев в фоне: сервер сразу принимает запросы (/health - 200),
+    # а балансировщик ждёт /ready
+    tasks = [asyncio.create_task(warm_up(app))]
+    if settings.CATALOG_SNAPSHOT_ENABLED:
+        # Сборка снапшота каталога после изменений (GET /api/v1/catalog/snapshot)
+        tasks.append(asyncio.create_task(snapshot_loop()))
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+        password_pool.shutdown()
+
 
 app = FastAPI(
     title="FastAPI Shop",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
+app.add_middleware(MetricsMiddleware)
+# Реплики могут быть заданы только для одного из стеков (ASYNC_DATABASE_REPLICA_URLS)
+if settings.DATABASE_REPLICA_URLS or settings.ASYNC_DATABASE_REPLICA_URLS:
+    app.add_middleware(ReadYourWritesMiddleware)
+
 app.include_router(auth.router, prefix='/api/v1/auth', tags=['Auth'])
 app.include_router(users.router, prefix='/api/v1/users', tags=['Users'])
 app.include_router(categories.router, prefix='/api/v1/categories', tags=['Categories'])
 app.include_router(products.router, prefix='/api/v1/products', tags=['Products'])
+app.include_router(orders.router, prefix='/api/v1/orders', tags=['Orders'])
+# Снапшот каталога отдаётся готовым файлом без обращений к БД -
+# один роутер для обоих стеков
+if settings.CATALOG_SNAPSHOT_ENABLED:
+    app.include_router(catalog.router, prefix='/api/v1/catalog', tags=['Catalog'])
+# Состояние пулов, лимитов и реплик - только для администраторов
+app.include_router(
+    internal.router,
+    prefix='/internal',
+    tags=['Internal'],
+    dependencies=[Depends(get_current_superuser_async if settings.DB_ASYNC else get_current_superuser)],
+)
+
+
+@app.exception_handler(PasswordPoolSaturated)
+def password_pool_saturated_handler(request: Request, exc: PasswordPoolSaturated):
+    # Пул bcrypt перегружен - просим клиента повторить позже
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={'detail': 'Сервис перегружен, повторите попытку позже'},
+        headers={'Retry-After': str(exc.retry_after)},
+    )
+
+
+@app.exception_handler(RateLimited)
+def rate_limited_handler(request: Request, exc: RateLimited):
+    # Слишком много попыток входа/регистрации с этого IP или для этого email
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={'detail': 'Слишком много попыток, повторите позже'},
+        headers={'Retry-After': str(exc.retry_after)},
+    )
+
 
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
+
+
+@app.get("/ready")
+def readiness_check():
+    # /health - процесс жив; /ready - прогрев закончен, можно давать трафик
+    state = warmup_state.snapshot()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if state['status'] == 'ready' else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=state,
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
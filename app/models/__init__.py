@@ -1,5 +1,8 @@
 from app.models.user import User
-from app.models.category import Category
+from app.models.category import Category, CategoryStats
+from app.models.catalog_change import CatalogChange
 from app.models.product import Product
+from app.models.order import Order, OrderItem
+from app.models.refresh_token import RefreshToken
 
-__all__ = ["User", "Category", "Product"]
+__all__ = ["User", "Category", "CategoryStats", "Product", "Order", "OrderItem", "RefreshToken", "CatalogChange"]
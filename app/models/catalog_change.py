@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from app.core.db import Base
+
+
+class CatalogChange(Base):
+    """
+    Журнал изменений каталога (outbox): строка пишется в той же
+    транзакции, что и создание, изменение или удаление товара/категории.
+    """
+    __tablename__ = "catalog_changes"
+
+    # Порядковый номер изменения - курсор ленты (?since=).
+    # AUTOINCREMENT в SQLite: номера не переиспользуются после удаления строк.
+    # Номер выдаётся при INSERT: в порядке фиксации он только в SQLite
+    # (писатель один). В PostgreSQL меньший seq может зафиксироваться позже,
+    # поэтому лента отстаёт на CATALOG_CHANGES_LAG_SECONDS (changes_lag_seconds)
+    seq = Column(Integer, primary_key=True)
+    entity = Column(String(16), nullable=False)  # product | category
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String(8), nullable=False)  # create | update | delete
+    changed_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        # Лента одной сущности: WHERE entity = ? AND seq > ? ORDER BY seq
+        Index("ix_catalog_changes_entity_seq", "entity", "seq"),
+        {"sqlite_autoincrement": True},
+    )
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, func
+from sqlalchemy import Column, Integer, String, Numeric, ForeignKey, DateTime, func
+from sqlalchemy.orm import relationship
 from app.core.db import Base
 
 
@@ -10,3 +11,23 @@ class Category(Base):
     description = Column(String(500), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Агрегаты по товарам категории (одна строка на категорию)
+    stats = relationship("CategoryStats", uselist=False, back_populates="category", cascade="all, delete-orphan")
+
+
+class CategoryStats(Base):
+    """
+    Агрегаты товаров категории, поддерживаются в той же транзакции,
+    что и запись товаров (app.services.category_stats).
+    """
+    __tablename__ = "category_stats"
+
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    product_count = Column(Integer, default=0, nullable=False)
+    total_quantity = Column(Integer, default=0, nullable=False)
+    min_price = Column(Numeric(10, 2), nullable=True)  # NULL, если в категории нет товаров
+    max_price = Column(Numeric(10, 2), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    category = relationship("Category", back_populates="stats")
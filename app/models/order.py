@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, Numeric, ForeignKey, DateTime, Index, func
+from sqlalchemy.orm import relationship
+from app.core.db import Base
+
+
+class Order(Base):
+    __tablename__ = "orders"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    total = Column(Numeric(12, 2), nullable=False)
+    # created_at задаётся при оформлении из Python: курсор истории заказов
+    # сравнивает его точно, а CURRENT_TIMESTAMP в SQLite хранится в другом формате
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    items = relationship("OrderItem", back_populates="order", order_by="OrderItem.id")
+
+    __table_args__ = (
+        # История заказов пользователя: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_orders_user_id_created_at", "user_id", "created_at"),
+    )
+
+
+class OrderItem(Base):
+    __tablename__ = "order_items"
+
+    id = Column(Integer, primary_key=True)
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False, index=True)
+    # Товар может быть удалён позже - в позиции остаются снимок названия и цены
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="SET NULL"), nullable=True)
+    name = Column(String(200), nullable=False)
+    price = Column(Numeric(10, 2), nullable=False)  # цена за единицу на момент оформления
+    quantity = Column(Integer, nullable=False)
+
+    order = relationship("Order", back_populates="items")
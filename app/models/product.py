@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Numeric, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, String, Numeric, ForeignKey, DateTime, Index, func
 from sqlalchemy.orm import relationship
 from app.core.db import Base
 
@@ -17,3 +17,17 @@ class Product(Base):
     
     # Relationship для доступа к категории через product.category
     category = relationship("Category", backref="products")
+
+    __table_args__ = (
+        # Keyset-пагинация списка товаров внутри категории: WHERE category_id = ? AND id > ? ORDER BY id
+        Index("ix_products_category_id_id", "category_id", "id"),
+        # MIN/MAX цены в категории для category_stats - поиск по индексу, без скана;
+        # он же - сортировка по цене внутри категории
+        Index("ix_products_category_id_price", "category_id", "price"),
+        # Сортировки и фильтры списка товаров (app.services.product_listing).
+        # Второй ключ сортировки - id: в SQLite rowid неявно входит в индекс
+        Index("ix_products_category_id_created_at", "category_id", "created_at"),
+        Index("ix_products_category_id_name", "category_id", "name"),
+        Index("ix_products_price", "price"),
+        Index("ix_products_created_at", "created_at"),
+    )
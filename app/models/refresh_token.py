@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from app.core.db import Base
+
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    # jti из refresh token (случайная hex-строка)
+    id = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    # Момент обмена на новую пару. Повторное предъявление использованного
+    # токена - признак кражи: отзываются все токены пользователя
+    used_at = Column(DateTime(timezone=True), nullable=True)
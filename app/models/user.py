@@ -10,5 +10,8 @@ class User(Base):
     hashed_password = Column(String(1024), nullable=False)
     is_active = Column(Boolean, default=True)
     is_superuser = Column(Boolean, default=False)
+    # Версия токенов: входит в каждый access/refresh token, увеличение
+    # отзывает все выданные пользователю токены
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -8,11 +8,19 @@ class LoginRequest(BaseModel):
     password: str
 
 
-# Схема ответа с JWT токеном.
-# Возвращается после успешного логина.
+# Схема ответа с JWT токенами.
+# Возвращается после успешного логина и после обмена refresh token.
+# expires_in - время жизни access token в секундах.
 class Token(BaseModel):
     access_token: str
+    refresh_token: str
     token_type: str = 'bearer'
+    expires_in: int
+
+
+# Запрос на обмен refresh token (POST /auth/refresh)
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 
 # Данные, которые хранятся внутри JWT токена (payload).
@@ -0,0 +1,19 @@
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+
+
+T = TypeVar('T')
+
+
+# Запрос пакетного чтения: id в нужном клиенту порядке, повторы допустимы
+class BatchGetRequest(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=settings.BATCH_GET_MAX_IDS)
+
+
+# Найденные объекты в порядке запроса (без повторов) и id, которых нет в БД
+class BatchGetResult(BaseModel, Generic[T]):
+    items: list[T]
+    missing: list[int]
@@ -1,4 +1,6 @@
 from datetime import datetime
+from decimal import Decimal
+from typing import Literal
 from pydantic import BaseModel, ConfigDict
 
 
@@ -19,6 +21,32 @@ class CategoryRead(CategoryBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+# Агрегаты товаров категории (min/max_price - None, если товаров нет)
+class CategoryStatsRead(BaseModel):
+    category_id: int
+    product_count: int
+    total_quantity: int
+    min_price: Decimal | None = None
+    max_price: Decimal | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Категория со встроенными агрегатами (?expand=stats)
+class CategoryReadWithStats(CategoryRead):
+    stats: CategoryStatsRead | None = None
+
+
 class CategoryUpdate(BaseModel):
     name: str | None = None
     description: str | None = None
+
+
+# Элемент ленты изменений категорий (GET /categories/changes).
+# category - текущее состояние категории, None - категория уже удалена
+class CategoryChange(BaseModel):
+    seq: int
+    op: Literal['create', 'update', 'delete']
+    category_id: int
+    changed_at: datetime
+    category: CategoryRead | None = None
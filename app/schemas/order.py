@@ -0,0 +1,47 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+from app.schemas.product import StockItem
+
+
+# Позиция корзины; price - цена, которую видел покупатель:
+# если она не совпадает с текущей, заказ не оформляется
+class CheckoutItem(StockItem):
+    price: Decimal | None = None
+
+
+class CheckoutRequest(BaseModel):
+    items: list[CheckoutItem] = Field(min_length=1, max_length=1000)
+
+
+class OrderItemRead(BaseModel):
+    product_id: int | None
+    name: str
+    price: Decimal
+    quantity: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class OrderSummary(BaseModel):
+    id: int
+    user_id: int
+    total: Decimal
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_validator('created_at')
+    @classmethod
+    def _created_at_utc(cls, value: datetime) -> datetime:
+        # created_at пишется в UTC, но SQLite возвращает его без пояса:
+        # без приведения созданный заказ и он же из истории отличались бы
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
+
+
+# Заказ с позициями: GET /orders/{id}, оформление и история с ?expand=items
+class OrderRead(OrderSummary):
+    items: list[OrderItemRead]
@@ -0,0 +1,23 @@
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel
+
+
+T = TypeVar('T')
+
+
+# Страница результатов для cursor-пагинации.
+# next_cursor - непрозрачная строка, которую клиент передаёт в ?cursor=
+# для получения следующей страницы. None означает, что страниц больше нет.
+class Page(BaseModel, Generic[T]):
+    items: list[T]
+    next_cursor: str | None = None
+
+
+# Страница ленты изменений (GET .../changes?since=).
+# next_since - seq последнего изменения страницы, его передают в следующий
+# ?since=; has_more=False означает, что клиент догнал журнал.
+class ChangesPage(BaseModel, Generic[T]):
+    items: list[T]
+    next_since: int
+    has_more: bool
@@ -1,6 +1,9 @@
 from datetime import datetime
 from decimal import Decimal
-from pydantic import BaseModel, ConfigDict
+from typing import Annotated, Literal
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+from app.schemas.category import CategoryRead
 
 
 class ProductBase(BaseModel):
@@ -23,9 +26,134 @@ class ProductRead(ProductBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+# Товар со встроенной категорией (?expand=category)
+class ProductReadWithCategory(ProductRead):
+    category: CategoryRead
+
+
 class ProductUpdate(BaseModel):
     name: str | None = None
     description: str | None = None
     price: Decimal | None = None
     quantity: int | None = None
     category_id: int | None = None
+
+
+# Ошибка одной строки массового импорта (line - номер строки в теле запроса)
+class BulkImportError(BaseModel):
+    line: int
+    errors: list[str]
+
+
+# Отчёт массового импорта: errors ограничен BULK_IMPORT_MAX_ERRORS,
+# failed - точное число отклонённых строк
+class BulkImportReport(BaseModel):
+    inserted: int = 0
+    failed: int = 0
+    errors: list[BulkImportError] = []
+
+
+# Позиция резервирования/снятия резерва: qty единиц товара product_id
+class StockItem(BaseModel):
+    product_id: int
+    qty: int = Field(gt=0)
+
+
+class StockRequest(BaseModel):
+    items: list[StockItem] = Field(min_length=1, max_length=1000)
+
+
+# Остаток товара после операции со складом
+class StockLevel(BaseModel):
+    product_id: int
+    quantity: int
+
+
+class StockResult(BaseModel):
+    items: list[StockLevel]
+
+
+# Элемент ленты изменений товаров (GET /products/changes).
+# product - текущее состояние товара, None - товар уже удалён
+class ProductChange(BaseModel):
+    seq: int
+    op: Literal['create', 'update', 'delete']
+    product_id: int
+    changed_at: datetime
+    product: ProductRead | None = None
+
+
+# Фильтр массовых операций: условия объединяются через AND.
+# Нужно хотя бы одно условие, чтобы случайно не изменить весь каталог.
+class ProductBulkFilter(BaseModel):
+    category_id: int | None = None
+    ids: list[int] | None = Field(None, min_length=1, max_length=10000)
+    min_price: Decimal | None = Field(None, ge=0)
+    max_price: Decimal | None = Field(None, ge=0)
+
+    @model_validator(mode='after')
+    def _not_empty(self):
+        if self.category_id is None and self.ids is None and self.min_price is None and self.max_price is None:
+            raise ValueError('Нужно хотя бы одно условие фильтра')
+        return self
+
+
+# Значения полей для операции set (передаются только изменяемые поля)
+class ProductBulkSetValues(BaseModel):
+    description: str | None = None
+    price: Decimal | None = Field(None, ge=0)
+    quantity: int | None = Field(None, ge=0)
+    category_id: int | None = None
+
+    @model_validator(mode='after')
+    def _not_empty(self):
+        if not self.model_fields_set:
+            raise ValueError('Нужно хотя бы одно поле')
+        for field in ('price', 'quantity', 'category_id'):
+            if field in self.model_fields_set and getattr(self, field) is None:
+                raise ValueError(f'{field} не может быть null')
+        return self
+
+
+class ProductBulkSet(BaseModel):
+    op: Literal['set']
+    values: ProductBulkSetValues
+
+
+# Умножить цену на factor (округление до копеек)
+class ProductBulkMultiplyPrice(BaseModel):
+    op: Literal['multiply_price']
+    factor: Decimal = Field(gt=0)
+
+
+# Сдвинуть остаток на delta; остаток не уходит ниже нуля
+class ProductBulkAdjustQuantity(BaseModel):
+    op: Literal['adjust_quantity']
+    delta: int
+
+
+ProductBulkOperation = Annotated[
+    ProductBulkSet | ProductBulkMultiplyPrice | ProductBulkAdjustQuantity,
+    Field(discriminator='op'),
+]
+
+
+class ProductBulkUpdate(BaseModel):
+    filter: ProductBulkFilter
+    operation: ProductBulkOperation
+    # Только посчитать подходящие товары, ничего не меняя
+    dry_run: bool = False
+
+
+class ProductBulkDelete(BaseModel):
+    filter: ProductBulkFilter
+    dry_run: bool = False
+
+
+# Результат массовой операции: matched - подходящих под фильтр товаров,
+# affected - изменённых или удалённых (0 при dry_run), chunks - транзакций
+class ProductBulkResult(BaseModel):
+    matched: int
+    affected: int
+    chunks: int
+    dry_run: bool
@@ -0,0 +1,27 @@
+from collections.abc import Iterable, Sequence
+from typing import TypeVar
+
+
+T = TypeVar('T')
+
+
+def unique_ids(ids: Iterable[int]) -> list[int]:
+    """id без повторов, в порядке первого появления"""
+    return list(dict.fromkeys(ids))
+
+
+def in_request_order(rows: Sequence[T], ids: list[int]) -> tuple[list[T], list[int]]:
+    """
+    Раскладывает результат запроса id IN (...) в порядке запроса.
+
+    Args:
+        rows: Объекты с атрибутом id, в любом порядке
+        ids: Запрошенные id без повторов (unique_ids)
+
+    Returns:
+        (найденные объекты в порядке ids, id, которых нет среди rows)
+    """
+    by_id = {row.id: row for row in rows}
+    items = [by_id[id_] for id_ in ids if id_ in by_id]
+    missing = [id_ for id_ in ids if id_ not in by_id]
+    return items, missing
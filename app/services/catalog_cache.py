@@ -0,0 +1,156 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from app.core.config import settings
+
+
+# Пространства имён кэша: запись в таблицу сбрасывает только своё пространство
+PRODUCTS = 'products'
+CATEGORIES = 'categories'
+
+
+@dataclass(frozen=True, slots=True)
+class CachedBody:
+    """Готовое тело JSON-ответа и его сильный ETag"""
+    body: bytes
+    etag: str
+
+
+def make_etag(body: bytes) -> str:
+    """Сильный ETag - хеш содержимого тела ответа"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+class CatalogCache:
+    """
+    Read-through кэш сериализованных ответов каталога.
+
+    Ключ - (пространство имён, путь, отсортированные query-параметры).
+    Вытеснение LRU по суммарному размеру тел (max_bytes).
+
+    Защита от гонки с записью: перед запросом в БД обработчик берёт
+    generation(namespace), а store() не сохраняет ответ, если за это время
+    пространство было инвалидировано - иначе в кэш мог бы попасть ответ,
+    прочитанный до commit.
+
+    С репликами ответ может быть прочитан уже после commit, но с реплики,
+    которая запись ещё не получила. Поэтому settle_seconds после
+    инвалидации пространство не кэшируется (ответы только отдаются).
+
+    Кэш и invalidate() - в памяти одного процесса: запись, сделанная
+    в другом воркере uvicorn, этот кэш не сбрасывает. Сразу после записи
+    кэш точен только при одном воркере; при нескольких запись живёт
+    не дольше max_age_seconds, и столько же другие воркеры могут отдавать
+    старое тело и ETag (0 - без срока, только для одного воркера).
+    """
+
+    def __init__(self, max_bytes: int, settle_seconds: float = 0.0, max_age_seconds: float = 0.0):
+        self.max_bytes = max_bytes
+        self.settle_seconds = settle_seconds
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        # Значение - запись и monotonic-время её сохранения
+        self._entries: OrderedDict[tuple, tuple[CachedBody, float]] = OrderedDict()
+        self._size = 0
+        self._generations: dict[str, int] = {}
+        self._invalidated_at: dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(namespace: str, path: str, params: Iterable[tuple[str, str]]) -> tuple:
+        return namespace, path, tuple(sorted(params))
+
+    def lookup(self, key: tuple) -> CachedBody | None:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and self.max_age_seconds and time.monotonic() - item[1] >= self.max_age_seconds:
+                # Устарела: запись могла быть изменена другим воркером
+                del self._entries[key]
+                self._size -= len(item[0].body)
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return item[0]
+
+    def generation(self, namespace: str) -> int:
+        with self._lock:
+            return self._generations.get(namespace, 0)
+
+    def store(self, key: tuple, body: bytes, generation: int) -> CachedBody:
+        """
+        Сохраняет тело ответа и возвращает его вместе с ETag.
+
+        Запись возвращается всегда, даже если в кэш она не попала
+        (кэш выключен, тело больше лимита или данные уже устарели).
+        """
+        entry = CachedBody(body=body, etag=make_etag(body))
+
+        if len(body) > self.max_bytes:
+            return entry
+
+        with self._lock:
+            if self._generations.get(key[0], 0) != generation:
+                return entry
+            now = time.monotonic()
+            if now - self._invalidated_at.get(key[0], float('-inf')) < self.settle_seconds:
+                return entry
+
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old[0].body)
+
+            self._entries[key] = (entry, now)
+            self._size += len(body)
+
+            while self._size > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._size -= len(evicted.body)
+
+        return entry
+
+    def invalidate(self, *namespaces: str) -> None:
+        """Сбрасывает все ответы указанных пространств имён"""
+        with self._lock:
+            now = time.monotonic()
+            for namespace in namespaces:
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+                self._invalidated_at[namespace] = now
+
+            for key in [key for key in self._entries if key[0] in namespaces]:
+                self._size -= len(self._entries.pop(key)[0].body)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'size_bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'max_age_seconds': self.max_age_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+catalog_cache = CatalogCache(
+    max_bytes=settings.CATALOG_CACHE_MAX_BYTES,
+    settle_seconds=(
+        settings.DB_READ_YOUR_WRITES_SECONDS
+        if settings.DATABASE_REPLICA_URLS or settings.ASYNC_DATABASE_REPLICA_URLS
+        else 0.0
+    ),
+    max_age_seconds=settings.CATALOG_CACHE_MAX_AGE_SECONDS,
+)
@@ -0,0 +1,104 @@
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+from typing import Literal
+
+from sqlalchemy import ColumnElement, Select, insert, select, true
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.catalog_change import CatalogChange
+
+
+PRODUCT = 'product'
+CATEGORY = 'category'
+
+ChangeOp = Literal['create', 'update', 'delete']
+
+
+def record_changes(db: Session, entity: str, op: ChangeOp, entity_ids: Iterable[int]) -> None:
+    """
+    Пишет изменения в catalog_changes одним executemany.
+
+    Транзакция не фиксируется - запись журнала фиксируется вместе
+    с изменением каталога или откатывается вместе с ним.
+    """
+    changed_at = datetime.now(timezone.utc)
+    rows = [
+        {'entity': entity, 'entity_id': entity_id, 'op': op, 'changed_at': changed_at}
+        for entity_id in entity_ids
+    ]
+    if rows:
+        db.execute(insert(CatalogChange), rows)
+
+
+def changes_lag_seconds() -> float:
+    """
+    Сколько секунд изменение выдерживается, прежде чем попасть в ленту.
+
+    seq выдаётся при INSERT, а не при commit. В SQLite пишущие транзакции
+    идут строго по очереди, и порядок seq совпадает с порядком фиксации.
+    В PostgreSQL транзакция с меньшим seq может зафиксироваться позже
+    большего: клиент, уже получивший next_since > seq, это изменение
+    пропустил бы. Поэтому там лента отстаёт на CATALOG_CHANGES_LAG_SECONDS -
+    изменения транзакций короче этого срока не теряются.
+    """
+    if settings.CATALOG_CHANGES_LAG_SECONDS is not None:
+        return settings.CATALOG_CHANGES_LAG_SECONDS
+    return 0.0 if make_url(settings.DATABASE_URL).get_backend_name() == 'sqlite' else 5.0
+
+
+def settled_changes() -> ColumnElement[bool]:
+    """Условие на изменения, которые уже можно отдавать в ленте (см. changes_lag_seconds)"""
+    lag = changes_lag_seconds()
+    if not lag:
+        return true()
+    return CatalogChange.changed_at <= datetime.now(timezone.utc) - timedelta(seconds=lag)
+
+
+def build_changes_statement(model, entity: str, since: int, limit: int) -> Select:
+    """
+    Запрос страницы ленты: изменения с seq > since по возрастанию seq
+    вместе с текущим состоянием объекта (None, если он уже удалён).
+    Изменения моложе changes_lag_seconds() не отдаются.
+
+    Поиск по индексу (entity, seq), объекты - по первичному ключу.
+    Лимит применяется как есть: чтобы узнать, есть ли ещё страницы,
+    передавайте limit + 1.
+    """
+    return (
+        select(CatalogChange, model)
+        .outerjoin(model, model.id == CatalogChange.entity_id)
+        .where(CatalogChange.entity == entity, CatalogChange.seq > since, settled_changes())
+        .order_by(CatalogChange.seq)
+        .limit(limit)
+    )
+
+
+def build_changes_page(rows, limit: int, since: int, key: str) -> dict:
+    """
+    Собирает страницу ленты из строк (CatalogChange, объект).
+
+    Args:
+        key: Имя поля объекта в элементе ленты ('product' или 'category')
+
+    Returns:
+        {'items': [...], 'next_since': seq последнего изменения страницы
+        (или since, если изменений нет), 'has_more': есть ли ещё страница}
+    """
+    page = rows[:limit]
+    items = [
+        {
+            'seq': change.seq,
+            'op': change.op,
+            f'{key}_id': change.entity_id,
+            'changed_at': change.changed_at,
+            key: entity,
+        }
+        for change, entity in page
+    ]
+    return {
+        'items': items,
+        'next_since': page[-1][0].seq if page else since,
+        'has_more': len(rows) > limit,
+    }
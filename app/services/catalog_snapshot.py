@@ -0,0 +1,390 @@
+import asyncio
+import fcntl
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from sqlalchemy import func, select
+
+from app.core import db as core_db
+from app.core.config import settings
+from app.models.catalog_change import CatalogChange
+from app.models.category import Category
+from app.models.product import Product
+from app.services.catalog_changes import settled_changes
+from app.services.serialization import CATEGORY_COLUMNS, PRODUCT_COLUMNS, dump_category_rows, dump_product_rows
+
+try:
+    import brotli
+except ImportError:  # без brotli снапшот пишется только в gzip и без сжатия
+    brotli = None
+
+
+# Снапшот всего каталога - готовые файлы на диске.
+#
+# Клиентам, которым нужен каталог целиком (мобильное приложение, витрины
+# партнёров), не нужно листать страницы: GET /api/v1/catalog/snapshot
+# отдаёт файл через FileResponse (sendfile там, где сервер его умеет),
+# уже сжатый - ни БД, ни сериализации, ни сжатия на запрос. Файлы
+# пересобираются фоновой задачей после изменений каталога (журнал
+# catalog_changes) с задержкой: серия изменений даёт одну сборку.
+#
+# Версия снапшота - seq последнего изменения в журнале, прочитанный до
+# данных: в снапшоте есть все изменения до версии включительно (и, может
+# быть, более поздние). Дальше клиент догоняет по
+# /products/changes?since=<версия> - повторно применённое изменение
+# ничего не портит.
+
+IDENTITY = 'identity'
+GZIP = 'gzip'
+BROTLI = 'br'
+
+# Снапшот собирается редко, а отдаётся много раз - сжимаем сильно.
+# Максимальное качество brotli (11) на больших каталогах собирается минуты.
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+
+_SUFFIXES = {IDENTITY: '.json', GZIP: '.json.gz', BROTLI: '.json.br'}
+_FILE_PATTERN = re.compile(r'^catalog-(\d+)\.json(\.gz|\.br)?$')
+MANIFEST = 'manifest.json'
+_BUILD_LOCK = '.build.lock'
+
+
+@dataclass(frozen=True, slots=True)
+class SnapshotFile:
+    path: str
+    etag: str
+    size: int
+
+
+@dataclass(frozen=True, slots=True)
+class Snapshot:
+    """Собранная версия каталога: файлы по Content-Encoding"""
+    version: int
+    generated_at: str
+    files: dict[str, SnapshotFile]
+
+    def choose(self, accept_encoding: str) -> tuple[str, SnapshotFile]:
+        """Лучшее представление, которое принимает клиент: br, gzip, без сжатия"""
+        accepted = accepted_encodings(accept_encoding)
+        for encoding in (BROTLI, GZIP):
+            if encoding in self.files and encoding in accepted:
+                return encoding, self.files[encoding]
+        return IDENTITY, self.files[IDENTITY]
+
+
+def accepted_encodings(header: str) -> set[str]:
+    """Кодировки из Accept-Encoding, кроме запрещённых через q=0"""
+    accepted = set()
+    for item in header.split(','):
+        name, _, params = item.partition(';')
+        name = name.strip().lower()
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name and quality > 0:
+            accepted.add(name)
+    if '*' in accepted:
+        accepted |= {BROTLI, GZIP}
+    return accepted
+
+
+def latest_change_seq(db) -> int:
+    """
+    seq последнего изменения каталога, уже попавшего в ленту
+    (0 - изменений ещё не было). Клиент продолжит с since=версия,
+    поэтому версия не опережает ленту.
+    """
+    return db.scalar(select(func.coalesce(func.max(CatalogChange.seq), 0)).where(settled_changes()))
+
+
+class _HashingWriter:
+    """Файл, который считает sha256 записанных байтов"""
+
+    def __init__(self, f):
+        self._f = f
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self.sha256.update(data)
+        self.size += len(data)
+        return self._f.write(data)
+
+    def flush(self) -> None:
+        self._f.flush()
+
+
+class CatalogSnapshots:
+    """
+    Сборка снапшотов каталога в directory и текущий снапшот процесса.
+
+    refresh() вызывается периодически (snapshot_loop): снапшот пересобирается,
+    когда журнал изменений не менялся debounce_seconds, но не позже чем
+    через max_delay_seconds после первого непопавшего в снапшот изменения -
+    при непрерывном потоке изменений (остатки на складе) снапшот всё равно
+    обновляется.
+
+    Несколько воркеров делят один каталог: собирает тот, кто взял
+    файловую блокировку, остальные подхватывают новую версию из манифеста.
+    Файлы пишутся во временные и переименовываются (os.replace), поэтому
+    отдаваемый файл никогда не бывает недописанным; keep последних версий
+    остаются на диске для ответов, начатых до переключения.
+    """
+
+    def __init__(self, directory: str, debounce_seconds: float, max_delay_seconds: float, keep: int):
+        self.directory = directory
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.keep = max(keep, 1)
+        self.current: Snapshot | None = None
+        self._lock = threading.Lock()
+        # Журнал, увиденный последним опросом, и когда он изменился (monotonic)
+        self._seen_seq: int | None = None
+        self._changed_at = 0.0
+        # Когда появилось первое изменение, которого нет в снапшоте (None - таких нет)
+        self._pending_since: float | None = None
+        self.builds = 0
+        self.last_build_seconds: float | None = None
+        self.last_error: str | None = None
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def load(self) -> Snapshot | None:
+        """Подхватывает версию из манифеста, если она новее текущей"""
+        try:
+            with open(self._path(MANIFEST), 'rb') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return self.current
+
+        files = {
+            encoding: SnapshotFile(self._path(item['name']), item['etag'], item['size'])
+            for encoding, item in manifest['files'].items()
+        }
+        if not all(os.path.exists(file.path) for file in files.values()):
+            return self.current
+
+        with self._lock:
+            if self.current is None or manifest['version'] > self.current.version:
+                self.current = Snapshot(manifest['version'], manifest['generated_at'], files)
+            return self.current
+
+    def refresh(self, force: bool = False) -> Snapshot | None:
+        """
+        Опрос журнала и, если пора, сборка новой версии.
+
+        Args:
+            force: Собрать сразу, без ожидания затишья
+        """
+        self.load()
+        with core_db.SessionLocal() as db:
+            seq = latest_change_seq(db)
+
+        now = time.monotonic()
+        with self._lock:
+            current = self.current
+            if current is not None and seq <= current.version:
+                self._pending_since = None
+                self._seen_seq = seq
+                return current
+            if seq != self._seen_seq:
+                self._seen_seq = seq
+                self._changed_at = now
+            if self._pending_since is None:
+                self._pending_since = now
+            due = (
+                force
+                or current is None
+                or now - self._changed_at >= self.debounce_seconds
+                or now - self._pending_since >= self.max_delay_seconds
+            )
+        if not due:
+            return current
+        return self.build()
+
+    def build(self) -> Snapshot | None:
+        """
+        Собирает новую версию под файловой блокировкой.
+
+        Если блокировку держит другой процесс, сборки нет - его версия
+        будет подхвачена из манифеста при следующем refresh().
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(_BUILD_LOCK), 'w') as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return self.current
+
+            started = time.perf_counter()
+            try:
+                # Версию мог собрать другой процесс после нашего опроса: не переписываем
+                # файлы, ETag которых уже отдают другие процессы
+                current = self.load()
+                with core_db.SessionLocal() as db:
+                    if current is not None and latest_change_seq(db) <= current.version:
+                        return current
+                snapshot = self._write_files()
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+        with self._lock:
+            if self.current is None or snapshot.version >= self.current.version:
+                self.current = snapshot
+            if self._seen_seq is not None and self._seen_seq <= snapshot.version:
+                self._pending_since = None
+            self.builds += 1
+            self.last_build_seconds = round(time.perf_counter() - started, 4)
+            self.last_error = None
+        self._prune()
+        return snapshot
+
+    def _write_files(self) -> Snapshot:
+        with core_db.SessionLocal() as db:
+            version = latest_change_seq(db)
+            generated_at = datetime.now(timezone.utc).isoformat()
+            encodings = [IDENTITY, GZIP] + ([BROTLI] if brotli is not None else [])
+            names = {encoding: f'catalog-{version}{_SUFFIXES[encoding]}' for encoding in encodings}
+            temporary = {encoding: self._path(f'.{name}.{os.getpid()}.tmp') for encoding, name in names.items()}
+
+            handles = {encoding: open(path, 'wb') for encoding, path in temporary.items()}
+            try:
+                writers = {encoding: _HashingWriter(f) for encoding, f in handles.items()}
+                # mtime=0 и пустое имя: одинаковый каталог - одинаковые байты gzip
+                gzip_file = gzip.GzipFile(filename='', mode='wb', compresslevel=GZIP_LEVEL,
+                                          fileobj=writers[GZIP], mtime=0)
+                compressor = brotli.Compressor(quality=BROTLI_QUALITY) if BROTLI in writers else None
+
+                for chunk in _iter_snapshot_json(db, version, generated_at):
+                    writers[IDENTITY].write(chunk)
+                    gzip_file.write(chunk)
+                    if compressor is not None:
+                        writers[BROTLI].write(compressor.process(chunk))
+                gzip_file.close()
+                if compressor is not None:
+                    writers[BROTLI].write(compressor.finish())
+
+                for f in handles.values():
+                    f.flush()
+                    os.fsync(f.fileno())
+            except BaseException:
+                for f in handles.values():
+                    f.close()
+                for path in temporary.values():
+                    os.remove(path)
+                raise
+            for f in handles.values():
+                f.close()
+
+        # Сильный ETag - хеш байтов именно этого представления
+        files = {}
+        for encoding, name in names.items():
+            os.replace(temporary[encoding], self._path(name))
+            digest = writers[encoding].sha256.hexdigest()[:32]
+            files[encoding] = SnapshotFile(self._path(name), f'"{digest}"', writers[encoding].size)
+
+        manifest = {
+            'version': version,
+            'generated_at': generated_at,
+            'files': {
+                encoding: {'name': names[encoding], 'etag': file.etag, 'size': file.size}
+                for encoding, file in files.items()
+            },
+        }
+        manifest_tmp = self._path(f'.{MANIFEST}.{os.getpid()}.tmp')
+        with open(manifest_tmp, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(manifest_tmp, self._path(MANIFEST))
+        return Snapshot(version, generated_at, files)
+
+    def _prune(self) -> None:
+        """Удаляет файлы версий старше keep последних"""
+        files = [(name, _FILE_PATTERN.match(name)) for name in os.listdir(self.directory)]
+        files = [(name, int(match.group(1))) for name, match in files if match]
+        stale = sorted({version for _, version in files}, reverse=True)[self.keep:]
+        for name, version in files:
+            if version in stale:
+                try:
+                    os.remove(self._path(name))
+                except FileNotFoundError:
+                    pass
+
+    def record_error(self, error: Exception) -> None:
+        with self._lock:
+            self.last_error = f'{type(error).__name__}: {error}'
+
+    def stats(self) -> dict:
+        with self._lock:
+            current = self.current
+            return {
+                'version': current.version if current else None,
+                'generated_at': current.generated_at if current else None,
+                'files': {
+                    encoding: {'etag': file.etag, 'size': file.size}
+                    for encoding, file in current.files.items()
+                } if current else {},
+                'pending': self._pending_since is not None,
+                'builds': self.builds,
+                'last_build_seconds': self.last_build_seconds,
+                'last_error': self.last_error,
+            }
+
+
+def _iter_snapshot_json(db, version: int, generated_at: str) -> Iterator[bytes]:
+    """
+    JSON снапшота порциями: {"version", "generated_at", "categories", "products"}.
+    Элементы - как в CategoryRead и ProductRead; товары читаются порциями
+    курсора, как в выгрузке, поэтому память не растёт с размером каталога.
+    """
+    header = json.dumps({'version': version, 'generated_at': generated_at}, separators=(',', ':'))[:-1]
+    yield header.encode() + b',"categories":'
+    yield dump_category_rows(db.execute(select(*CATEGORY_COLUMNS).order_by(Category.id)).all())
+    yield b',"products":['
+
+    result = db.execute(
+        select(*PRODUCT_COLUMNS).order_by(Product.id).execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+    )
+    first = True
+    for partition in result.partitions():
+        # Массив порции без скобок - порции склеиваются через запятую
+        body = dump_product_rows(partition)[1:-1]
+        if body:
+            yield body if first else b',' + body
+            first = False
+    yield b']}'
+
+
+catalog_snapshots = CatalogSnapshots(
+    directory=settings.CATALOG_SNAPSHOT_DIR,
+    debounce_seconds=settings.CATALOG_SNAPSHOT_DEBOUNCE_SECONDS,
+    max_delay_seconds=settings.CATALOG_SNAPSHOT_MAX_DELAY_SECONDS,
+    keep=settings.CATALOG_SNAPSHOT_KEEP,
+)
+
+
+async def snapshot_loop() -> None:
+    """
+    Фоновая задача (lifespan в app.main): опрос журнала каждые
+    CATALOG_SNAPSHOT_POLL_SECONDS и сборка в потоке - цикл событий не блокируется.
+    Ошибка сборки видна в /internal/catalog-snapshot, опрос продолжается.
+    """
+    while True:
+        try:
+            await asyncio.to_thread(catalog_snapshots.refresh)
+        except Exception as exc:
+            catalog_snapshots.record_error(exc)
+        await asyncio.sleep(settings.CATALOG_SNAPSHOT_POLL_SECONDS)
@@ -0,0 +1,167 @@
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from decimal import Decimal
+
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.category import Category, CategoryStats
+from app.models.product import Product
+
+
+# Состояние товара, от которого зависят агрегаты: (category_id, quantity, price)
+ProductState = tuple[int, int, Decimal]
+
+
+@dataclass
+class StatsDelta:
+    products: int = 0
+    quantity: int = 0
+    # Набор цен категории изменился - пересчитать min/max
+    prices: bool = False
+
+
+_stats = CategoryStats.__table__
+_products = Product.__table__
+
+# Счётчики сдвигаются на дельту, без чтения текущих значений
+_shift_counters = (
+    update(_stats)
+    .where(_stats.c.category_id == bindparam('cid'))
+    .values(
+        product_count=_stats.c.product_count + bindparam('products'),
+        total_quantity=_stats.c.total_quantity + bindparam('quantity'),
+    )
+)
+
+# MIN/MAX не поддерживаются дельтами (удаление крайнего значения),
+# поэтому пересчитываются подзапросом - поиск по ix_products_category_id_price
+_refresh_prices = (
+    update(_stats)
+    .where(_stats.c.category_id == bindparam('cid'))
+    .values(
+        min_price=select(func.min(_products.c.price))
+        .where(_products.c.category_id == bindparam('cid'))
+        .scalar_subquery(),
+        max_price=select(func.max(_products.c.price))
+        .where(_products.c.category_id == bindparam('cid'))
+        .scalar_subquery(),
+    )
+)
+
+
+def apply_deltas(db: Session, deltas: dict[int, StatsDelta]) -> None:
+    """
+    Применяет изменения агрегатов в текущей транзакции.
+
+    Не более двух executemany на вызов независимо от числа категорий.
+    Транзакция не фиксируется - это делает вызывающий код вместе
+    с записью товаров.
+    """
+    if not deltas:
+        return
+
+    # Подзапросы min/max должны видеть уже записанные изменения товаров
+    db.flush()
+
+    counters = [
+        {'cid': category_id, 'products': delta.products, 'quantity': delta.quantity}
+        for category_id, delta in deltas.items()
+        if delta.products or delta.quantity
+    ]
+    if counters:
+        db.execute(_shift_counters, counters)
+
+    prices = [{'cid': category_id} for category_id, delta in deltas.items() if delta.prices]
+    if prices:
+        db.execute(_refresh_prices, prices)
+
+
+def product_state(product: Product) -> ProductState:
+    return product.category_id, product.quantity, product.price
+
+
+def _add_change(deltas: dict[int, StatsDelta], old: ProductState | None, new: ProductState | None) -> None:
+    if old is not None:
+        deltas[old[0]].products -= 1
+        deltas[old[0]].quantity -= old[1]
+    if new is not None:
+        deltas[new[0]].products += 1
+        deltas[new[0]].quantity += new[1]
+
+    if old is None or new is None or old[0] != new[0] or old[2] != new[2]:
+        for state in (old, new):
+            if state is not None:
+                deltas[state[0]].prices = True
+
+
+def product_changed(db: Session, old: ProductState | None, new: ProductState | None) -> None:
+    """Учитывает создание (old=None), изменение или удаление (new=None) товара"""
+    deltas: dict[int, StatsDelta] = defaultdict(StatsDelta)
+    _add_change(deltas, old, new)
+    apply_deltas(db, deltas)
+
+
+def products_changed(db: Session, changes: Iterable[tuple[ProductState | None, ProductState | None]]) -> None:
+    """То же для пачки товаров (массовые изменения): одна пара запросов на пачку"""
+    deltas: dict[int, StatsDelta] = defaultdict(StatsDelta)
+    for old, new in changes:
+        _add_change(deltas, old, new)
+    apply_deltas(db, deltas)
+
+
+def products_inserted(db: Session, rows: list[dict]) -> None:
+    """Учитывает пачку вставленных товаров (массовый импорт)"""
+    deltas: dict[int, StatsDelta] = defaultdict(StatsDelta)
+    for row in rows:
+        delta = deltas[row['category_id']]
+        delta.products += 1
+        delta.quantity += row['quantity']
+        delta.prices = True
+    apply_deltas(db, deltas)
+
+
+def quantity_changed(db: Session, quantities: dict[int, int]) -> None:
+    """Учитывает изменение остатков {category_id: дельта} (резервы, заказы)"""
+    apply_deltas(db, {category_id: StatsDelta(quantity=delta) for category_id, delta in quantities.items()})
+
+
+def _expected_stats():
+    return (
+        select(
+            Category.id.label('category_id'),
+            func.count(Product.id).label('product_count'),
+            func.coalesce(func.sum(Product.quantity), 0).label('total_quantity'),
+            func.min(Product.price).label('min_price'),
+            func.max(Product.price).label('max_price'),
+        )
+        .outerjoin(Product, Product.category_id == Category.id)
+        .group_by(Category.id)
+    )
+
+
+def rebuild_category_stats(db: Session) -> int:
+    """
+    Пересчитывает category_stats целиком из products одной транзакцией.
+
+    Returns:
+        Число категорий, агрегаты которых расходились с products
+        (включая отсутствующие и лишние строки)
+    """
+    columns = ['category_id', 'product_count', 'total_quantity', 'min_price', 'max_price']
+    expected = {row[0]: tuple(row) for row in db.execute(_expected_stats())}
+    current = {
+        row[0]: tuple(row)
+        for row in db.execute(select(*(getattr(CategoryStats, column) for column in columns)))
+    }
+    drifted = sum(
+        1 for category_id in expected.keys() | current.keys()
+        if expected.get(category_id) != current.get(category_id)
+    )
+
+    db.execute(delete(CategoryStats))
+    db.execute(insert(CategoryStats).from_select(columns, _expected_stats()))
+    db.commit()
+
+    return drifted
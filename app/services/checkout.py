@@ -0,0 +1,74 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.order import Order, OrderItem
+from app.models.product import Product
+from app.schemas.order import CheckoutItem, OrderItemRead, OrderRead
+from app.services.stock import StockError, decrement_stock, merge_items
+
+
+class PriceChanged(StockError):
+    """Цена товара отличается от той, что видел покупатель"""
+
+
+def checkout(db: Session, user_id: int, items: list[CheckoutItem]) -> OrderRead:
+    """
+    Оформляет заказ одной транзакцией из трёх запросов независимо от
+    размера корзины:
+
+    1. UPDATE products ... WHERE id IN (...) AND quantity >= n RETURNING
+       name, price - списывает остатки всех позиций и в том же запросе
+       читает цены; строки остаются заблокированными до фиксации,
+       поэтому цена не может измениться между проверкой и записью заказа.
+    2. INSERT заказа.
+    3. INSERT всех позиций одним executemany.
+
+    Ошибки (нет товара, не хватает остатка, изменилась цена) откатывают
+    транзакцию целиком.
+    """
+    amounts = merge_items(items)
+    rows = decrement_stock(db, amounts, Product.name, Product.price)
+
+    changed = []
+    for item in items:
+        if item.price is not None and item.price != rows[item.product_id].price:
+            if item.product_id not in changed:
+                changed.append(item.product_id)
+    if changed:
+        db.rollback()
+        raise PriceChanged(changed)
+
+    order = Order(
+        user_id=user_id,
+        total=sum(row.price * amounts[product_id] for product_id, row in rows.items()),
+        created_at=datetime.now(timezone.utc),
+    )
+    db.add(order)
+    db.flush()
+
+    order_items = [
+        {
+            'order_id': order.id,
+            'product_id': product_id,
+            'name': row.name,
+            'price': row.price,
+            'quantity': amounts[product_id],
+        }
+        for product_id, row in rows.items()
+    ]
+    db.execute(insert(OrderItem), order_items)
+
+    # Ответ собирается из уже известных данных до commit (после него
+    # атрибуты заказа истекают), без повторного чтения заказа
+    result = OrderRead(
+        id=order.id,
+        user_id=user_id,
+        total=order.total,
+        created_at=order.created_at,
+        items=[OrderItemRead(**item) for item in order_items],
+    )
+    db.commit()
+
+    return result
@@ -31,6 +31,29 @@ def create_access_token(data: dict) -> str:
     return encode_jwt
 
 
+def create_refresh_token(user_id: int, token_version: int, jti: str, expires_at: datetime) -> str:
+    """
+    Создаёт JWT refresh token.
+
+    Args:
+        user_id: ID пользователя
+        token_version: Текущая users.token_version
+        jti: ID записи в refresh_tokens (по нему токен одноразовый)
+        expires_at: Время истечения, то же, что в записи
+
+    Returns:
+        Зашифрованный JWT токен с type=refresh - как access token он не принимается
+    """
+    to_encode = {
+        'type': 'refresh',
+        'user_id': user_id,
+        'ver': token_version,
+        'jti': jti,
+        'exp': expires_at,
+    }
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
 def decode_access_token(token: str) -> dict | None:
     """
     Расшифровывает JWT токен и возвращает данные.
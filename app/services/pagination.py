@@ -0,0 +1,64 @@
+import base64
+import json
+from collections.abc import Callable, Sequence
+from typing import TypeVar
+
+
+T = TypeVar('T')
+
+
+def encode_cursor(key: dict) -> str:
+    """
+    Кодирует ключ последней строки страницы в непрозрачный курсор.
+
+    Args:
+        key: Значения ключа сортировки, например {'id': 42}
+             или {'category_id': 3, 'id': 42}
+
+    Returns:
+        Строка base64url без паддинга
+    """
+    raw = json.dumps(key, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def decode_cursor(cursor: str) -> dict | None:
+    """
+    Расшифровывает курсор, полученный от клиента.
+
+    Returns:
+        Словарь с ключом последней строки или None, если курсор невалидный
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError):
+        return None
+
+    if not isinstance(key, dict):
+        return None
+
+    return key
+
+
+def build_page(
+    rows: Sequence[T],
+    limit: int,
+    key_func: Callable[[T], dict],
+) -> tuple[list[T], str | None]:
+    """
+    Отрезает лишнюю строку и строит курсор следующей страницы.
+
+    Запрос должен выбирать limit + 1 строк: если пришла лишняя строка,
+    значит следующая страница существует, и курсор строится по последней
+    строке текущей страницы.
+
+    Returns:
+        (строки текущей страницы, курсор следующей страницы или None)
+    """
+    items = list(rows[:limit])
+
+    if len(rows) <= limit or not items:
+        return items, None
+
+    return items, encode_cursor(key_func(items[-1]))
@@ -0,0 +1,223 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.core.config import settings
+from app.services.auth import get_password_hash, verify_password
+
+
+class PasswordPoolSaturated(Exception):
+    """Пул bcrypt перегружен: задача не принята в очередь"""
+
+    def __init__(self, retry_after: int):
+        super().__init__('Пул хеширования паролей перегружен')
+        self.retry_after = retry_after
+
+
+def _noop() -> None:
+    # Задача прогрева: процесс-воркер при этом импортирует этот модуль,
+    # а вместе с ним app.services.auth и bcrypt
+    return None
+
+
+def _timed_call(func, *args):
+    # Выполняется в процессе-воркере.
+    # time.monotonic на Linux общий для всех процессов, поэтому время
+    # начала можно сравнивать с моментом постановки в очередь.
+    started_at = time.monotonic()
+    result = func(*args)
+    return result, started_at, time.monotonic()
+
+
+class _TimingStats:
+    """Простая сводка длительностей: количество, сумма и максимум"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def snapshot(self) -> dict:
+        return {
+            'count': self.count,
+            'total_seconds': round(self.total_seconds, 6),
+            'avg_seconds': round(self.total_seconds / self.count, 6) if self.count else 0.0,
+            'max_seconds': round(self.max_seconds, 6),
+        }
+
+
+class PasswordPool:
+    """
+    Ограниченный пул процессов для bcrypt с контролем допуска.
+
+    bcrypt намеренно медленный и грузит CPU, поэтому всплеск логинов
+    не должен занимать потоки threadpool, которые обслуживают остальные
+    эндпоинты. Задачи считаются в отдельных процессах, а если в работе
+    и в очереди уже workers + queue_depth задач - новая сразу отклоняется
+    исключением PasswordPoolSaturated (в ответе 503 + Retry-After).
+
+    Если процесс-воркер погиб (OOM, segfault), ProcessPoolExecutor
+    становится «сломанным» и отклоняет все задачи. Такой пул отбрасывается,
+    задача завершается тем же PasswordPoolSaturated, а следующая
+    создаёт новый пул.
+    """
+
+    def __init__(self, workers: int, queue_depth: int, retry_after: int):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.retry_after = retry_after
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.rejected = 0
+        self.restarts = 0
+        self.hash_latency = _TimingStats()
+        self.queue_wait = _TimingStats()
+
+    @property
+    def capacity(self) -> int:
+        return max(self.workers, 1) + self.queue_depth
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Пул создаётся лениво при первой задаче.
+        # spawn, а не fork: форкать процесс с потоками сервера небезопасно.
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return self._executor
+
+    def _discard_broken(self, executor: ProcessPoolExecutor) -> None:
+        """Отбрасывает сломанный пул; следующая задача создаст новый"""
+        with self._lock:
+            if self._executor is not executor:
+                return  # уже заменён другим потоком
+            self._executor = None
+            self.restarts += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self._pending >= self.capacity:
+                self.rejected += 1
+                raise PasswordPoolSaturated(self.retry_after)
+            self._pending += 1
+
+    def _release(self, submitted_at: float, timing: tuple[float, float] | None) -> None:
+        with self._lock:
+            self._pending -= 1
+            if timing is not None:
+                started_at, finished_at = timing
+                self.queue_wait.observe(max(started_at - submitted_at, 0.0))
+                self.hash_latency.observe(finished_at - started_at)
+
+    def _submit(self, func, *args) -> Future:
+        self._admit()
+        submitted_at = time.monotonic()
+
+        if self.workers <= 0:
+            # Без пула: считаем в текущем потоке, но с тем же учётом очереди
+            executor = None
+            future: Future = Future()
+            try:
+                future.set_result(_timed_call(func, *args))
+            except Exception as exc:
+                future.set_exception(exc)
+        else:
+            executor = self._get_executor()
+            try:
+                future = executor.submit(_timed_call, func, *args)
+            except BrokenProcessPool:
+                self._release(submitted_at, None)
+                self._discard_broken(executor)
+                raise PasswordPoolSaturated(self.retry_after)
+            except Exception:
+                self._release(submitted_at, None)
+                raise
+
+        result_future: Future = Future()
+
+        def _done(done: Future) -> None:
+            error = done.exception()
+            if isinstance(error, BrokenProcessPool):
+                self._release(submitted_at, None)
+                self._discard_broken(executor)
+                result_future.set_exception(PasswordPoolSaturated(self.retry_after))
+                return
+            if error is not None:
+                self._release(submitted_at, None)
+                result_future.set_exception(error)
+                return
+
+            result, started_at, finished_at = done.result()
+            self._release(submitted_at, (started_at, finished_at))
+            result_future.set_result(result)
+
+        future.add_done_callback(_done)
+        return result_future
+
+    def hash_password(self, password: str) -> str:
+        """Хеширует пароль в пуле (блокирует вызывающий поток до результата)"""
+        return self._submit(get_password_hash, password).result()
+
+    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        """Проверяет пароль в пуле (блокирует вызывающий поток до результата)"""
+        return self._submit(verify_password, plain_password, hashed_password).result()
+
+    async def hash_password_async(self, password: str) -> str:
+        """Хеширует пароль в пуле, не блокируя event loop"""
+        return await asyncio.wrap_future(self._submit(get_password_hash, password))
+
+    async def verify_password_async(self, plain_password: str, hashed_password: str) -> bool:
+        """Проверяет пароль в пуле, не блокируя event loop"""
+        return await asyncio.wrap_future(
+            self._submit(verify_password, plain_password, hashed_password)
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'queue_depth': self.queue_depth,
+                'pending': self._pending,
+                'rejected': self.rejected,
+                'restarts': self.restarts,
+                'hash_latency': self.hash_latency.snapshot(),
+                'queue_wait': self.queue_wait.snapshot(),
+            }
+
+    def start(self) -> None:
+        """
+        Запускает все процессы пула заранее (прогрев при старте приложения).
+
+        Процессы создаются по одному на задачу, пока свободных нет, и
+        запуск с импортом bcrypt занимает сотни миллисекунд - без прогрева
+        их платят первые логины после деплоя. Задачи прогрева в статистику
+        и очередь не попадают.
+        """
+        if self.workers <= 0:
+            return
+        executor = self._get_executor()
+        for future in [executor.submit(_noop) for _ in range(self.workers)]:
+            future.result()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_pool = PasswordPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_depth=settings.PASSWORD_HASH_QUEUE_DEPTH,
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER_SECONDS,
+)
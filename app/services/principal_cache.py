@@ -0,0 +1,147 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.user import User
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """
+    Лёгкий снимок аутентифицированного пользователя.
+
+    Содержит только то, что нужно для проверки доступа,
+    поэтому его можно безопасно держать в кэше между запросами.
+    """
+    id: int
+    email: str
+    is_active: bool
+    is_superuser: bool
+    # users.token_version на момент проверки (совпадает с ver токена)
+    token_version: int
+
+    @classmethod
+    def from_user(cls, user: User) -> 'Principal':
+        return cls(
+            id=user.id,
+            email=user.email,
+            is_active=bool(user.is_active),
+            is_superuser=bool(user.is_superuser),
+            token_version=user.token_version,
+        )
+
+
+class PrincipalCache:
+    """
+    Ограниченный по размеру LRU-кэш: токен -> Principal с TTL.
+
+    Запись живёт не дольше ttl_seconds и не дольше exp самого токена.
+    При изменении пользователя все его записи удаляются (invalidate_user).
+    Потокобезопасен: синхронные обработчики выполняются в threadpool.
+
+    Кэш - в памяти одного процесса, и invalidate_user срабатывает только
+    в процессе, который изменил пользователя. При нескольких воркерах
+    деактивация, отзыв токенов (/auth/revoke) или снятие is_superuser
+    доходят до остальных не позже чем через ttl_seconds. Административные
+    зависимости (get_current_superuser) поэтому перечитывают пользователя
+    из БД на каждый запрос.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # token -> (principal, expires_at)
+        self._entries: OrderedDict[str, tuple[Principal, float]] = OrderedDict()
+        # user_id -> токены этого пользователя (для инвалидации)
+        self._tokens_by_user: dict[int, set[str]] = {}
+
+    def get(self, token: str) -> Principal | None:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+
+            principal, expires_at = entry
+            if expires_at <= time.time():
+                self._remove(token)
+                return None
+
+            self._entries.move_to_end(token)
+            return principal
+
+    def put(self, token: str, principal: Principal, token_exp: float) -> None:
+        if self.max_size <= 0:
+            return
+
+        expires_at = min(time.time() + self.ttl_seconds, token_exp)
+
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+
+            self._entries[token] = (principal, expires_at)
+            self._tokens_by_user.setdefault(principal.id, set()).add(token)
+
+            # Вытесняем самые давно использованные записи
+            while len(self._entries) > self.max_size:
+                oldest_token = next(iter(self._entries))
+                self._remove(oldest_token)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            for token in self._tokens_by_user.pop(user_id, set()):
+                self._entries.pop(token, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def _remove(self, token: str) -> None:
+        principal, _ = self._entries.pop(token)
+        tokens = self._tokens_by_user.get(principal.id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[principal.id]
+
+
+principal_cache = PrincipalCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+# Инвалидация при изменении пользователя.
+# Сбрасываем записи сразу при flush и ещё раз после commit: иначе параллельный
+# запрос мог бы между flush и commit прочитать старую строку и снова её закэшировать.
+_PENDING_KEY = 'principal_cache_invalidate'
+
+
+def _on_user_changed(mapper, connection, target: User) -> None:
+    principal_cache.invalidate_user(target.id)
+
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add(target.id)
+
+
+event.listen(User, 'after_update', _on_user_changed)
+event.listen(User, 'after_delete', _on_user_changed)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session: Session) -> None:
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        principal_cache.invalidate_user(user_id)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _forget_pending(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
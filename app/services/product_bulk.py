@@ -0,0 +1,130 @@
+from sqlalchemy import Select, case, delete, func, select, update
+from sqlalchemy.orm import Session
+
+from app.models.product import Product
+from app.schemas.product import (
+    ProductBulkAdjustQuantity,
+    ProductBulkFilter,
+    ProductBulkMultiplyPrice,
+    ProductBulkOperation,
+    ProductBulkResult,
+)
+from app.services.catalog_changes import PRODUCT, record_changes
+from app.services.category_stats import products_changed
+
+
+_STATE_COLUMNS = (Product.category_id, Product.quantity, Product.price)
+
+
+def _conditions(filters: ProductBulkFilter) -> list:
+    conditions = []
+    if filters.category_id is not None:
+        conditions.append(Product.category_id == filters.category_id)
+    if filters.ids is not None:
+        conditions.append(Product.id.in_(filters.ids))
+    if filters.min_price is not None:
+        conditions.append(Product.price >= filters.min_price)
+    if filters.max_price is not None:
+        conditions.append(Product.price <= filters.max_price)
+    return conditions
+
+
+def _values(operation: ProductBulkOperation) -> dict:
+    """SET-часть UPDATE: выражения считаются в БД, строки не загружаются"""
+    if isinstance(operation, ProductBulkMultiplyPrice):
+        return {'price': func.round(Product.price * operation.factor, 2)}
+    if isinstance(operation, ProductBulkAdjustQuantity):
+        quantity = Product.quantity + operation.delta
+        return {'quantity': case((quantity < 0, 0), else_=quantity)}
+    return operation.values.model_dump(exclude_unset=True)
+
+
+def _next_chunk(conditions: list, last_id: int, chunk_size: int) -> Select:
+    # Ключ id: каждая строка попадает ровно в один кусок, даже если
+    # операция меняет поле фильтра (цену). FOR UPDATE держит строки
+    # до фиксации куска (в SQLite не нужен - писатель и так один)
+    return (
+        select(Product.id, *_STATE_COLUMNS)
+        .where(*conditions, Product.id > last_id)
+        .order_by(Product.id)
+        .limit(chunk_size)
+        .with_for_update()
+    )
+
+
+def count_matching(db: Session, filters: ProductBulkFilter) -> int:
+    """Сколько товаров подходит под фильтр (для dry_run)"""
+    return db.scalar(select(func.count()).select_from(Product).where(*_conditions(filters)))
+
+
+def bulk_update(
+    db: Session,
+    filters: ProductBulkFilter,
+    operation: ProductBulkOperation,
+    chunk_size: int,
+) -> ProductBulkResult:
+    """
+    Применяет операцию ко всем товарам под фильтром кусками по chunk_size.
+
+    Кусок - отдельная транзакция из трёх шагов: выбрать id и состояние
+    следующих строк, один UPDATE ... WHERE id IN (...) RETURNING,
+    агрегаты category_stats и журнал изменений. Долгих блокировок нет,
+    а упавший кусок не откатывает уже зафиксированные.
+    """
+    conditions = _conditions(filters)
+    values = _values(operation)
+    affected = chunks = last_id = 0
+
+    while True:
+        old_rows = db.execute(_next_chunk(conditions, last_id, chunk_size)).all()
+        if not old_rows:
+            break
+
+        ids = [row.id for row in old_rows]
+        new_rows = db.execute(
+            update(Product)
+            .where(Product.id.in_(ids))
+            .values(**values)
+            .returning(Product.id, *_STATE_COLUMNS)
+            .execution_options(synchronize_session=False)
+        ).all()
+        new_states = {row.id: tuple(row)[1:] for row in new_rows}
+
+        products_changed(db, ((tuple(row)[1:], new_states[row.id]) for row in old_rows if row.id in new_states))
+        record_changes(db, PRODUCT, 'update', [product_id for product_id in ids if product_id in new_states])
+        db.commit()
+
+        affected += len(new_rows)
+        chunks += 1
+        last_id = ids[-1]
+
+    return ProductBulkResult(matched=affected, affected=affected, chunks=chunks, dry_run=False)
+
+
+def bulk_delete(db: Session, filters: ProductBulkFilter, chunk_size: int) -> ProductBulkResult:
+    """Удаляет все товары под фильтром кусками по chunk_size (как bulk_update)"""
+    conditions = _conditions(filters)
+    affected = chunks = last_id = 0
+
+    while True:
+        old_rows = db.execute(_next_chunk(conditions, last_id, chunk_size)).all()
+        if not old_rows:
+            break
+
+        ids = [row.id for row in old_rows]
+        deleted = set(db.scalars(
+            delete(Product)
+            .where(Product.id.in_(ids))
+            .returning(Product.id)
+            .execution_options(synchronize_session=False)
+        ))
+
+        products_changed(db, ((tuple(row)[1:], None) for row in old_rows if row.id in deleted))
+        record_changes(db, PRODUCT, 'delete', [product_id for product_id in ids if product_id in deleted])
+        db.commit()
+
+        affected += len(deleted)
+        chunks += 1
+        last_id = ids[-1]
+
+    return ProductBulkResult(matched=affected, affected=affected, chunks=chunks, dry_run=False)
@@ -0,0 +1,101 @@
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Iterator, Sequence
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import Row, select
+
+from app.core import db as core_db
+from app.core.config import settings
+from app.models.product import Product
+
+
+NDJSON = 'ndjson'
+CSV = 'csv'
+
+MEDIA_TYPES = {
+    NDJSON: 'application/x-ndjson',
+    CSV: 'text/csv; charset=utf-8',
+}
+
+# Те же поля, что и в ProductRead
+EXPORT_COLUMNS = (
+    Product.id,
+    Product.name,
+    Product.description,
+    Product.price,
+    Product.quantity,
+    Product.category_id,
+    Product.created_at,
+    Product.updated_at,
+)
+FIELD_NAMES = [column.key for column in EXPORT_COLUMNS]
+
+# Выбираем колонки, а не сущность Product: строки не попадают
+# в identity map сессии, и память не растёт с размером таблицы
+_EXPORT_QUERY = select(*EXPORT_COLUMNS).order_by(Product.id)
+
+
+def _json_default(value):
+    # Формат как у ProductRead: Decimal - строкой, datetime - ISO 8601
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'Неподдерживаемый тип {type(value).__name__}')
+
+
+def serialize_rows(rows: Sequence[Row], fmt: str) -> bytes:
+    """Сериализует порцию строк в NDJSON или CSV (без заголовка)"""
+    if fmt == NDJSON:
+        return b''.join(
+            json.dumps(dict(zip(FIELD_NAMES, row)), default=_json_default, ensure_ascii=False).encode('utf-8') + b'\n'
+            for row in rows
+        )
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerows(
+        [value.isoformat() if isinstance(value, datetime) else value for value in row]
+        for row in rows
+    )
+    return buffer.getvalue().encode('utf-8')
+
+
+def csv_header() -> bytes:
+    return (','.join(FIELD_NAMES) + '\n').encode('utf-8')
+
+
+def iter_export(fmt: str) -> Iterator[bytes]:
+    """
+    Потоковая выгрузка всех товаров (синхронный стек).
+
+    Сессия открывается внутри генератора, а не берётся из get_db:
+    ответ отдаётся уже после выхода из обработчика.
+    yield_per включает серверный курсор (stream_results) там, где драйвер
+    его поддерживает, поэтому в памяти только одна порция строк.
+    """
+    if fmt == CSV:
+        yield csv_header()
+
+    with core_db.SessionLocal() as db:
+        result = db.execute(
+            _EXPORT_QUERY.execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+        )
+        for partition in result.partitions():
+            yield serialize_rows(partition, fmt)
+
+
+async def iter_export_async(fmt: str) -> AsyncIterator[bytes]:
+    """Потоковая выгрузка всех товаров (асинхронный стек, AsyncSession.stream)"""
+    if fmt == CSV:
+        yield csv_header()
+
+    async with core_db.AsyncSessionLocal() as db:
+        result = await db.stream(
+            _EXPORT_QUERY.execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+        )
+        async for partition in result.partitions():
+            yield serialize_rows(partition, fmt)
@@ -0,0 +1,153 @@
+import bisect
+import csv
+import json
+from collections.abc import AsyncIterator
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.models.category import Category
+from app.models.product import Product
+from app.schemas.product import BulkImportError, BulkImportReport, ProductCreate
+from app.services.catalog_changes import PRODUCT, record_changes
+from app.services.category_stats import products_inserted
+
+
+NDJSON = 'ndjson'
+CSV = 'csv'
+
+_CONTENT_TYPES = {
+    'application/x-ndjson': NDJSON,
+    'application/ndjson': NDJSON,
+    'application/jsonl': NDJSON,
+    'text/csv': CSV,
+}
+
+_CSV_REQUIRED_COLUMNS = {'name', 'price', 'category_id'}
+
+
+def detect_format(content_type: str | None) -> str | None:
+    """Определяет формат импорта по заголовку Content-Type"""
+    if not content_type:
+        return None
+    return _CONTENT_TYPES.get(content_type.split(';', 1)[0].strip().lower())
+
+
+def add_error(report: BulkImportReport, line: int, errors: list[str], max_errors: int) -> None:
+    """
+    Учитывает отклонённую строку; подробности сохраняются до max_errors штук.
+
+    Ошибки категорий пачки приходят после ошибок разбора более поздних
+    строк, поэтому отчёт держится отсортированным по номеру строки,
+    а при переполнении остаются самые ранние строки.
+    """
+    report.failed += 1
+    if len(report.errors) < max_errors or (report.errors and line < report.errors[-1].line):
+        bisect.insort(report.errors, BulkImportError(line=line, errors=errors), key=lambda error: error.line)
+        del report.errors[max_errors:]
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, bytes]]:
+    """
+    Режет поток байтов тела запроса на строки.
+
+    В памяти держится только текущий кусок и незавершённая строка.
+    Пустые строки пропускаются, номера строк считаются с 1.
+    """
+    buffer = b''
+    line_no = 0
+
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b'\n')
+        for raw in lines:
+            line_no += 1
+            if raw.strip():
+                yield line_no, raw
+
+    if buffer.strip():
+        yield line_no + 1, buffer
+
+
+def _validation_messages(exc: ValidationError) -> list[str]:
+    return [
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+        for error in exc.errors()
+    ]
+
+
+async def iter_products(
+    chunks: AsyncIterator[bytes],
+    fmt: str,
+    report: BulkImportReport,
+    max_errors: int,
+) -> AsyncIterator[tuple[int, ProductCreate]]:
+    """
+    Разбирает NDJSON/CSV и валидирует строки через ProductCreate.
+
+    Невалидные строки попадают в отчёт, валидные отдаются как
+    (номер строки, ProductCreate). CSV: первая строка - заголовок,
+    одна запись на строку, пустая ячейка означает "не задано".
+    """
+    header: list[str] | None = None
+
+    async for line_no, raw in iter_lines(chunks):
+        try:
+            line = raw.decode('utf-8-sig' if line_no == 1 else 'utf-8').rstrip('\r')
+            if fmt == NDJSON:
+                row = json.loads(line)
+                if not isinstance(row, dict):
+                    raise ValueError('ожидается JSON-объект')
+            else:
+                values = next(csv.reader([line]))
+                if header is None:
+                    header = [column.strip() for column in values]
+                    missing = _CSV_REQUIRED_COLUMNS - set(header)
+                    if missing:
+                        add_error(report, line_no, [f"нет колонок: {', '.join(sorted(missing))}"], max_errors)
+                        return
+                    continue
+                if len(values) != len(header):
+                    raise ValueError(f'ожидалось {len(header)} колонок, получено {len(values)}')
+                row = {column: value for column, value in zip(header, values) if value != ''}
+        except ValueError as exc:
+            add_error(report, line_no, [str(exc)], max_errors)
+            continue
+
+        try:
+            yield line_no, ProductCreate.model_validate(row)
+        except ValidationError as exc:
+            add_error(report, line_no, _validation_messages(exc), max_errors)
+
+
+def insert_batch(
+    db: Session,
+    batch: list[tuple[int, ProductCreate]],
+    report: BulkImportReport,
+    max_errors: int,
+) -> None:
+    """
+    Вставляет пачку товаров одной транзакцией.
+
+    Существование категорий проверяется одним запросом IN для всей пачки,
+    строки вставляются одним executemany без загрузки ORM-объектов.
+    Агрегаты category_stats и журнал изменений обновляются в той же
+    транзакции; id новых строк берутся из INSERT ... RETURNING.
+    """
+    category_ids = {product.category_id for _, product in batch}
+    existing = set(db.scalars(select(Category.id).where(Category.id.in_(category_ids))))
+
+    rows = []
+    for line_no, product in batch:
+        if product.category_id not in existing:
+            add_error(report, line_no, ['category_id: Категория не найдена'], max_errors)
+            continue
+        rows.append(product.model_dump())
+
+    if rows:
+        product_ids = db.scalars(insert(Product).returning(Product.id), rows).all()
+        products_inserted(db, rows)
+        record_changes(db, PRODUCT, 'create', product_ids)
+        db.commit()
+        report.inserted += len(rows)
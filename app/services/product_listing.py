@@ -0,0 +1,189 @@
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Literal
+
+from sqlalchemy import Select, String, and_, or_, select, type_coerce
+
+from app.models.product import Product
+
+
+# Сортировка списка товаров: поле, '-' в начале - по убыванию.
+# Вторым ключом всегда идёт id, чтобы порядок и курсор были однозначными.
+ProductSort = Literal['id', '-id', 'price', '-price', 'created_at', '-created_at', 'name', '-name']
+
+SORT_COLUMNS = {
+    'id': Product.id,
+    'price': Product.price,
+    'created_at': Product.created_at,
+    'name': Product.name,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class ProductFilters:
+    category_id: int | None = None
+    min_price: Decimal | None = None
+    max_price: Decimal | None = None
+    # True - только в наличии (quantity > 0), False - только отсутствующие
+    in_stock: bool | None = None
+    # Префикс названия с учётом регистра
+    name_prefix: str | None = None
+
+
+def _prefix_upper_bound(prefix: str) -> str | None:
+    """
+    Наименьшая строка больше всех строк с данным префиксом.
+
+    None - такой строки нет (префикс только из U+10FFFF), тогда
+    достаточно нижней границы.
+    """
+    # Последний символ U+10FFFF увеличить нельзя - увеличиваем предыдущий
+    prefix = prefix.rstrip(chr(sys.maxunicode))
+    if not prefix:
+        return None
+    code = ord(prefix[-1]) + 1
+    if 0xD800 <= code <= 0xDFFF:
+        # Суррогаты не кодируются в UTF-8; между ними нет допустимых строк
+        code = 0xE000
+    return prefix[:-1] + chr(code)
+
+
+def _sqlite_datetime_text(value: datetime) -> str:
+    # SQLite хранит DateTime текстом: server_default (CURRENT_TIMESTAMP)
+    # пишет без долей секунды, SQLAlchemy - с микросекундами. Курсор
+    # сравнивается с сохранённым текстом, иначе строки с той же секундой
+    # терялись бы или повторялись между страницами.
+    text = value.strftime('%Y-%m-%d %H:%M:%S')
+    if value.microsecond:
+        text += f'.{value.microsecond:06d}'
+    return text
+
+
+def _dump_value(field: str, value) -> str:
+    if field == 'created_at':
+        return value.isoformat()
+    return str(value)
+
+
+def _parse_value(field: str, raw) -> Decimal | datetime | str | None:
+    if not isinstance(raw, str):
+        return None
+    try:
+        if field == 'price':
+            return Decimal(raw)
+        if field == 'created_at':
+            return datetime.fromisoformat(raw)
+    except (InvalidOperation, ValueError):
+        return None
+    return raw
+
+
+def cursor_key(product, sort: ProductSort, category_id: int | None) -> dict:
+    """Ключ курсора для последней строки страницы"""
+    key = {'category_id': category_id, 'id': product.id}
+    field = sort.lstrip('-')
+    if sort != 'id':
+        key['sort'] = sort
+    if field != 'id':
+        key['value'] = _dump_value(field, getattr(product, field))
+    return key
+
+
+def parse_cursor_key(key: dict | None, sort: ProductSort, category_id: int | None) -> tuple | None:
+    """
+    Проверяет ключ курсора для текущих sort и category_id.
+
+    Returns:
+        (значение поля сортировки, id) или None, если курсор не подходит
+    """
+    if (
+        key is None
+        or not isinstance(key.get('id'), int)
+        or key.get('category_id') != category_id
+        or key.get('sort', 'id') != sort
+    ):
+        return None
+
+    field = sort.lstrip('-')
+    if field == 'id':
+        return key['id'], key['id']
+
+    value = _parse_value(field, key.get('value'))
+    if value is None:
+        return None
+    return value, key['id']
+
+
+def build_list_statement(
+    dialect_name: str,
+    filters: ProductFilters,
+    sort: ProductSort,
+    after: tuple | None,
+    limit: int,
+    *entities,
+) -> Select:
+    """
+    Строит запрос страницы товаров с фильтрами, сортировкой и keyset-курсором.
+
+    Все условия сравнимы с индексами: префикс названия - диапазоном
+    name >= p AND name < p', а не LIKE (в SQLite LIKE без учёта регистра
+    и индекс по name не использует). Под каждую сортировку есть индекс
+    (поле) и (category_id, поле) - см. scripts/check_product_query_plans.
+
+    Args:
+        entities: Что выбирать (Product или колонки), по умолчанию Product
+        after: (значение сортировки, id) последней строки предыдущей страницы
+    """
+    query = select(*(entities or (Product,)))
+
+    if filters.category_id is not None:
+        query = query.where(Product.category_id == filters.category_id)
+    if filters.min_price is not None:
+        query = query.where(Product.price >= filters.min_price)
+    if filters.max_price is not None:
+        query = query.where(Product.price <= filters.max_price)
+    if filters.in_stock is not None:
+        query = query.where(Product.quantity > 0 if filters.in_stock else Product.quantity == 0)
+    if filters.name_prefix:
+        query = query.where(Product.name >= filters.name_prefix)
+        upper_bound = _prefix_upper_bound(filters.name_prefix)
+        if upper_bound is not None:
+            query = query.where(Product.name < upper_bound)
+
+    field = sort.lstrip('-')
+    descending = sort.startswith('-')
+    column = SORT_COLUMNS[field]
+
+    if after is not None:
+        value, last_id = after
+        if field == 'id':
+            query = query.where(Product.id < last_id if descending else Product.id > last_id)
+        else:
+            if field == 'created_at' and dialect_name == 'sqlite':
+                column_value = type_coerce(Product.created_at, String)
+                value = _sqlite_datetime_text(value)
+            else:
+                column_value = column
+            # Избыточное column >= value даёт планировщику границу для поиска
+            # по индексу, а не скана с начала
+            if descending:
+                query = query.where(
+                    column_value <= value,
+                    or_(column_value < value, and_(column_value == value, Product.id < last_id)),
+                )
+            else:
+                query = query.where(
+                    column_value >= value,
+                    or_(column_value > value, and_(column_value == value, Product.id > last_id)),
+                )
+
+    if field == 'id':
+        order_by = (Product.id.desc(),) if descending else (Product.id,)
+    elif descending:
+        order_by = (column.desc(), Product.id.desc())
+    else:
+        order_by = (column, Product.id)
+
+    return query.order_by(*order_by).limit(limit)
@@ -0,0 +1,217 @@
+import asyncio
+import itertools
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.core.config import settings
+
+
+class RateLimited(Exception):
+    """Лимит попыток исчерпан: запрос отклоняется до поиска пользователя и bcrypt"""
+
+    def __init__(self, retry_after: int):
+        super().__init__('Слишком много попыток')
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True, slots=True)
+class Limit:
+    """
+    Правило token bucket: capacity попыток подряд, затем корзина
+    пополняется равномерно и наполняется полностью за window_seconds.
+    capacity = 0 выключает правило.
+    """
+    name: str
+    capacity: int
+    window_seconds: float
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.capacity / self.window_seconds
+
+
+def _take(tokens: float, updated_at: float, now: float, limit: Limit) -> tuple[float, float]:
+    """
+    Пополняет корзину на прошедшее время и пытается взять одну попытку.
+
+    Returns:
+        (жетонов после операции, сколько секунд ждать; 0 - попытка разрешена)
+    """
+    tokens = min(float(limit.capacity), tokens + (now - updated_at) * limit.refill_per_second)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / limit.refill_per_second
+
+
+class MemoryBucketStore:
+    """
+    Корзины в памяти процесса: у каждого воркера свои лимиты.
+
+    Ключей не больше max_keys: давно не использованные вытесняются (LRU),
+    что равносильно полной корзине - злоумышленнику это даёт не больше,
+    чем смена IP.
+    """
+
+    shared = False
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, limit: Limit, now: float) -> float:
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (float(limit.capacity), now))
+            tokens, wait = _take(tokens, updated_at, now, limit)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._buckets)
+
+
+class SQLiteBucketStore:
+    """
+    Корзины в локальном файле SQLite, общие для всех воркеров на хосте.
+
+    Операция - одна короткая транзакция BEGIN IMMEDIATE (чтение и запись
+    корзины под блокировкой записи), поэтому воркеры не теряют попытки
+    друг друга. Файл в /dev/shm держит корзины в разделяемой памяти.
+    Полные корзины (expires_at в прошлом) удаляются раз в PRUNE_EVERY операций.
+    """
+
+    shared = True
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path: str, busy_timeout_ms: int):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        # next() у itertools.count атомарен: счётчик не теряет операции
+        # параллельных запросов из threadpool
+        self._operations = itertools.count(1)
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3-соединение нельзя делить между потоками - по одному на поток
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS rate_limit_buckets ('
+                'key TEXT PRIMARY KEY, tokens REAL NOT NULL, '
+                'updated_at REAL NOT NULL, expires_at REAL NOT NULL)'
+            )
+            self._local.conn = conn
+        return conn
+
+    def take(self, key: str, limit: Limit, now: float) -> float:
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?', (key,)
+            ).fetchone()
+            tokens, updated_at = row if row is not None else (float(limit.capacity), now)
+            tokens, wait = _take(tokens, updated_at, now, limit)
+            # Когда корзина снова наполнится, запись можно удалить
+            expires_at = now + (limit.capacity - tokens) / limit.refill_per_second
+            conn.execute(
+                'INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated_at, expires_at) '
+                'VALUES (?, ?, ?, ?)',
+                (key, tokens, now, expires_at),
+            )
+
+            if next(self._operations) % self.PRUNE_EVERY == 0:
+                conn.execute('DELETE FROM rate_limit_buckets WHERE expires_at < ?', (now,))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return wait
+
+    def size(self) -> int:
+        return self._connection().execute('SELECT count(*) FROM rate_limit_buckets').fetchone()[0]
+
+
+class RateLimiter:
+    """
+    Проверка нескольких правил (например, по IP и по email) за один вызов.
+
+    Попытка списывается из каждой корзины; если хотя бы одна пуста,
+    бросается RateLimited с наибольшим временем ожидания (429 + Retry-After).
+    """
+
+    def __init__(self, store: MemoryBucketStore | SQLiteBucketStore, enabled: bool = True):
+        self.store = store
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.rejected: dict[str, int] = {}
+
+    def check(self, *checks: tuple[Limit, str]) -> None:
+        """
+        Args:
+            checks: Пары (правило, ключ), например (LOGIN_PER_IP, '10.0.0.1')
+        """
+        if not self.enabled:
+            return
+
+        now = time.time()
+        wait = 0.0
+        for limit, key in checks:
+            if limit.capacity <= 0:
+                continue
+            rule_wait = self.store.take(f'{limit.name}:{key}', limit, now)
+            if rule_wait:
+                with self._lock:
+                    self.rejected[limit.name] = self.rejected.get(limit.name, 0) + 1
+                wait = max(wait, rule_wait)
+
+        if wait:
+            raise RateLimited(max(math.ceil(wait), 1))
+
+    async def check_async(self, *checks: tuple[Limit, str]) -> None:
+        """Как check; общий SQLite-стор может ждать блокировку - это делается в потоке"""
+        if self.enabled and self.store.shared:
+            await asyncio.to_thread(self.check, *checks)
+        else:
+            self.check(*checks)
+
+    def stats(self) -> dict:
+        with self._lock:
+            rejected = dict(self.rejected)
+        return {
+            'enabled': self.enabled,
+            'store': 'sqlite' if self.store.shared else 'memory',
+            'keys': self.store.size(),
+            'rejected': rejected,
+        }
+
+
+LOGIN_PER_IP = Limit('login_ip', settings.LOGIN_RATE_LIMIT_PER_IP, settings.RATE_LIMIT_WINDOW_SECONDS)
+LOGIN_PER_EMAIL = Limit('login_email', settings.LOGIN_RATE_LIMIT_PER_EMAIL, settings.RATE_LIMIT_WINDOW_SECONDS)
+REGISTER_PER_IP = Limit('register_ip', settings.REGISTER_RATE_LIMIT_PER_IP, settings.RATE_LIMIT_WINDOW_SECONDS)
+
+
+rate_limiter = RateLimiter(
+    SQLiteBucketStore(settings.RATE_LIMIT_STORE_PATH, settings.SQLITE_BUSY_TIMEOUT_MS)
+    if settings.RATE_LIMIT_STORE_PATH
+    else MemoryBucketStore(settings.RATE_LIMIT_MAX_KEYS),
+    enabled=settings.RATE_LIMIT_ENABLED,
+)
+
+
+def client_ip(request) -> str:
+    """
+    IP клиента для ключа лимита. За reverse proxy uvicorn должен
+    запускаться с --proxy-headers, тогда здесь адрес из X-Forwarded-For.
+    """
+    return request.client.host if request.client else 'unknown'
@@ -0,0 +1,111 @@
+import secrets
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+from app.schemas.auth import Token
+from app.services.jwt import create_access_token, create_refresh_token, decode_access_token
+
+
+class InvalidRefreshToken(Exception):
+    """Refresh token невалидный, истёк, отозван или уже обменян"""
+
+
+def issue_tokens(db: Session, user: User) -> Token:
+    """
+    Выдаёт пару access + refresh token и фиксирует транзакцию.
+
+    Refresh token записывается в refresh_tokens (по jti), заодно
+    удаляются истёкшие записи этого пользователя.
+    """
+    now = datetime.now(timezone.utc)
+    expires_at = now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    jti = secrets.token_hex(16)
+    # После commit атрибуты пользователя истекают - читаем заранее
+    user_id, email, token_version = user.id, user.email, user.token_version
+
+    db.execute(delete(RefreshToken).where(RefreshToken.user_id == user_id, RefreshToken.expires_at < now))
+    db.add(RefreshToken(id=jti, user_id=user_id, expires_at=expires_at))
+    db.commit()
+
+    access_token = create_access_token(
+        data={
+            'user_id': user_id,
+            'email': email,
+            'ver': token_version,
+        }
+    )
+    return Token(
+        access_token=access_token,
+        refresh_token=create_refresh_token(user_id, token_version, jti, expires_at),
+        expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    )
+
+
+def rotate_refresh_token(db: Session, refresh_token: str) -> Token:
+    """
+    Обменивает refresh token на новую пару без проверки пароля.
+
+    Токен одноразовый: запись помечается использованной условным UPDATE
+    (used_at IS NULL), поэтому из параллельных обменов одного токена
+    проходит только один. Повторное предъявление уже обменянного токена
+    означает, что он утёк, - отзываются все токены пользователя.
+
+    Raises:
+        InvalidRefreshToken: Токен невалидный, истёк, отозван или уже обменян
+    """
+    payload = decode_access_token(refresh_token)
+    if (
+        payload is None
+        or payload.get('type') != 'refresh'
+        or not isinstance(payload.get('user_id'), int)
+        or not isinstance(payload.get('jti'), str)
+    ):
+        raise InvalidRefreshToken()
+
+    user_id, jti = payload['user_id'], payload['jti']
+    now = datetime.now(timezone.utc)
+    consumed = db.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.id == jti,
+            RefreshToken.user_id == user_id,
+            RefreshToken.used_at.is_(None),
+            RefreshToken.expires_at > now,
+        )
+        .values(used_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+    if not consumed:
+        reused = db.scalar(select(RefreshToken.id).where(RefreshToken.id == jti, RefreshToken.used_at.is_not(None)))
+        if reused is not None:
+            revoke_user_tokens(db, user_id)
+        else:
+            db.rollback()
+        raise InvalidRefreshToken()
+
+    user = db.get(User, user_id)
+    if user is None or not user.is_active or user.token_version != payload.get('ver'):
+        db.rollback()
+        raise InvalidRefreshToken()
+
+    return issue_tokens(db, user)
+
+
+def revoke_user_tokens(db: Session, user_id: int) -> None:
+    """
+    Отзывает все access и refresh токены пользователя: увеличивает
+    users.token_version и удаляет его refresh-записи. Фиксирует транзакцию.
+
+    Кэш Principal сбрасывается событием обновления User (principal_cache).
+    """
+    user = db.get(User, user_id)
+    if user is not None:
+        user.token_version = User.token_version + 1
+    db.execute(delete(RefreshToken).where(RefreshToken.user_id == user_id))
+    db.commit()
@@ -0,0 +1,82 @@
+import re
+
+from sqlalchemy import TextClause, text
+
+
+# Слова запроса: буквы/цифры в любом алфавите.
+# Всё остальное (кавычки, операторы FTS5/tsquery) отбрасываем,
+# чтобы пользовательский ввод не мог сломать синтаксис запроса.
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Веса колонок для ранжирования: совпадение в name важнее, чем в description
+_NAME_WEIGHT = 10.0
+_DESCRIPTION_WEIGHT = 1.0
+
+
+def tokenize_query(q: str) -> list[str]:
+    """Разбивает поисковую строку на слова"""
+    return _TOKEN_RE.findall(q.lower())
+
+
+def _sqlite_statement(tokens: list[str]) -> tuple[TextClause, dict]:
+    # "слово1" "слово2"* - все слова обязательны, последнее ищется по префиксу
+    match = ' '.join(f'"{token}"' for token in tokens) + '*'
+    statement = text(
+        "SELECT products.* FROM products_fts "
+        "JOIN products ON products.id = products_fts.rowid "
+        "WHERE products_fts MATCH :match "
+        f"ORDER BY bm25(products_fts, {_NAME_WEIGHT}, {_DESCRIPTION_WEIGHT}), products.id "
+        "LIMIT :limit OFFSET :offset"
+    )
+    return statement, {'match': match}
+
+
+def _postgresql_statement(tokens: list[str]) -> tuple[TextClause, dict]:
+    # слово1 & слово2:* - все слова обязательны, последнее ищется по префиксу
+    tsquery = ' & '.join(tokens) + ':*'
+    statement = text(
+        "SELECT products.* FROM products "
+        "WHERE products.search_vector @@ to_tsquery('simple', :tsquery) "
+        "ORDER BY ts_rank_cd(products.search_vector, to_tsquery('simple', :tsquery)) DESC, "
+        "products.id "
+        "LIMIT :limit OFFSET :offset"
+    )
+    return statement, {'tsquery': tsquery}
+
+
+_STATEMENT_BUILDERS = {
+    'sqlite': _sqlite_statement,
+    'postgresql': _postgresql_statement,
+}
+
+
+def build_search_statement(
+    dialect_name: str,
+    tokens: list[str],
+    limit: int,
+    offset: int,
+) -> tuple[TextClause, dict]:
+    """
+    Строит ранжированный полнотекстовый запрос по товарам.
+
+    SQLite - FTS5-таблица products_fts (bm25), PostgreSQL - колонка
+    search_vector с GIN-индексом (ts_rank_cd). Обе создаются миграцией.
+    Запрос возвращает строки products и подходит для
+    select(Product).from_statement(...).
+
+    Args:
+        dialect_name: Имя диалекта движка (db.get_bind().dialect.name)
+        tokens: Слова запроса из tokenize_query (непустой список)
+        limit: Сколько строк выбрать
+        offset: Сколько строк пропустить
+
+    Returns:
+        (текстовый SQL, параметры)
+    """
+    builder = _STATEMENT_BUILDERS.get(dialect_name)
+    if builder is None:
+        raise RuntimeError(f"Полнотекстовый поиск не поддерживается для {dialect_name}")
+
+    statement, params = builder(tokens)
+    params.update(limit=limit, offset=offset)
+    return statement, params
@@ -0,0 +1,82 @@
+from datetime import datetime
+from decimal import Decimal
+
+from pydantic import TypeAdapter
+from sqlalchemy import Row
+from typing_extensions import TypedDict
+
+from app.models.category import Category
+from app.models.product import Product
+
+
+# Быстрый путь сериализации списков (FAST_JSON_LISTS).
+#
+# Обычный путь: ORM-объекты -> валидация Page[ProductRead] через
+# from_attributes (getattr на каждое поле каждой строки) -> JSON.
+# Быстрый путь: строки только с нужными колонками -> TypedDict-схема,
+# которую pydantic-core сериализует в байты без валидации и без
+# создания моделей. Поля и их порядок совпадают с ProductRead/CategoryRead,
+# поэтому тело ответа (и ETag) получается тем же байт в байт.
+
+
+class ProductRow(TypedDict):
+    name: str
+    description: str | None
+    price: Decimal
+    quantity: int
+    category_id: int
+    id: int
+    created_at: datetime
+    updated_at: datetime | None
+
+
+class CategoryRow(TypedDict):
+    name: str
+    description: str | None
+    id: int
+    created_at: datetime
+    updated_at: datetime | None
+
+
+class ProductRowsPage(TypedDict):
+    items: list[ProductRow]
+    next_cursor: str | None
+
+
+class CategoryRowsPage(TypedDict):
+    items: list[CategoryRow]
+    next_cursor: str | None
+
+
+# Колонки в порядке полей схем чтения
+PRODUCT_COLUMNS = tuple(getattr(Product, field) for field in ProductRow.__annotations__)
+CATEGORY_COLUMNS = tuple(getattr(Category, field) for field in CategoryRow.__annotations__)
+
+_product_page_adapter = TypeAdapter(ProductRowsPage)
+_category_page_adapter = TypeAdapter(CategoryRowsPage)
+_product_rows_adapter = TypeAdapter(list[ProductRow])
+_category_rows_adapter = TypeAdapter(list[CategoryRow])
+
+
+def dump_product_page(rows: list[Row], next_cursor: str | None) -> bytes:
+    """Сериализует страницу строк PRODUCT_COLUMNS в JSON-байты"""
+    return _product_page_adapter.dump_json(
+        {'items': [row._asdict() for row in rows], 'next_cursor': next_cursor}
+    )
+
+
+def dump_category_page(rows: list[Row], next_cursor: str | None) -> bytes:
+    """Сериализует страницу строк CATEGORY_COLUMNS в JSON-байты"""
+    return _category_page_adapter.dump_json(
+        {'items': [row._asdict() for row in rows], 'next_cursor': next_cursor}
+    )
+
+
+def dump_product_rows(rows: list[Row]) -> bytes:
+    """Сериализует строки PRODUCT_COLUMNS в JSON-массив"""
+    return _product_rows_adapter.dump_json([row._asdict() for row in rows])
+
+
+def dump_category_rows(rows: list[Row]) -> bytes:
+    """Сериализует строки CATEGORY_COLUMNS в JSON-массив"""
+    return _category_rows_adapter.dump_json([row._asdict() for row in rows])
@@ -0,0 +1,95 @@
+from sqlalchemy import Row, case, select, update
+from sqlalchemy.orm import Session
+
+from app.models.product import Product
+from app.schemas.product import StockItem
+from app.services.catalog_changes import PRODUCT, record_changes
+from app.services.category_stats import quantity_changed
+
+
+class StockError(Exception):
+    """Операция со складом не применена ни к одной позиции"""
+
+    def __init__(self, product_ids: list[int]):
+        super().__init__(product_ids)
+        self.product_ids = product_ids
+
+
+class ProductsNotFound(StockError):
+    pass
+
+
+class InsufficientStock(StockError):
+    pass
+
+
+def merge_items(items: list[StockItem]) -> dict[int, int]:
+    """Суммирует количества по product_id (порядок - первое вхождение)"""
+    amounts: dict[int, int] = {}
+    for item in items:
+        amounts[item.product_id] = amounts.get(item.product_id, 0) + item.qty
+    return amounts
+
+
+def _update_stock(db: Session, amounts: dict[int, int], reserve: bool, *columns) -> dict[int, Row]:
+    """
+    Меняет остатки всех позиций одним условным UPDATE ... RETURNING.
+
+    Количество для каждой строки берётся из CASE по id, поэтому вся
+    операция - один запрос без предварительного чтения остатков.
+    При резервировании строка обновляется только если quantity >= n:
+    проверка и списание атомарны, гонки "прочитал-записал" нет.
+    Если обновились не все позиции, транзакция откатывается целиком.
+    Агрегаты category_stats и журнал изменений пишутся в той же транзакции.
+    Транзакция не фиксируется - это делает вызывающий код.
+
+    Returns:
+        {product_id: строка (id, quantity, category_id, *columns)} в порядке amounts
+    """
+    delta = case(amounts, value=Product.id)
+    statement = update(Product).where(Product.id.in_(amounts))
+    if reserve:
+        statement = statement.where(Product.quantity >= delta).values(quantity=Product.quantity - delta)
+    else:
+        statement = statement.values(quantity=Product.quantity + delta)
+    statement = statement.returning(Product.id, Product.quantity, Product.category_id, *columns).execution_options(
+        synchronize_session=False
+    )
+
+    rows = {row.id: row for row in db.execute(statement)}
+    failed = [product_id for product_id in amounts if product_id not in rows]
+    if not failed:
+        quantities: dict[int, int] = {}
+        for product_id, amount in amounts.items():
+            category_id = rows[product_id].category_id
+            quantities[category_id] = quantities.get(category_id, 0) + (-amount if reserve else amount)
+        quantity_changed(db, quantities)
+        record_changes(db, PRODUCT, 'update', amounts)
+        return {product_id: rows[product_id] for product_id in amounts}
+
+    # Отличаем отсутствующие товары от нехватки остатка в той же транзакции
+    existing = set(db.scalars(select(Product.id).where(Product.id.in_(failed))))
+    db.rollback()
+    missing = [product_id for product_id in failed if product_id not in existing]
+    if missing:
+        raise ProductsNotFound(missing)
+    raise InsufficientStock(failed)
+
+
+def decrement_stock(db: Session, amounts: dict[int, int], *columns) -> dict[int, Row]:
+    """Списывает остатки без фиксации транзакции (для оформления заказа)"""
+    return _update_stock(db, amounts, True, *columns)
+
+
+def reserve_stock(db: Session, items: list[StockItem]) -> dict[int, int]:
+    """Списывает остатки всех позиций атомарно, возвращает {product_id: остаток}"""
+    rows = _update_stock(db, merge_items(items), True)
+    db.commit()
+    return {product_id: row.quantity for product_id, row in rows.items()}
+
+
+def release_stock(db: Session, items: list[StockItem]) -> dict[int, int]:
+    """Возвращает зарезервированное на склад, возвращает {product_id: остаток}"""
+    rows = _update_stock(db, merge_items(items), False)
+    db.commit()
+    return {product_id: row.quantity for product_id, row in rows.items()}
@@ -0,0 +1,139 @@
+import asyncio
+import threading
+import time
+from contextlib import AsyncExitStack, ExitStack
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import text
+from sqlalchemy.orm import configure_mappers
+
+from app.core import db as core_db
+from app.core.config import settings
+from app.services.password_pool import password_pool
+
+
+# Прогрев при старте (lifespan в app.main).
+#
+# Без него первые запросы после деплоя или масштабирования платят за то,
+# что делается один раз на процесс: настройку мапперов SQLAlchemy, открытие
+# соединений пула, запуск процессов bcrypt, построение OpenAPI-схемы,
+# компиляцию SQL и первый проход сериализации. Прогрев идёт в фоне:
+# /health отвечает сразу, а /ready - только когда прогрев закончен.
+
+
+class WarmupState:
+    """Ход прогрева для /ready: длительность шагов и ошибки"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ready = False
+        self.seconds: float | None = None
+        self.steps: dict[str, float] = {}
+        self.errors: dict[str, str] = {}
+
+    def step_done(self, name: str, seconds: float, error: Exception | None = None) -> None:
+        with self._lock:
+            self.steps[name] = round(seconds, 4)
+            if error is not None:
+                self.errors[name] = f'{type(error).__name__}: {error}'
+            else:
+                self.errors.pop(name, None)
+
+    def finish(self, seconds: float) -> None:
+        with self._lock:
+            self.ready = True
+            self.seconds = round(seconds, 4)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'status': 'ready' if self.ready else 'starting',
+                'warmup_seconds': self.seconds,
+                'steps': dict(self.steps),
+                'errors': dict(self.errors),
+            }
+
+
+warmup_state = WarmupState()
+
+
+def _pool_connections(engine) -> int:
+    # QueuePool - pool_size соединений; пулы без размера (SQLite в памяти) - одно
+    size = getattr(engine.pool, 'size', None)
+    return size() if callable(size) else 1
+
+
+def _open_pool(engine) -> None:
+    """Открывает pool_size соединений одновременно и возвращает их в пул"""
+    with ExitStack() as stack:
+        for _ in range(_pool_connections(engine)):
+            stack.enter_context(engine.connect()).execute(text('SELECT 1'))
+
+
+async def _open_pool_async(engine) -> None:
+    async with AsyncExitStack() as stack:
+        for _ in range(_pool_connections(engine.sync_engine)):
+            connection = await stack.enter_async_context(engine.connect())
+            await connection.execute(text('SELECT 1'))
+
+
+async def _open_pools() -> None:
+    # Пулы стека, роутеры которого подключены в app.main, вместе с репликами
+    if settings.DB_ASYNC:
+        for engine in [core_db.async_engine] + [replica.engine for replica in core_db.async_replicas.replicas]:
+            await _open_pool_async(engine)
+    else:
+        for engine in [core_db.engine] + [replica.engine for replica in core_db.replicas.replicas]:
+            await asyncio.to_thread(_open_pool, engine)
+
+
+async def _fetch_catalog(app: FastAPI) -> None:
+    """
+    GET каталога через само приложение: компилируются SQL-запросы
+    и сериализаторы этих роутов, ответы попадают в кэш каталога.
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://warmup') as client:
+        for path in settings.WARMUP_CATALOG_PATHS:
+            response = await client.get(path)
+            response.raise_for_status()
+
+
+async def _run_step(name: str, step) -> bool:
+    step_started = time.perf_counter()
+    error = None
+    try:
+        await step()
+    except Exception as exc:
+        error = exc
+    warmup_state.step_done(name, time.perf_counter() - step_started, error)
+    return error is None
+
+
+async def warm_up(app: FastAPI) -> None:
+    """
+    Прогревает процесс и отмечает его готовым (warmup_state.ready).
+
+    Ошибка необязательного шага не останавливает прогрев и не мешает
+    готовности: такие шаги только ускоряют первые запросы. Без соединения
+    с БД (шаг db_pool) процесс не может ответить ни на один запрос
+    каталога, поэтому готовность ждёт, пока шаг не пройдёт: он повторяется
+    каждые WARMUP_RETRY_SECONDS. Ошибки видны в ответе /ready.
+    """
+    started = time.perf_counter()
+    if settings.WARMUP_ENABLED:
+        steps = [
+            ('mappers', lambda: asyncio.to_thread(configure_mappers)),
+            ('db_pool', _open_pools),
+            ('password_pool', lambda: asyncio.to_thread(password_pool.start)),
+            ('openapi', lambda: asyncio.to_thread(app.openapi)),
+            ('catalog', lambda: _fetch_catalog(app)),
+        ]
+        results = {name: await _run_step(name, step) for name, step in steps}
+
+        while not results['db_pool']:
+            await asyncio.sleep(settings.WARMUP_RETRY_SECONDS)
+            results['db_pool'] = await _run_step('db_pool', _open_pools)
+
+    warmup_state.finish(time.perf_counter() - started)
@@ -0,0 +1,184 @@
+"""
+Бенчмарк: синхронный стек (SessionLocal + threadpool) против асинхронного
+(AsyncSession + aiosqlite/asyncpg) при конкурентности выше лимита threadpool.
+
+Каждый запрос выполняет SQL-запрос с искусственным ожиданием на стороне БД
+(SQLite-функция bench_sleep), как будто это сетевой round trip к PostgreSQL.
+Синхронный обработчик держит поток из threadpool Starlette (по умолчанию 40),
+асинхронный - только соединение из пула.
+
+Запуск:
+    python -m benchmarks.async_concurrency
+    python -m benchmarks.async_concurrency --concurrency 200 --requests 2000 --db-latency-ms 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+
+def run_worker(args: argparse.Namespace) -> dict:
+    """Поднимает приложение в текущем процессе и гоняет через него нагрузку"""
+    # Настройки читаются при импорте app.*, поэтому окружение задаём заранее
+    os.environ['DATABASE_URL'] = f'sqlite:///{args.db_path}'
+    os.environ['DB_ASYNC'] = '1' if args.mode == 'async' else '0'
+    os.environ['ASYNC_DB_POOL_SIZE'] = str(args.concurrency)
+    os.environ['ASYNC_DB_MAX_OVERFLOW'] = '0'
+
+    import httpx
+    from fastapi import Depends
+    from sqlalchemy import create_engine, event, text
+
+    from app.core import db as core_db
+    from app.main import app
+
+    def _bench_sleep(ms):
+        time.sleep(ms / 1000)
+        return ms
+
+    if args.mode == 'async':
+        target_engine = core_db.async_engine.sync_engine
+    else:
+        # Синхронному движку даём пул не меньше конкурентности,
+        # чтобы упирались именно в threadpool, а не в пул соединений
+        target_engine = create_engine(
+            os.environ['DATABASE_URL'],
+            connect_args={'check_same_thread': False},
+            pool_size=args.concurrency,
+            max_overflow=0,
+        )
+        core_db.SessionLocal.configure(bind=target_engine)
+
+    @event.listens_for(target_engine, 'connect')
+    def _register_sleep(dbapi_connection, connection_record):
+        dbapi_connection.create_function('bench_sleep', 1, _bench_sleep)
+
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def _enter():
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+
+    def _leave():
+        nonlocal in_flight
+        with lock:
+            in_flight -= 1
+
+    stmt = text('SELECT bench_sleep(:ms)')
+
+    if args.mode == 'async':
+        @app.get('/bench/db-wait')
+        async def bench_db_wait(db=Depends(core_db.get_async_db)):
+            _enter()
+            try:
+                await db.execute(stmt, {'ms': args.db_latency_ms})
+            finally:
+                _leave()
+            return {'ok': True}
+    else:
+        @app.get('/bench/db-wait')
+        def bench_db_wait(db=Depends(core_db.get_db)):
+            _enter()
+            try:
+                db.execute(stmt, {'ms': args.db_latency_ms})
+            finally:
+                _leave()
+            return {'ok': True}
+
+    latencies: list[float] = []
+
+    async def _client(client: httpx.AsyncClient, count: int) -> None:
+        for _ in range(count):
+            started = time.perf_counter()
+            response = await client.get('/bench/db-wait')
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+
+    async def _main() -> float:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+            # прогрев: соединения пула и первые обращения к роутеру
+            await client.get('/bench/db-wait')
+            latencies.clear()
+
+            per_client, rest = divmod(args.requests, args.concurrency)
+            started = time.perf_counter()
+            await asyncio.gather(*(
+                _client(client, per_client + (1 if i < rest else 0))
+                for i in range(args.concurrency)
+            ))
+            return time.perf_counter() - started
+
+    elapsed = asyncio.run(_main())
+    latencies.sort()
+
+    def _percentile(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    return {
+        'mode': args.mode,
+        'concurrency': args.concurrency,
+        'requests': len(latencies),
+        'db_latency_ms': args.db_latency_ms,
+        'elapsed_s': round(elapsed, 3),
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(_percentile(0.50), 2),
+        'p99_ms': round(_percentile(0.99), 2),
+        'peak_in_flight_db_calls': peak,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--db-latency-ms', type=float, default=100.0)
+    parser.add_argument('--mode', choices=['sync', 'async'])
+    parser.add_argument('--db-path')
+    args = parser.parse_args()
+
+    # Внутренний режим: один прогон в отдельном процессе
+    if args.mode:
+        print(json.dumps(run_worker(args)))
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ('sync', 'async'):
+            db_path = os.path.join(tmp, f'{mode}.db')
+            output = subprocess.run(
+                [
+                    sys.executable, '-m', 'benchmarks.async_concurrency',
+                    '--mode', mode,
+                    '--db-path', db_path,
+                    '--concurrency', str(args.concurrency),
+                    '--requests', str(args.requests),
+                    '--db-latency-ms', str(args.db_latency_ms),
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+
+    header = f"{'mode':<6} {'conc':>5} {'rps':>9} {'p50 ms':>9} {'p99 ms':>9} {'peak in-flight':>15}"
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        print(
+            f"{r['mode']:<6} {r['concurrency']:>5} {r['rps']:>9} "
+            f"{r['p50_ms']:>9} {r['p99_ms']:>9} {r['peak_in_flight_db_calls']:>15}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,618 @@
+"""
+Нагрузочный бенчмарк всех роутов /api/v1 внутри процесса.
+
+Приложение (app.main.app) вызывается напрямую через httpx.ASGITransport,
+без сервера и сети. Для каждого размера набора данных (по умолчанию 1k,
+100k и 1M товаров) поднимается отдельный процесс со своей копией
+засеянной БД. Каждый сценарий (роут + параметры) гоняется с заданной
+конкурентностью, в результат пишутся rps и задержки p50/p95/p99.
+
+Засеянные БД кэшируются в --data-dir по размеру, ревизии alembic
+и SEED_VERSION, поэтому 1M сеется один раз. Перед каждым прогоном берётся свежая копия,
+чтобы пишущие сценарии не накапливали изменения.
+
+Результаты сохраняются в JSON (--output). С --baseline результаты
+сравниваются с сохранённым прогоном: рост p95 или падение rps больше
+--tolerance считается регрессией, и процесс завершается с кодом 1.
+
+Запуск:
+    python -m benchmarks.load --sizes 1000 --output results.json
+    python -m benchmarks.load --output baseline.json
+    python -m benchmarks.load --baseline baseline.json --tolerance 0.2
+    python -m benchmarks.load --async --with-cache
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Callable
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BENCH_EMAIL = 'bench@example.com'
+BENCH_PASSWORD = 'bench-password'
+
+CATEGORY_COUNT = 100
+SEED_CHUNK = 50_000
+# Меняется вместе с содержимым засева, чтобы не брать устаревший кэш
+SEED_VERSION = 3
+
+# Словарь для названий товаров, чтобы полнотекстовому поиску было что искать
+ADJECTIVES = ['red', 'blue', 'green', 'large', 'small', 'wireless', 'steel', 'wooden', 'smart', 'classic']
+NOUNS = ['chair', 'table', 'lamp', 'phone', 'kettle', 'speaker', 'backpack', 'monitor', 'keyboard', 'bottle']
+
+
+# --- Засев -------------------------------------------------------------------
+
+def alembic_head() -> str:
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config(os.path.join(REPO_ROOT, 'alembic.ini'))
+    return ScriptDirectory.from_config(config).get_current_head()
+
+
+def seed_database(path: str, size: int) -> None:
+    """Создаёт схему миграциями и заливает size товаров пачками"""
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.orm import Session
+
+    from app.models.category import Category
+    from app.models.product import Product
+    from app.models.user import User
+    from app.services.auth import get_password_hash
+    from app.services.category_stats import rebuild_category_stats
+
+    tmp_path = path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    # Схема - через alembic, чтобы были FTS-таблица, триггеры и индексы миграций
+    subprocess.run(
+        [sys.executable, '-m', 'alembic', 'upgrade', 'head'],
+        cwd=REPO_ROOT,
+        env={**os.environ, 'DATABASE_URL': f'sqlite:///{tmp_path}'},
+        check=True,
+        capture_output=True,
+    )
+
+    rng = random.Random(size)
+    now = datetime.now(timezone.utc)
+    engine = create_engine(f'sqlite:///{tmp_path}')
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [{
+            'email': BENCH_EMAIL,
+            'hashed_password': get_password_hash(BENCH_PASSWORD),
+            'is_active': True,
+            'is_superuser': True,
+        }])
+        conn.execute(Category.__table__.insert(), [
+            {'name': f'category {i}', 'description': f'seeded category {i}'}
+            for i in range(CATEGORY_COUNT)
+        ])
+
+    for start in range(0, size, SEED_CHUNK):
+        rows = []
+        for i in range(start, min(start + SEED_CHUNK, size)):
+            name = f'{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {i}'
+            rows.append({
+                'name': name,
+                'description': f'{name} from the seeded catalog',
+                'price': Decimal(rng.randint(100, 100_000)) / 100,
+                # Остатки с запасом, чтобы резервы и заказы не упирались в ноль
+                'quantity': rng.randint(1_000, 100_000),
+                'category_id': rng.randint(1, CATEGORY_COUNT),
+                'created_at': now,
+                'updated_at': now,
+            })
+        with engine.begin() as conn:
+            conn.execute(Product.__table__.insert(), rows)
+
+    # Товары вставлены в обход API - агрегаты категорий считаем целиком
+    with Session(engine) as db:
+        rebuild_category_stats(db)
+
+    # ... и журнал изменений: весь каталог как create, как после миграции
+    with engine.begin() as conn:
+        for entity, table in (('category', 'categories'), ('product', 'products')):
+            conn.execute(text(
+                "INSERT INTO catalog_changes (entity, entity_id, op, changed_at) "
+                f"SELECT '{entity}', id, 'create', CURRENT_TIMESTAMP FROM {table} ORDER BY id"
+            ))
+
+    # Закрытие последнего соединения переносит WAL в основной файл
+    engine.dispose()
+    os.replace(tmp_path, path)
+
+
+# --- Сценарии ----------------------------------------------------------------
+
+@dataclass
+class Context:
+    """Общее состояние сценариев одного прогона"""
+    size: int
+    rng: random.Random
+    headers: dict = field(default_factory=dict)
+    counter: int = 0
+    created_categories: list = field(default_factory=list)
+    created_products: list = field(default_factory=list)
+    created_orders: list = field(default_factory=list)
+    refresh_tokens: list = field(default_factory=list)
+
+    def next_id(self) -> int:
+        self.counter += 1
+        return self.counter
+
+    def product_id(self) -> int:
+        return self.rng.randint(1, self.size)
+
+    def category_id(self) -> int:
+        return self.rng.randint(1, CATEGORY_COUNT)
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    route: str
+    build: Callable[[Context], tuple[str, dict]]
+    requests: int = 500
+    concurrency: int = 16
+    expected_status: int = 200
+    on_response: Callable[[Context, object], None] | None = None
+
+
+def _product_payload(ctx: Context) -> dict:
+    return {
+        'name': f'bench product {ctx.next_id()}',
+        'description': 'created by the load benchmark',
+        'price': '19.99',
+        'quantity': 10,
+        'category_id': ctx.category_id(),
+    }
+
+
+def _bulk_body(ctx: Context) -> dict:
+    lines = [json.dumps(_product_payload(ctx)) for _ in range(100)]
+    return {
+        'content': ('\n'.join(lines) + '\n').encode(),
+        'headers': {**ctx.headers, 'Content-Type': 'application/x-ndjson'},
+    }
+
+
+def _cart(ctx: Context, size: int) -> dict:
+    product_ids = ctx.rng.sample(range(1, ctx.size + 1), min(size, ctx.size))
+    return {
+        'headers': ctx.headers,
+        'json': {'items': [{'product_id': product_id, 'qty': 1} for product_id in product_ids]},
+    }
+
+
+def _list_cursor(ctx: Context, category_id: int | None = None) -> str:
+    from app.services.pagination import encode_cursor
+
+    return encode_cursor({'category_id': category_id, 'id': ctx.product_id()})
+
+
+def _remember(target: str) -> Callable[[Context, object], None]:
+    def callback(ctx: Context, response) -> None:
+        getattr(ctx, target).append(response.json()['id'])
+    return callback
+
+
+def _remember_refresh_token(ctx: Context, response) -> None:
+    ctx.refresh_tokens.append(response.json()['refresh_token'])
+
+
+def _pop(items: list, fallback: int) -> int:
+    return items.pop() if items else fallback
+
+
+def build_scenarios(size: int) -> list[Scenario]:
+    """Сценарии в порядке выполнения: создающие раньше удаляющих"""
+    from app.services.pagination import encode_cursor
+
+    # Выгрузка читает всю таблицу, на больших наборах хватит пары запросов
+    export_requests = max(2, min(20, 1_000_000 // max(size, 1)))
+    login = {'json': {'email': BENCH_EMAIL, 'password': BENCH_PASSWORD}}
+    bulk_delete_requests, bulk_delete_ids, delete_requests = 20, 5, 500
+
+    return [
+        # auth
+        Scenario('auth.login', 'POST', '/api/v1/auth/login',
+                 lambda ctx: ('/api/v1/auth/login', login),
+                 requests=20, concurrency=4, on_response=_remember_refresh_token),
+        # Refresh token одноразовый: каждый запрос берёт токен из пула
+        # и кладёт туда новый из ответа
+        Scenario('auth.refresh', 'POST', '/api/v1/auth/refresh',
+                 lambda ctx: ('/api/v1/auth/refresh', {'json': {'refresh_token': ctx.refresh_tokens.pop()}}),
+                 requests=200, concurrency=1, on_response=_remember_refresh_token),
+        # users
+        Scenario('users.create', 'POST', '/api/v1/users/',
+                 lambda ctx: ('/api/v1/users/', {'json': {
+                     'email': f'user{ctx.next_id()}@example.com', 'password': 'secret-password',
+                 }}),
+                 requests=20, concurrency=4, expected_status=201),
+        Scenario('users.me', 'GET', '/api/v1/users/me',
+                 lambda ctx: ('/api/v1/users/me', {'headers': ctx.headers})),
+        Scenario('users.get', 'GET', '/api/v1/users/{user_id}',
+                 lambda ctx: ('/api/v1/users/1', {})),
+        Scenario('users.batch_get', 'POST', '/api/v1/users/batch-get',
+                 lambda ctx: ('/api/v1/users/batch-get', {'json': {'ids': [1, 2]}})),
+        # categories
+        Scenario('categories.list', 'GET', '/api/v1/categories/',
+                 lambda ctx: ('/api/v1/categories/', {'params': {
+                     'cursor': encode_cursor({'id': ctx.rng.randint(0, CATEGORY_COUNT - 1)}),
+                 }})),
+        Scenario('categories.list_stats', 'GET', '/api/v1/categories/',
+                 lambda ctx: ('/api/v1/categories/', {'params': {'expand': 'stats'}})),
+        Scenario('categories.batch_get', 'POST', '/api/v1/categories/batch-get',
+                 lambda ctx: ('/api/v1/categories/batch-get', {'json': {
+                     'ids': [ctx.category_id() for _ in range(20)],
+                 }})),
+        Scenario('categories.changes', 'GET', '/api/v1/categories/changes',
+                 lambda ctx: ('/api/v1/categories/changes', {})),
+        Scenario('categories.get', 'GET', '/api/v1/categories/{category_id}',
+                 lambda ctx: (f'/api/v1/categories/{ctx.category_id()}', {})),
+        Scenario('categories.stats', 'GET', '/api/v1/categories/{category_id}/stats',
+                 lambda ctx: (f'/api/v1/categories/{ctx.category_id()}/stats', {})),
+        Scenario('categories.create', 'POST', '/api/v1/categories/',
+                 lambda ctx: ('/api/v1/categories/', {'headers': ctx.headers, 'json': {
+                     'name': f'bench category {ctx.next_id()}',
+                 }}),
+                 requests=200, expected_status=201, on_response=_remember('created_categories')),
+        Scenario('categories.update', 'PUT', '/api/v1/categories/{category_id}',
+                 lambda ctx: (f'/api/v1/categories/{ctx.category_id()}', {'headers': ctx.headers, 'json': {
+                     'description': f'updated {ctx.next_id()}',
+                 }}),
+                 requests=200),
+        Scenario('categories.delete', 'DELETE', '/api/v1/categories/{category_id}',
+                 lambda ctx: (f'/api/v1/categories/{_pop(ctx.created_categories, 0)}', {'headers': ctx.headers}),
+                 requests=200, expected_status=204),
+        # products: чтение
+        Scenario('products.list', 'GET', '/api/v1/products/',
+                 lambda ctx: ('/api/v1/products/', {'params': {'cursor': _list_cursor(ctx)}})),
+        Scenario('products.list_by_category', 'GET', '/api/v1/products/',
+                 lambda ctx: ('/api/v1/products/', {'params': (lambda c: {
+                     'category_id': c, 'cursor': _list_cursor(ctx, c),
+                 })(ctx.category_id())})),
+        Scenario('products.list_expand', 'GET', '/api/v1/products/',
+                 lambda ctx: ('/api/v1/products/', {'params': {
+                     'expand': 'category', 'cursor': _list_cursor(ctx),
+                 }})),
+        Scenario('products.list_filtered', 'GET', '/api/v1/products/',
+                 lambda ctx: ('/api/v1/products/', {'params': {
+                     'min_price': ctx.rng.randint(1, 500), 'in_stock': True, 'sort': '-price',
+                 }})),
+        Scenario('products.list_sorted', 'GET', '/api/v1/products/',
+                 lambda ctx: ('/api/v1/products/', {'params': {
+                     'category_id': ctx.category_id(),
+                     'sort': ctx.rng.choice(['price', '-created_at', 'name']),
+                 }})),
+        Scenario('products.list_name_prefix', 'GET', '/api/v1/products/',
+                 lambda ctx: ('/api/v1/products/', {'params': {
+                     'name_prefix': ctx.rng.choice(ADJECTIVES), 'sort': 'name',
+                 }})),
+        Scenario('products.search', 'GET', '/api/v1/products/search',
+                 lambda ctx: ('/api/v1/products/search', {'params': {
+                     'q': f'{ctx.rng.choice(ADJECTIVES)} {ctx.rng.choice(NOUNS)}',
+                 }})),
+        Scenario('products.batch_get', 'POST', '/api/v1/products/batch-get',
+                 lambda ctx: ('/api/v1/products/batch-get', {'json': {
+                     'ids': [ctx.product_id() for _ in range(50)],
+                 }})),
+        Scenario('products.changes', 'GET', '/api/v1/products/changes',
+                 lambda ctx: ('/api/v1/products/changes', {'params': {'since': ctx.rng.randint(0, ctx.size)}})),
+        Scenario('products.get', 'GET', '/api/v1/products/{product_id}',
+                 lambda ctx: (f'/api/v1/products/{ctx.product_id()}', {})),
+        Scenario('products.get_expand', 'GET', '/api/v1/products/{product_id}',
+                 lambda ctx: (f'/api/v1/products/{ctx.product_id()}', {'params': {'expand': 'category'}})),
+        Scenario('products.export', 'GET', '/api/v1/products/export',
+                 lambda ctx: ('/api/v1/products/export', {'headers': ctx.headers, 'params': {'format': 'ndjson'}}),
+                 requests=export_requests, concurrency=1),
+        # Снапшот каталога - готовый gzip-файл, собирается в run_worker до сценариев
+        Scenario('catalog.snapshot', 'GET', '/api/v1/catalog/snapshot',
+                 lambda ctx: ('/api/v1/catalog/snapshot', {'headers': {'Accept-Encoding': 'gzip'}}),
+                 requests=export_requests, concurrency=1),
+        Scenario('catalog.snapshot_etag', 'GET', '/api/v1/catalog/snapshot',
+                 lambda ctx: ('/api/v1/catalog/snapshot', {'headers': {'Accept-Encoding': 'gzip', 'If-None-Match': '*'}}),
+                 expected_status=304),
+        # products: запись
+        # Созданные товары удаляют products.bulk_delete и products.delete -
+        # создаём столько, чтобы каждое удаление получило существующий товар
+        Scenario('products.create', 'POST', '/api/v1/products/',
+                 lambda ctx: ('/api/v1/products/', {'headers': ctx.headers, 'json': _product_payload(ctx)}),
+                 requests=delete_requests + bulk_delete_requests * bulk_delete_ids,
+                 expected_status=201, on_response=_remember('created_products')),
+        Scenario('products.bulk', 'POST', '/api/v1/products/bulk',
+                 lambda ctx: ('/api/v1/products/bulk', _bulk_body(ctx)),
+                 requests=50, concurrency=4),
+        Scenario('products.reserve', 'POST', '/api/v1/products/reserve',
+                 lambda ctx: ('/api/v1/products/reserve', _cart(ctx, 5))),
+        Scenario('products.release', 'POST', '/api/v1/products/release',
+                 lambda ctx: ('/api/v1/products/release', _cart(ctx, 5))),
+        Scenario('products.update', 'PUT', '/api/v1/products/{product_id}',
+                 lambda ctx: (f'/api/v1/products/{ctx.product_id()}', {'headers': ctx.headers, 'json': {
+                     'quantity': ctx.rng.randint(1_000, 100_000),
+                 }})),
+        Scenario('products.bulk_update', 'POST', '/api/v1/products/bulk-update',
+                 lambda ctx: ('/api/v1/products/bulk-update', {'headers': ctx.headers, 'json': {
+                     'filter': {'category_id': ctx.category_id(), 'max_price': ctx.rng.randint(10, 100)},
+                     'operation': {'op': 'adjust_quantity', 'delta': ctx.rng.randint(1, 10)},
+                 }}),
+                 requests=50, concurrency=2),
+        Scenario('products.bulk_delete', 'POST', '/api/v1/products/bulk-delete',
+                 lambda ctx: ('/api/v1/products/bulk-delete', {'headers': ctx.headers, 'json': {
+                     'filter': {'ids': [_pop(ctx.created_products, 0) for _ in range(bulk_delete_ids)]},
+                 }}),
+                 requests=bulk_delete_requests, concurrency=1),
+        Scenario('products.delete', 'DELETE', '/api/v1/products/{product_id}',
+                 lambda ctx: (f'/api/v1/products/{_pop(ctx.created_products, 0)}', {'headers': ctx.headers}),
+                 requests=delete_requests, expected_status=204),
+        # orders: время оформления не должно расти с размером корзины
+        Scenario('orders.create', 'POST', '/api/v1/orders/',
+                 lambda ctx: ('/api/v1/orders/', _cart(ctx, 5)),
+                 expected_status=201, on_response=_remember('created_orders')),
+        Scenario('orders.create_cart50', 'POST', '/api/v1/orders/',
+                 lambda ctx: ('/api/v1/orders/', _cart(ctx, 50)),
+                 expected_status=201),
+        Scenario('orders.list', 'GET', '/api/v1/orders/',
+                 lambda ctx: ('/api/v1/orders/', {'headers': ctx.headers})),
+        Scenario('orders.list_expand', 'GET', '/api/v1/orders/',
+                 lambda ctx: ('/api/v1/orders/', {'headers': ctx.headers, 'params': {'expand': 'items', 'limit': 10}})),
+        Scenario('orders.get', 'GET', '/api/v1/orders/{order_id}',
+                 lambda ctx: (f'/api/v1/orders/{ctx.rng.choice(ctx.created_orders or [0])}', {'headers': ctx.headers})),
+        # Последним: отзывает все токены пользователя бенчмарка, включая ctx.headers
+        Scenario('auth.revoke', 'POST', '/api/v1/auth/revoke',
+                 lambda ctx: ('/api/v1/auth/revoke', {'headers': ctx.headers}),
+                 requests=1, concurrency=1, expected_status=204),
+    ]
+
+
+def uncovered_routes(app, scenarios: list[Scenario]) -> list[str]:
+    """Роуты /api/v1 из OpenAPI-схемы, для которых нет сценария"""
+    covered = {(s.method, s.route) for s in scenarios}
+    missing = []
+    for path, operations in app.openapi()['paths'].items():
+        if not path.startswith('/api/v1/'):
+            continue
+        for method in operations:
+            if (method.upper(), path) not in covered:
+                missing.append(f'{method.upper()} {path}')
+    return missing
+
+
+# --- Прогон ------------------------------------------------------------------
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Перцентиль методом ближайшего ранга"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(q / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def run_scenario(client, ctx: Context, scenario: Scenario) -> dict:
+    latencies = []
+    errors = 0
+    remaining = iter(range(scenario.requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            url, kwargs = scenario.build(ctx)
+            started = time.perf_counter()
+            response = await client.request(scenario.method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != scenario.expected_status:
+                errors += 1
+            elif scenario.on_response is not None:
+                scenario.on_response(ctx, response)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(scenario.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'route': f'{scenario.method} {scenario.route}',
+        'requests': scenario.requests,
+        'concurrency': scenario.concurrency,
+        'errors': errors,
+        'rps': round(scenario.requests / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def run_worker(args: argparse.Namespace) -> dict:
+    """Готовит копию засеянной БД и прогоняет все сценарии в этом процессе"""
+    work_path = os.path.join(args.work_dir, f'work-{args.size}.db')
+    # Настройки читаются при импорте app.*, поэтому окружение задаём заранее
+    os.environ['DATABASE_URL'] = f'sqlite:///{work_path}'
+    os.environ['DB_ASYNC'] = '1' if args.use_async else '0'
+    if not args.with_cache:
+        # Кэш с нулевым бюджетом ничего не хранит: меряем путь до БД
+        os.environ['CATALOG_CACHE_MAX_BYTES'] = '0'
+    # Все запросы идут с одного адреса: лимиты входа и регистрации
+    # отвечали бы 429 вместо bcrypt, который и нужно мерить
+    os.environ['RATE_LIMIT_ENABLED'] = '0'
+    os.environ['CATALOG_SNAPSHOT_DIR'] = os.path.join(args.work_dir, 'catalog-snapshots')
+
+    seed_path = os.path.join(args.data_dir, f'seed-{args.size}-{alembic_head()}-v{SEED_VERSION}.db')
+    if not os.path.exists(seed_path):
+        os.makedirs(args.data_dir, exist_ok=True)
+        started = time.perf_counter()
+        seed_database(seed_path, args.size)
+        print(f'seeded {args.size} products in {time.perf_counter() - started:.1f}s', file=sys.stderr)
+    shutil.copyfile(seed_path, work_path)
+
+    import httpx
+
+    from app.main import app
+
+    scenarios = build_scenarios(args.size)
+    if args.only:
+        scenarios = [s for s in scenarios if any(s.name.startswith(prefix) for prefix in args.only)]
+    else:
+        for route in uncovered_routes(app, scenarios):
+            print(f'warning: no scenario for {route}', file=sys.stderr)
+
+    # lifespan здесь не запускается, поэтому фоновой сборки снапшота нет
+    if any(s.name.startswith('catalog.') for s in scenarios):
+        from app.services.catalog_snapshot import catalog_snapshots
+
+        started = time.perf_counter()
+        catalog_snapshots.build()
+        print(f'built catalog snapshot in {time.perf_counter() - started:.1f}s', file=sys.stderr)
+
+    async def main():
+        ctx = Context(size=args.size, rng=random.Random(args.seed))
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+            response = await client.post(
+                '/api/v1/auth/login', json={'email': BENCH_EMAIL, 'password': BENCH_PASSWORD}
+            )
+            response.raise_for_status()
+            ctx.headers = {'Authorization': f"Bearer {response.json()['access_token']}"}
+            _remember_refresh_token(ctx, response)
+
+            results = {}
+            for scenario in scenarios:
+                results[scenario.name] = await run_scenario(client, ctx, scenario)
+                print(f'{args.size:>8} {scenario.name}: {results[scenario.name]}', file=sys.stderr)
+            return results
+
+    return asyncio.run(main())
+
+
+# --- Сравнение с базовой линией -----------------------------------------------
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Список регрессий: p95 выросла или rps упал больше чем на tolerance"""
+    regressions = []
+    for size, routes in results['datasets'].items():
+        base_routes = baseline.get('datasets', {}).get(size, {})
+        for name, current in routes.items():
+            base = base_routes.get(name)
+            if base is None:
+                continue
+            if current['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+                regressions.append(
+                    f"{size} {name}: p95 {base['p95_ms']} -> {current['p95_ms']} ms"
+                )
+            if current['rps'] < base['rps'] * (1 - tolerance):
+                regressions.append(
+                    f"{size} {name}: rps {base['rps']} -> {current['rps']}"
+                )
+            if current['errors'] > base['errors']:
+                regressions.append(
+                    f"{size} {name}: errors {base['errors']} -> {current['errors']}"
+                )
+    return regressions
+
+
+def print_table(results: dict, baseline: dict | None) -> None:
+    header = (
+        f"{'size':>8} {'scenario':<26} {'rps':>9} {'p50 ms':>9} "
+        f"{'p95 ms':>9} {'p99 ms':>9} {'err':>4} {'p95 vs base':>12}"
+    )
+    print(header)
+    print('-' * len(header))
+    for size, routes in results['datasets'].items():
+        base_routes = (baseline or {}).get('datasets', {}).get(size, {})
+        for name, r in routes.items():
+            delta = ''
+            base = base_routes.get(name)
+            if base and base['p95_ms']:
+                delta = f"{(r['p95_ms'] / base['p95_ms'] - 1) * 100:+.1f}%"
+            print(
+                f"{size:>8} {name:<26} {r['rps']:>9} {r['p50_ms']:>9} "
+                f"{r['p95_ms']:>9} {r['p99_ms']:>9} {r['errors']:>4} {delta:>12}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+    parser.add_argument('--only', nargs='+', help='Префиксы сценариев, например products.list auth')
+    parser.add_argument('--async', dest='use_async', action='store_true', help='Асинхронные роутеры (DB_ASYNC=1)')
+    parser.add_argument('--with-cache', action='store_true', help='Не отключать кэш каталога')
+    parser.add_argument('--seed', type=int, default=42, help='Seed генератора запросов')
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'fastapi-shop-bench'))
+    parser.add_argument('--output', help='Куда записать результаты (JSON)')
+    parser.add_argument('--baseline', help='Сохранённые результаты для сравнения')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--size', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--work-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Внутренний режим: один набор данных в отдельном процессе
+    if args.size:
+        print(json.dumps(run_worker(args)))
+        return
+
+    results = {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'async': args.use_async,
+            'cache': args.with_cache,
+            'seed': args.seed,
+        },
+        'datasets': {},
+    }
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size in args.sizes:
+            command = [
+                sys.executable, '-m', 'benchmarks.load',
+                '--size', str(size),
+                '--work-dir', work_dir,
+                '--data-dir', args.data_dir,
+                '--seed', str(args.seed),
+            ]
+            if args.only:
+                command += ['--only', *args.only]
+            if args.use_async:
+                command.append('--async')
+            if args.with_cache:
+                command.append('--with-cache')
+            output = subprocess.run(command, cwd=REPO_ROOT, check=True, stdout=subprocess.PIPE, text=True).stdout
+            results['datasets'][str(size)] = json.loads(output.strip().splitlines()[-1])
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print_table(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f'\n{len(regressions)} regression(s) over {args.tolerance:.0%}:')
+            for line in regressions:
+                print(f'  {line}')
+            sys.exit(1)
+        print(f'\nno regressions over {args.tolerance:.0%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Микробенчмарк сериализации списков: текущий путь (ORM-объекты ->
+Page[ProductRead] -> model_dump_json) против быстрого пути FAST_JSON_LISTS
+(строки PRODUCT_COLUMNS -> скомпилированный TypeAdapter -> байты).
+
+Время меряется отдельно для выборки из БД и для сериализации,
+берётся медиана по нескольким повторам. Размеры страниц больше
+PAGE_SIZE_MAX, чтобы был виден рост стоимости на строку.
+
+Запуск:
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --rows 1000 10000 100000 --repeat 5
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from decimal import Decimal
+
+
+def run(rows_list: list[int], repeat: int, db_path: str) -> list[dict]:
+    # Настройки читаются при импорте app.*, поэтому окружение задаём заранее
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ['DB_ASYNC'] = '0'
+
+    from app.core.db import Base, SessionLocal, engine
+    from app.models.category import Category
+    from app.models.product import Product
+    from app.schemas.pagination import Page
+    from app.schemas.product import ProductRead
+    from app.services.serialization import PRODUCT_COLUMNS, dump_product_page
+
+    Base.metadata.create_all(engine)
+    total = max(rows_list)
+    now = datetime.now()
+    with SessionLocal() as db:
+        db.add(Category(name='bench', description='bench'))
+        db.flush()
+        db.execute(
+            Product.__table__.insert(),
+            [
+                {
+                    'name': f'product {i}',
+                    'description': f'description of product {i}',
+                    'price': Decimal('9.99') + i % 100,
+                    'quantity': i % 50,
+                    'category_id': 1,
+                    'created_at': now,
+                    'updated_at': now,
+                }
+                for i in range(total)
+            ],
+        )
+        db.commit()
+
+    def current_path(db, n):
+        started = time.perf_counter()
+        items = db.query(Product).order_by(Product.id).limit(n).all()
+        fetched = time.perf_counter()
+        body = Page[ProductRead](items=items, next_cursor=None).model_dump_json().encode()
+        return fetched - started, time.perf_counter() - fetched, len(body)
+
+    def fast_path(db, n):
+        started = time.perf_counter()
+        items = db.query(*PRODUCT_COLUMNS).order_by(Product.id).limit(n).all()
+        fetched = time.perf_counter()
+        body = dump_product_page(items, None)
+        return fetched - started, time.perf_counter() - fetched, len(body)
+
+    results = []
+    for n in rows_list:
+        for name, func in (('current', current_path), ('fast', fast_path)):
+            fetch_times, dump_times = [], []
+            for _ in range(repeat):
+                # Новая сессия на повтор, чтобы identity map не копилась между прогонами
+                with SessionLocal() as db:
+                    fetch_s, dump_s, size = func(db, n)
+                fetch_times.append(fetch_s)
+                dump_times.append(dump_s)
+            fetch_ms = statistics.median(fetch_times) * 1000
+            dump_ms = statistics.median(dump_times) * 1000
+            results.append({
+                'rows': n,
+                'path': name,
+                'fetch_ms': round(fetch_ms, 2),
+                'dump_ms': round(dump_ms, 2),
+                'total_ms': round(fetch_ms + dump_ms, 2),
+                'bytes': size,
+            })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run(sorted(args.rows), args.repeat, os.path.join(tmp, 'bench.db'))
+
+    header = f"{'rows':>7} {'path':<8} {'fetch ms':>10} {'dump ms':>10} {'total ms':>10} {'bytes':>11}"
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        print(
+            f"{r['rows']:>7} {r['path']:<8} {r['fetch_ms']:>10} "
+            f"{r['dump_ms']:>10} {r['total_ms']:>10} {r['bytes']:>11}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+"""
+Бенчмарк холодного старта: время импорта app.main, время до готовности
+(/ready) и задержка первого запроса к каждому роуту - без прогрева
+и с прогревом при старте (WARMUP_ENABLED).
+
+Каждый замер - отдельный свежий процесс: импорт, lifespan через
+app.router.lifespan_context и запросы через httpx.ASGITransport, как
+в benchmarks.load. С прогревом первые запросы отправляются после того,
+как процесс стал готов - так же балансировщик ждёт /ready. Для каждого
+роута после первого запроса делается ещё --steady запросов, их медиана -
+задержка прогретого процесса.
+
+БД засеивается так же, как в benchmarks.load (кэш в --data-dir).
+
+Запуск:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --repeat 5 --size 100000 --output startup.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from benchmarks.load import BENCH_EMAIL, BENCH_PASSWORD, REPO_ROOT, SEED_VERSION, alembic_head, seed_database
+
+
+MODES = {'cold': '0', 'warmup': '1'}
+
+ROUTES = [
+    ('auth.login', 'POST', '/api/v1/auth/login', {'json': {'email': BENCH_EMAIL, 'password': BENCH_PASSWORD}}),
+    ('categories.list', 'GET', '/api/v1/categories/', {}),
+    ('products.list', 'GET', '/api/v1/products/', {}),
+    ('products.get', 'GET', '/api/v1/products/1', {}),
+    ('products.search', 'GET', '/api/v1/products/search', {'params': {'q': 'red lamp'}}),
+    ('openapi', 'GET', '/openapi.json', {}),
+]
+
+
+def run_worker(args: argparse.Namespace) -> dict:
+    """Один холодный старт в этом процессе"""
+    # Настройки читаются при импорте app.*, поэтому окружение задаём заранее
+    os.environ['DATABASE_URL'] = f'sqlite:///{args.db}'
+    os.environ['DB_ASYNC'] = '1' if args.use_async else '0'
+    os.environ['WARMUP_ENABLED'] = MODES[args.mode]
+    os.environ['RATE_LIMIT_ENABLED'] = '0'
+
+    import httpx
+
+    started = time.perf_counter()
+    from app.main import app
+    from app.services.warmup import warmup_state
+    import_seconds = time.perf_counter() - started
+
+    async def main():
+        results = {}
+        transport = httpx.ASGITransport(app=app)
+        async with app.router.lifespan_context(app):
+            lifespan_started = time.perf_counter()
+            while not warmup_state.ready:
+                await asyncio.sleep(0.001)
+            ready_seconds = time.perf_counter() - lifespan_started
+
+            async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+                for name, method, path, kwargs in ROUTES:
+                    latencies = []
+                    for _ in range(1 + args.steady):
+                        request_started = time.perf_counter()
+                        response = await client.request(method, path, **kwargs)
+                        latencies.append(time.perf_counter() - request_started)
+                        response.raise_for_status()
+                    results[name] = {
+                        'first_ms': round(latencies[0] * 1000, 2),
+                        'steady_ms': round(statistics.median(latencies[1:]) * 1000, 2),
+                    }
+        return {
+            'import_seconds': round(import_seconds, 4),
+            'ready_seconds': round(ready_seconds, 4),
+            'warmup_steps': warmup_state.snapshot()['steps'],
+            'routes': results,
+        }
+
+    return asyncio.run(main())
+
+
+def summarize(runs: list[dict]) -> dict:
+    """Медианы по повторам"""
+    return {
+        'import_seconds': round(statistics.median(run['import_seconds'] for run in runs), 4),
+        'ready_seconds': round(statistics.median(run['ready_seconds'] for run in runs), 4),
+        'routes': {
+            name: {
+                field: round(statistics.median(run['routes'][name][field] for run in runs), 2)
+                for field in ('first_ms', 'steady_ms')
+            }
+            for name, *_ in ROUTES
+        },
+    }
+
+
+def print_table(modes: dict) -> None:
+    for mode, summary in modes.items():
+        print(f"{mode}: import {summary['import_seconds']:.3f}s, ready {summary['ready_seconds']:.3f}s")
+    print()
+
+    header = f"{'route':<18}" + ''.join(f"{mode + ' first':>16}" for mode in modes) + f"{'steady ms':>12}"
+    print(header)
+    print('-' * len(header))
+    last = list(modes.values())[-1]
+    for name, *_ in ROUTES:
+        firsts = ''.join(f"{summary['routes'][name]['first_ms']:>16}" for summary in modes.values())
+        print(f"{name:<18}{firsts}{last['routes'][name]['steady_ms']:>12}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=1_000, help='Товаров в засеянной БД')
+    parser.add_argument('--repeat', type=int, default=3, help='Холодных стартов на режим')
+    parser.add_argument('--steady', type=int, default=3, help='Запросов к роуту после первого')
+    parser.add_argument('--async', dest='use_async', action='store_true', help='Асинхронные роутеры (DB_ASYNC=1)')
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'fastapi-shop-bench'))
+    parser.add_argument('--output', help='Куда записать результаты (JSON)')
+    parser.add_argument('--mode', choices=list(MODES), help=argparse.SUPPRESS)
+    parser.add_argument('--db', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Внутренний режим: один холодный старт в отдельном процессе
+    if args.mode:
+        print(json.dumps(run_worker(args)))
+        return
+
+    seed_path = os.path.join(args.data_dir, f'seed-{args.size}-{alembic_head()}-v{SEED_VERSION}.db')
+    if not os.path.exists(seed_path):
+        os.makedirs(args.data_dir, exist_ok=True)
+        seed_database(seed_path, args.size)
+
+    results = {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'async': args.use_async,
+            'size': args.size,
+            'repeat': args.repeat,
+        },
+        'runs': {},
+        'modes': {},
+    }
+    with tempfile.TemporaryDirectory() as work_dir:
+        for mode in MODES:
+            runs = []
+            for _ in range(args.repeat):
+                # Свежая копия: вход пишет refresh token
+                work_path = os.path.join(work_dir, 'work.db')
+                shutil.copyfile(seed_path, work_path)
+                command = [
+                    sys.executable, '-m', 'benchmarks.startup',
+                    '--mode', mode, '--db', work_path, '--steady', str(args.steady),
+                ]
+                if args.use_async:
+                    command.append('--async')
+                output = subprocess.run(command, cwd=REPO_ROOT, check=True, stdout=subprocess.PIPE, text=True).stdout
+                runs.append(json.loads(output.strip().splitlines()[-1]))
+            results['runs'][mode] = runs
+            results['modes'][mode] = summarize(runs)
+
+    print_table(results['modes'])
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+"""
+Бенчмарк резервирования под конкуренцией: POST /products/reserve
+(атомарный условный UPDATE) против наивного "прочитать-записать"
+(GET товара, затем PUT с quantity - n).
+
+Много покупателей одновременно берут по единице из нескольких "горячих"
+товаров с ограниченным остатком. После прогона сверяется, сколько единиц
+покупатели считают купленными, и насколько реально уменьшился остаток:
+расхождение - потерянные обновления (продано больше, чем списано).
+Ответы 5xx (например, "database is locked" у SQLite, когда писателей
+больше, чем успевает пропустить busy_timeout) считаются ошибками.
+
+Запуск:
+    python -m benchmarks.stock_contention
+    python -m benchmarks.stock_contention --buyers 64 --requests 4000 --hot-products 4 --stock 500
+    python -m benchmarks.stock_contention --async
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+
+BENCH_EMAIL = 'bench@example.com'
+BENCH_PASSWORD = 'bench-password'
+
+
+def _outcome(status_code: int) -> str:
+    if status_code == 200:
+        return 'bought'
+    if status_code == 409:
+        return 'rejected'
+    return 'errors'
+
+
+async def reserve_buy(client, headers, product_id: int) -> str:
+    response = await client.post(
+        '/api/v1/products/reserve',
+        json={'items': [{'product_id': product_id, 'qty': 1}]},
+        headers=headers,
+    )
+    return _outcome(response.status_code)
+
+
+async def naive_buy(client, headers, product_id: int) -> str:
+    response = await client.get(f'/api/v1/products/{product_id}')
+    if response.status_code != 200:
+        return 'errors'
+    quantity = response.json()['quantity']
+    if quantity < 1:
+        return 'rejected'
+    response = await client.put(
+        f'/api/v1/products/{product_id}',
+        json={'quantity': quantity - 1},
+        headers=headers,
+    )
+    return _outcome(response.status_code)
+
+
+def run(args: argparse.Namespace, db_path: str) -> list[dict]:
+    # Настройки читаются при импорте app.*, поэтому окружение задаём заранее
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ['DB_ASYNC'] = '1' if args.use_async else '0'
+    # Без кэша: наивный покупатель должен видеть остаток из БД
+    os.environ['CATALOG_CACHE_MAX_BYTES'] = '0'
+
+    import httpx
+    from sqlalchemy import select, update
+
+    from app.core.db import Base, SessionLocal, engine
+    from app.main import app
+    from app.models.category import Category
+    from app.models.product import Product
+    from app.models.user import User
+    from app.services.auth import get_password_hash
+
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        db.add(User(email=BENCH_EMAIL, hashed_password=get_password_hash(BENCH_PASSWORD)))
+        db.add(Category(name='bench'))
+        db.flush()
+        db.add_all(
+            Product(name=f'hot {i}', price=1, quantity=args.stock, category_id=1)
+            for i in range(args.hot_products)
+        )
+        db.commit()
+    product_ids = list(range(1, args.hot_products + 1))
+
+    def reset_stock():
+        with SessionLocal() as db:
+            db.execute(update(Product).values(quantity=args.stock))
+            db.commit()
+
+    def total_stock() -> int:
+        with SessionLocal() as db:
+            return sum(db.scalars(select(Product.quantity)))
+
+    async def bench(buy) -> dict:
+        rng = random.Random(args.seed)
+        latencies = []
+        outcomes = {'bought': 0, 'rejected': 0, 'errors': 0}
+        remaining = iter(range(args.requests))
+
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+            response = await client.post(
+                '/api/v1/auth/login', json={'email': BENCH_EMAIL, 'password': BENCH_PASSWORD}
+            )
+            response.raise_for_status()
+            headers = {'Authorization': f"Bearer {response.json()['access_token']}"}
+
+            async def buyer():
+                for _ in remaining:
+                    started = time.perf_counter()
+                    outcome = await buy(client, headers, rng.choice(product_ids))
+                    latencies.append(time.perf_counter() - started)
+                    outcomes[outcome] += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(buyer() for _ in range(args.buyers)))
+            elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        decremented = args.stock * args.hot_products - total_stock()
+        return {
+            'rps': round(args.requests / elapsed, 1),
+            'p50_ms': round(statistics.median(latencies) * 1000, 2),
+            'p99_ms': round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+            **outcomes,
+            'decremented': decremented,
+            'lost_updates': outcomes['bought'] - decremented,
+        }
+
+    results = []
+    for mode, buy in (('reserve', reserve_buy), ('naive', naive_buy)):
+        reset_stock()
+        results.append({'mode': mode, **asyncio.run(bench(buy))})
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--buyers', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--hot-products', type=int, default=4)
+    parser.add_argument('--stock', type=int, default=400, help='Начальный остаток каждого товара')
+    parser.add_argument('--async', dest='use_async', action='store_true', help='Асинхронные роутеры (DB_ASYNC=1)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run(args, os.path.join(tmp, 'stock.db'))
+
+    print(
+        f'buyers={args.buyers} requests={args.requests} '
+        f'hot_products={args.hot_products} stock={args.stock} async={args.use_async}'
+    )
+    header = (
+        f"{'mode':<8} {'rps':>8} {'p50 ms':>8} {'p99 ms':>8} "
+        f"{'bought':>7} {'rejected':>9} {'errors':>7} {'decremented':>12} {'lost':>6}"
+    )
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        print(
+            f"{r['mode']:<8} {r['rps']:>8} {r['p50_ms']:>8} {r['p99_ms']:>8} "
+            f"{r['bought']:>7} {r['rejected']:>9} {r['errors']:>7} {r['decremented']:>12} {r['lost_updates']:>6}"
+        )
+    if results[0]['lost_updates']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
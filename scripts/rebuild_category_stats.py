@@ -0,0 +1,25 @@
+"""
+Пересборка category_stats из таблицы products.
+
+Агрегаты поддерживаются в той же транзакции, что и запись товаров, но
+могут разойтись после ручных правок БД или записи в обход API. Команда
+пересчитывает таблицу целиком и сообщает, сколько категорий расходилось.
+
+Запуск:
+    python -m scripts.rebuild_category_stats
+"""
+import time
+
+from app.core.db import SessionLocal
+from app.services.category_stats import rebuild_category_stats
+
+
+def main() -> None:
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        drifted = rebuild_category_stats(db)
+    print(f'category_stats rebuilt in {time.perf_counter() - started:.2f}s, drifted categories: {drifted}')
+
+
+if __name__ == '__main__':
+    main()
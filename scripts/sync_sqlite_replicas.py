@@ -0,0 +1,74 @@
+"""
+Копии файла SQLite вместо реплик для локальной проверки чтения с реплик.
+
+Основная БД копируется в каждый файл-реплику через SQLite backup API:
+копия согласованная (снимок на момент копирования), а соединения
+приложения к реплике остаются открытыми и после копирования видят
+новые данные. С --interval копирование повторяется - реплики отстают
+от основной БД не больше чем на интервал, как при асинхронной репликации
+(DB_READ_YOUR_WRITES_SECONDS должно быть больше интервала).
+
+Запуск:
+    python -m scripts.sync_sqlite_replicas replica1.db replica2.db
+    python -m scripts.sync_sqlite_replicas replica1.db replica2.db --interval 2
+
+и приложение с репликами:
+    DATABASE_REPLICA_URLS='["sqlite:///file:./replica1.db?mode=rw&uri=true",
+                            "sqlite:///file:./replica2.db?mode=rw&uri=true"]' \\
+    uvicorn app.main:app
+
+Переключение проверяется репликой, копии которой ещё нет: с mode=rw
+она не открывается и остаётся вне ротации (чтения идут на остальные или
+в основную БД), а после первой копии возвращается при следующей проверке.
+"""
+import argparse
+import sqlite3
+import sys
+import time
+
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+
+
+def sqlite_path(database_url: str) -> str:
+    url = make_url(database_url)
+    if url.get_backend_name() != 'sqlite' or not url.database:
+        sys.exit(f'Основная БД не файл SQLite: {database_url}')
+    return url.database
+
+
+def copy_database(source: sqlite3.Connection, path: str, busy_timeout_ms: int) -> None:
+    target = sqlite3.connect(path, timeout=busy_timeout_ms / 1000)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('replicas', nargs='+', help='Файлы-реплики')
+    parser.add_argument('--source', help='Файл основной БД (по умолчанию из DATABASE_URL)')
+    parser.add_argument('--interval', type=float, default=0, help='Повторять каждые N секунд (0 - один раз)')
+    args = parser.parse_args()
+
+    source_path = args.source or sqlite_path(settings.DATABASE_URL)
+    source = sqlite3.connect(f'file:{source_path}?mode=rw', uri=True, timeout=settings.SQLITE_BUSY_TIMEOUT_MS / 1000)
+    try:
+        while True:
+            started = time.perf_counter()
+            for path in args.replicas:
+                copy_database(source, path, settings.SQLITE_BUSY_TIMEOUT_MS)
+            print(f'{source_path} -> {", ".join(args.replicas)}: {time.perf_counter() - started:.3f}s', flush=True)
+            if not args.interval:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        source.close()
+
+
+if __name__ == '__main__':
+    main()